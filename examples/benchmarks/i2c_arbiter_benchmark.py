@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+I2C Arbiter Benchmark.
+
+Description: Measure how long a UART drain waits for the
+             I2C bus while slow background conversions and user
+             requests compete for it, with a plain lock and with
+             the I2C arbiter. The bus is faked in memory, so no
+             hardware is needed.
+Version: 1.0
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import os
+import sys
+import signal
+import threading
+import time
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"
+))
+from agile_makers_shield.buses.i2c import i2c_arbiter  # noqa: E402
+# -----------------------
+
+
+# --- Variables ---------
+DURATION = 5
+DEVICES = {"ATMEGA": 0x14, "MCP3424": 0x6C, "BME280": 0x77}
+BACKGROUND_TIME = 0.004  # Poll of a slow ADC conversion
+USER_TIME = 0.001
+USER_PERIOD = 0.005
+DRAIN_TIME = 0.0005
+DRAIN_PERIOD = 0.010
+# -----------------------
+
+
+# --- Classes -----------
+class LockArbiter():
+    """Bus granted in lock order, as without the arbiter."""
+
+    def __init__(self):
+        """Init method."""
+        self._lock = threading.Lock()
+
+    def priority(self, priority):
+        """Ignore the priority."""
+        return i2c_arbiter.I2C_Arbiter().priority(priority)
+
+    def grant(self, device, priority=None):
+        """Hold the lock for the transaction."""
+        return self._lock
+# -----------------------
+
+
+# --- Functions ---------
+def fake_transaction(duration):
+    """Keep the fake bus busy."""
+    time.sleep(duration)
+
+
+def worker(arbiter, device, priority, duration, period, stop, waits=None):
+    """Run transactions on the fake bus until stopped."""
+    with arbiter.priority(priority):
+        while not stop.is_set():
+            ts = time.perf_counter()
+            with arbiter.grant(device):
+                if waits is not None:
+                    waits.append(time.perf_counter() - ts)
+                fake_transaction(duration)
+            if period:
+                time.sleep(period)
+
+
+def run(arbiter):
+    """Return the waits of the UART drains with the given arbiter."""
+    stop = threading.Event()
+    waits = []
+    threads = [
+        threading.Thread(target=worker, args=(
+            arbiter, DEVICES["MCP3424"], i2c_arbiter.PRIORITY_BACKGROUND,
+            BACKGROUND_TIME, 0, stop)),
+        threading.Thread(target=worker, args=(
+            arbiter, DEVICES["BME280"], i2c_arbiter.PRIORITY_BACKGROUND,
+            BACKGROUND_TIME, 0, stop)),
+        threading.Thread(target=worker, args=(
+            arbiter, DEVICES["ATMEGA"], i2c_arbiter.PRIORITY_USER,
+            USER_TIME, USER_PERIOD, stop)),
+        threading.Thread(target=worker, args=(
+            arbiter, DEVICES["ATMEGA"], i2c_arbiter.PRIORITY_INTERRUPT,
+            DRAIN_TIME, DRAIN_PERIOD, stop, waits))
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sorted(waits)
+
+
+def run_benchmark():
+    """Compare the UART drain waits with a lock and with the arbiter."""
+    print("\x1b[1;37;39m" + "I2C Arbiter Benchmark" + "\x1b[0m")
+    for name, arbiter in [("lock", LockArbiter()),
+                          ("arbiter", i2c_arbiter.I2C_Arbiter())]:
+        waits = run(arbiter)
+        print("{:<8} drains: {:5d}  mean wait: {:7.3f} ms  "
+              "p99 wait: {:7.3f} ms  max wait: {:7.3f} ms".format(
+                  name, len(waits),
+                  (sum(waits) / len(waits)) * 1e3,
+                  waits[int(len(waits) * 0.99)] * 1e3,
+                  waits[-1] * 1e3))
+
+
+def signal_handler(signal, frame):
+    """Handle the SIGINT signal."""
+    print()
+    end_program(0)
+
+
+def end_program(status):
+    """Exit the program."""
+    sys.exit(status)
+# -----------------------
+
+
+# --- Main program ------
+if __name__ == "__main__":
+    signal.signal(signal.SIGINT, signal_handler)
+    run_benchmark()
+    end_program(0)
+# -----------------------
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+I2C Transaction Benchmark.
+
+Description: Compare the legacy (pointer write plus reads
+             with two file objects) and the combined I2C_RDWR
+             register reads against the ATMega of the AGILE
+             Maker's Shield. The DBus server must be stopped.
+Version: 1.0
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import os
+import sys
+import signal
+import time
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"
+))
+from agile_makers_shield.buses.i2c import i2c_bus  # noqa: E402
+from agile_makers_shield.buses.i2c import atmega  # noqa: E402
+# -----------------------
+
+
+# --- Variables ---------
+ITERATIONS = 1000
+REGISTERS = {
+    "ATMEGA_CHECK (1 byte)": (atmega.ATMEGA_CHECK, 1),
+    "INT_UART (1 byte)": (
+        (atmega.SOCKET_0 << atmega.SOCKET_SHIFT) | atmega.INT_UART, 1
+    ),
+    "FIFO_AVAILABLE (2 bytes)": (
+        (atmega.SOCKET_0 << atmega.SOCKET_SHIFT) | atmega.FIFO_AVAILABLE, 2
+    ),
+    "LED_AUX_2 (1 byte)": (
+        (atmega.SOCKET_LEDS << atmega.SOCKET_SHIFT) | atmega.LED_AUX_2, 1
+    )
+}
+MODES = {
+    "legacy": i2c_bus.I2C_MODE_LEGACY,
+    "rdwr": i2c_bus.I2C_MODE_RDWR
+}
+# -----------------------
+
+
+# --- Functions ---------
+def benchmark(bus, reg, size):
+    """Return the mean time in microseconds of a register read."""
+    ts = time.perf_counter()
+    for i in range(ITERATIONS):
+        bus.read(reg, size)
+    return ((time.perf_counter() - ts) / ITERATIONS) * 1e6
+
+
+def run_benchmark():
+    """Read the ATMega registers with every I2C mode."""
+    print("\x1b[1;37;39m" + "I2C Transaction Benchmark" + "\x1b[0m")
+    print("{} reads per register".format(ITERATIONS))
+    results = {}
+    for name, mode in MODES.items():
+        bus = i2c_bus.I2C_Bus(atmega.ATMEGA_ADDRESS, mode)
+        if bus.mode != mode:
+            print("Mode {} not supported by the adapter".format(name))
+            bus.close()
+            continue
+        for reg_name, (reg, size) in REGISTERS.items():
+            results[(name, reg_name)] = benchmark(bus, reg, size)
+        bus.close()
+    for reg_name in REGISTERS:
+        line = "{:<26}".format(reg_name)
+        for name in MODES:
+            if (name, reg_name) in results:
+                line += "{:>8}: {:8.1f} us".format(
+                    name, results[(name, reg_name)]
+                )
+        print(line)
+
+
+def signal_handler(signal, frame):
+    """Handle the SIGINT signal."""
+    print()
+    end_program(0)
+
+
+def end_program(status):
+    """Exit the program."""
+    sys.exit(status)
+# -----------------------
+
+
+# --- Main program ------
+if __name__ == "__main__":
+    signal.signal(signal.SIGINT, signal_handler)
+    run_benchmark()
+    end_program(0)
+# -----------------------
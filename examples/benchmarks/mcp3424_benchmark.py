@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+MCP3424 Benchmark.
+
+Description: Count the I2C transactions and the time of
+             each ADC sample on the simulated bus, with the
+             previous read loop (configuration written on every
+             read and polled without pause) and with the current
+             driver.
+Version: 1.0
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import os
+import sys
+import signal
+import time
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"
+))
+from agile_makers_shield.buses.i2c import i2c_bus  # noqa: E402
+from agile_makers_shield.buses.i2c import i2c_sim  # noqa: E402
+from agile_makers_shield.buses.i2c import mcp3424  # noqa: E402
+# -----------------------
+
+
+# --- Variables ---------
+SAMPLES = {  # Samples read of each resolution
+    mcp3424.MCP3424_RESOLUTION_12: 40,
+    mcp3424.MCP3424_RESOLUTION_14: 20,
+    mcp3424.MCP3424_RESOLUTION_16: 10,
+    mcp3424.MCP3424_RESOLUTION_18: 4
+}
+MODES = {
+    "one-shot": mcp3424.MCP3424_MODE_ONE_SHOOT,
+    "continuous": mcp3424.MCP3424_MODE_CONTINUOUS
+}
+BUS_MODES = {
+    "rdwr": i2c_bus.I2C_MODE_RDWR,
+    "legacy": i2c_bus.I2C_MODE_LEGACY
+}
+CHANNEL = mcp3424.MCP3424_CHANNEL_1
+PGA = mcp3424.MCP3424_PGA_1
+# -----------------------
+
+
+# --- Functions ---------
+def previous_read(adc, channel, mode, resolution, pga):
+    """Read a sample as the driver did before."""
+    configuration = adc._configuration(channel, mode, resolution, pga)
+    size = adc._size(resolution)
+    data = adc._bus.read(configuration, size)
+    if (mode == mcp3424.MCP3424_MODE_ONE_SHOOT):
+        ts = time.time()
+        while ((data[-1] != (configuration & mcp3424.MCP3424_MASK_RDY)) and
+               ((time.time() - ts) < mcp3424.MCP3424_TIMEOUT)):
+            data = adc._bus._readRaw(size)
+    return adc._convert(data, resolution, pga)
+
+
+def current_read(adc, channel, mode, resolution, pga):
+    """Read a sample with the driver."""
+    return adc.read(channel, mode, resolution, pga)
+
+
+def benchmark(sim, adc, read, mode, resolution):
+    """Return the transactions and milliseconds of each sample."""
+    samples = SAMPLES[resolution]
+    adc._config = None
+    sim.resetStats()
+    ts = time.perf_counter()
+    for i in range(samples):
+        read(adc, CHANNEL, mode, resolution, PGA)
+    elapsed = time.perf_counter() - ts
+    return (sim.stats["transactions"] / samples,
+            (elapsed / samples) * 1e3)
+
+
+def run_benchmark():
+    """Compare the previous and the current read of the MCP3424."""
+    sim = i2c_sim.I2C_Simulator()
+    i2c_bus.setBackend(sim)
+    adc = mcp3424.MCP3424()
+    print("\x1b[1;37;39m" + "MCP3424 Benchmark" + "\x1b[0m")
+    print("Simulated bus, {} s per transaction".format(sim.latency))
+    for bus_name, bus_mode in BUS_MODES.items():
+        adc._bus = i2c_bus.I2C_Bus(mcp3424.MCP3424_ADDRESS, bus_mode)
+        for name, mode in MODES.items():
+            for resolution, samples in SAMPLES.items():
+                line = "{:<6} {:<10} {} bits".format(
+                    bus_name, name,
+                    mcp3424.MCP3424_RESOLUTION_BITS[resolution]
+                )
+                for label, read in [("previous", previous_read),
+                                    ("current", current_read)]:
+                    transactions, ms = benchmark(
+                        sim, adc, read, mode, resolution
+                    )
+                    line += "  {:>8}: {:6.1f} transactions {:6.1f} ms".format(
+                        label, transactions, ms
+                    )
+                print(line)
+    adc.close()
+
+
+def signal_handler(signal, frame):
+    """Handle the SIGINT signal."""
+    print()
+    end_program(0)
+
+
+def end_program(status):
+    """Exit the program."""
+    sys.exit(status)
+# -----------------------
+
+
+# --- Main program ------
+if __name__ == "__main__":
+    signal.signal(signal.SIGINT, signal_handler)
+    run_benchmark()
+    end_program(0)
+# -----------------------
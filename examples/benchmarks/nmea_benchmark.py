@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+NMEA Benchmark.
+
+Description: Time the parsing of the GGA and RMC buffers
+             of the simulated GPS to typed values, with the
+             previous code of the GPS feature (byte by byte check,
+             split into text fields, converted by the client) and
+             with the table-driven NMEA parser, and the checksum
+             of the sentences byte by byte and with nmea.checksum.
+             Both parsers return the values of getFix. The rounds
+             are interleaved and their medians are compared.
+Version: 1.0
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import calendar
+import os
+import sys
+import signal
+import statistics
+import time
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"
+))
+from agile_makers_shield.buses.i2c import i2c_sim  # noqa: E402
+from agile_makers_shield.utils import nmea  # noqa: E402
+# -----------------------
+
+
+# --- Variables ---------
+FRAMES = 2000  # Pairs of GGA and RMC buffers parsed
+ROUNDS = 15  # Interleaved rounds of each
+GGA_FIELDS = ["type", "utc", "latitude", "latitudeDir", "longitude",
+              "longitudeDir", "fix", "nsat", "hdop", "altitude",
+              "altitudeUnit", "hog", "hogUnit", "dgpsLast", "dgpsId"]
+RMC_FIELDS = ["type", "utc", "status", "latitude", "latitudeDir",
+              "longitude", "longitudeDir", "spkn", "angle", "date",
+              "magneticVar", "magneticVarDir", "fix"]
+# -----------------------
+
+
+# --- Functions ---------
+def previous_check(frame):
+    """Check a frame as the GPS feature did before."""
+    length = 0
+    while length < len(frame):
+        if frame[length] == 0x00:
+            break
+        length = length + 1
+    if (length < 10) or (frame[0] != ord("$")) or \
+            (frame[length-3] != ord("*")):
+        return False
+    checksum = 0
+    for char in frame[1:(length-3)]:
+        checksum = checksum ^ char
+    checkFrame = (int(chr(frame[length-2]), 16) << 4) | \
+        int(chr(frame[length-1]), 16)
+    return checksum == checkFrame
+
+
+def previous_split(frame, fields):
+    """Split a frame into text fields as the GPS feature did before."""
+    gpsFrame = dict.fromkeys(fields, "")
+    if previous_check(frame):
+        data = bytearray(frame).decode("utf-8").strip("\x00")[0:-3]
+        for i, value in enumerate(data.split(",")):
+            gpsFrame[fields[i]] = value
+    return gpsFrame
+
+
+def degrees(value, direction):
+    """Convert a (d)ddmm.mmmm text coordinate, as the clients did."""
+    value = float(value)
+    result = int(value / 100)
+    result = result + ((value - (result * 100)) / 60)
+    return -result if direction in ["S", "W"] else result
+
+
+def epoch(date, utc):
+    """Convert a ddmmyy date and a hhmmss.ss time, as the clients did."""
+    year = 2000 + int(date[4:6])
+    seconds = calendar.timegm((year, int(date[2:4]), int(date[0:2]),
+                               int(utc[0:2]), int(utc[2:4]), 0))
+    return seconds + float(utc[4:])
+
+
+def previous_parse(gga, rmc):
+    """Return the typed fix with the previous code."""
+    gga = previous_split(list(gga), GGA_FIELDS)
+    rmc = previous_split(list(rmc), RMC_FIELDS)
+    variation = None
+    if rmc["magneticVar"]:
+        variation = float(rmc["magneticVar"])
+        if rmc["magneticVarDir"] == "W":
+            variation = -variation
+    return {
+        "quality": int(gga["fix"]),
+        "satellites": int(gga["nsat"]),
+        "hdop": float(gga["hdop"]),
+        "latitude": degrees(gga["latitude"], gga["latitudeDir"]),
+        "longitude": degrees(gga["longitude"], gga["longitudeDir"]),
+        "altitude": float(gga["altitude"]),
+        "geoid": float(gga["hog"]),
+        "speed": float(rmc["spkn"]),
+        "course": float(rmc["angle"]),
+        "variation": variation,
+        "time": epoch(rmc["date"], rmc["utc"])
+    }
+
+
+def current_parse(gga, rmc):
+    """Return the typed fix with the NMEA parser."""
+    gga = nmea.parse(gga)
+    rmc = nmea.parse(rmc)
+    return {
+        "quality": gga["quality"],
+        "satellites": gga["satellites"],
+        "hdop": gga["hdop"],
+        "latitude": gga["latitude"],
+        "longitude": gga["longitude"],
+        "altitude": gga["altitude"],
+        "geoid": gga["geoid"],
+        "speed": rmc["speed"],
+        "course": rmc["course"],
+        "variation": rmc["variation"],
+        "time": rmc["time"]
+    }
+
+
+def previous_checksum(data):
+    """XOR the bytes of a sentence one by one, as the GPS feature did."""
+    checksum = 0
+    for char in data:
+        checksum = checksum ^ char
+    return checksum
+
+
+def benchmark_checksum(checksum, bodies):
+    """Return the microseconds to check each sentence."""
+    ts = time.perf_counter()
+    for body in bodies:
+        checksum(body)
+    return (time.perf_counter() - ts) / len(bodies) * 1e6
+
+
+def benchmark(parse, frames):
+    """Return the microseconds to parse each pair of frames."""
+    ts = time.perf_counter()
+    for gga, rmc in frames:
+        parse(gga, rmc)
+    return (time.perf_counter() - ts) / len(frames) * 1e6
+
+
+def run_benchmark():
+    """Compare the previous and the current parsing of the GPS frames."""
+    gps = i2c_sim.GPS_Model()
+    start = time.time()
+    frames = [gps.sentences(start + i) for i in range(FRAMES)]
+    print("\x1b[1;37;39m" + "NMEA Benchmark" + "\x1b[0m")
+    print("{} pairs of GGA and RMC buffers of {} bytes".format(
+        FRAMES, len(frames[0][0])
+    ))
+    for gga, rmc in frames[0:10]:
+        previous = previous_parse(gga, rmc)
+        current = current_parse(gga, rmc)
+        for key, value in previous.items():
+            if (value is None) or (current[key] is None):
+                if value != current[key]:
+                    print("Mismatch in {}: {} != {}".format(
+                        key, value, current[key]
+                    ))
+            elif abs(value - current[key]) > 1e-6:
+                print("Mismatch in {}: {} != {}".format(
+                    key, value, current[key]
+                ))
+    previous = []
+    current = []
+    for i in range(ROUNDS):
+        previous.append(benchmark(previous_parse, frames))
+        current.append(benchmark(current_parse, frames))
+    previous = statistics.median(previous)
+    current = statistics.median(current)
+    print("previous: {:7.1f} us per fix".format(previous))
+    print("current:  {:7.1f} us per fix ({:.1f}x)".format(
+        current, previous / current
+    ))
+    bodies = [sentence[1:sentence.index(b"*")]
+              for frame in frames for sentence in frame]
+    for body in bodies[0:10]:
+        if previous_checksum(body) != nmea.checksum(body):
+            print("Mismatch in checksum: {}".format(body))
+    previous = []
+    current = []
+    for i in range(ROUNDS):
+        previous.append(benchmark_checksum(previous_checksum, bodies))
+        current.append(benchmark_checksum(nmea.checksum, bodies))
+    previous = statistics.median(previous)
+    current = statistics.median(current)
+    print("checksum previous: {:5.2f} us per sentence".format(previous))
+    print("checksum current:  {:5.2f} us per sentence ({:.1f}x)".format(
+        current, previous / current
+    ))
+
+
+def signal_handler(signal, frame):
+    """Handle the SIGINT signal."""
+    print()
+    end_program(0)
+
+
+def end_program(status):
+    """Exit the program."""
+    sys.exit(status)
+# -----------------------
+
+
+# --- Main program ------
+if __name__ == "__main__":
+    signal.signal(signal.SIGINT, signal_handler)
+    run_benchmark()
+    end_program(0)
+# -----------------------
@@ -53,35 +53,17 @@ def run_example():
         print("Read all the channels in one shoot mode, "
               "18 bits resolution and PGA 1: ")
 
-        ch1 = feature.readADC(dbus.Dictionary({
-            "channel": 1,
-            "mode": "one_shoot",
-            "resolution": 18,
-            "pga": 1
-        }, signature="sv"))
-        ch2 = feature.readADC(dbus.Dictionary({
-            "channel": 2,
-            "mode": "one_shoot",
-            "resolution": 18,
-            "pga": 1
-        }, signature="sv"))
-        ch3 = feature.readADC(dbus.Dictionary({
-            "channel": 3,
-            "mode": "one_shoot",
-            "resolution": 18,
-            "pga": 1
-        }, signature="sv"))
-        ch4 = feature.readADC(dbus.Dictionary({
-            "channel": 4,
-            "mode": "one_shoot",
-            "resolution": 18,
-            "pga": 1
-        }, signature="sv"))
-
-        print("Channel 1: {} mV".format(ch1["value"]))
-        print("Channel 2: {} mV".format(ch2["value"]))
-        print("Channel 3: {} mV".format(ch3["value"]))
-        print("Channel 4: {} mV".format(ch4["value"]))
+        scan = feature.readADCMulti(dbus.Array([
+            dbus.Dictionary({
+                "channel": channel,
+                "resolution": 18,
+                "pga": 1
+            }, signature="sv")
+            for channel in range(1, 5)
+        ], signature="a{sv}"))
+
+        for channel, value in zip(scan["channels"], scan["values"]):
+            print("Channel {}: {} mV".format(channel, value))
 
         print("Read channel 1 in continuos mode, "
               "18 bits resolution and PGA 1: ")
@@ -28,7 +28,29 @@ Date: April 2017
 import dbus
 import dbus.service
 from agile_makers_shield.buses.dbus import constants as db_cons
+from agile_makers_shield.utils import downsample
+from agile_makers_shield.utils import sampler
 import logging
+import math
+# -----------------------
+
+
+# --- Variables ---------
+HISTORY_PARAMS = {
+    "START": "start",
+    "END": "end",
+    "POINTS": "points",
+    "MODE": "mode",
+    "FIELD": "field",
+    "TIMESTAMPS": "timestamps",
+    "MIN": "{}_min",
+    "MAX": "{}_max"
+}
+HISTORY_MODES = ["lttb", "buckets"]
+HISTORY_DEFAULTS = {
+    "POINTS": 0,
+    "MODE": "lttb"
+}
 # -----------------------
 
 
@@ -59,6 +81,76 @@ class FeatureObj(dbus.service.Object):
         self._full_path = self._obj_path + "/" + feature_name
         super().__init__(dbus.SessionBus(), self._full_path)
 
+    def _getHistory(self, source, args, method):
+        """Return the history of a sampler source as a DBus dictionary.
+
+        The arguments select the Unix times from start to end and
+        reduce the samples to a number of points with LTTB (picked on
+        one field) or with the minimum, maximum and mean of buckets.
+        """
+        start = args.pop(HISTORY_PARAMS["START"], None)
+        end = args.pop(HISTORY_PARAMS["END"], None)
+        points = args.pop(HISTORY_PARAMS["POINTS"], HISTORY_DEFAULTS["POINTS"])
+        mode = args.pop(HISTORY_PARAMS["MODE"], HISTORY_DEFAULTS["MODE"])
+        fields = sampler.Sampler().getFields(source)
+        field = args.pop(HISTORY_PARAMS["FIELD"], fields[0])
+        for name, bound in [("START", start), ("END", end)]:
+            if (bound is not None) and not (
+                    isinstance(bound, (int, float)) and math.isfinite(bound)):
+                self._logger.debug("{}@{}: Invalid {}".format(
+                    self._full_path, method, HISTORY_PARAMS[name]
+                ))
+                raise FeatureException(
+                    self._feature_name,
+                    "Invalid {}.".format(HISTORY_PARAMS[name])
+                )
+        if (start is not None) and (end is not None) and (start > end):
+            self._logger.debug(
+                "{}@{}: Invalid range".format(self._full_path, method)
+            )
+            raise FeatureException(self._feature_name, "Invalid range.")
+        if (not isinstance(mode, str)) or (mode not in HISTORY_MODES):
+            self._logger.debug(
+                "{}@{}: Invalid mode".format(self._full_path, method)
+            )
+            raise FeatureException(self._feature_name, "Invalid mode.")
+        if (not isinstance(points, int)) or (points < 0) or (
+                (mode == "lttb") and
+                (0 < points < downsample.LTTB_MIN_POINTS)):
+            self._logger.debug(
+                "{}@{}: Invalid points".format(self._full_path, method)
+            )
+            raise FeatureException(self._feature_name, "Invalid points.")
+        if (not isinstance(field, str)) or (field not in fields):
+            self._logger.debug(
+                "{}@{}: Invalid field".format(self._full_path, method)
+            )
+            raise FeatureException(self._feature_name, "Invalid field.")
+        timestamps, values = sampler.Sampler().getHistory(source, start, end)
+        result = {}
+        if points and (mode == "buckets"):
+            timestamps, stats = downsample.buckets(
+                timestamps, values, points, start, end
+            )
+            values = []
+            for name, (mins, maxs, means) in zip(fields, stats):
+                values.append(means)
+                result[HISTORY_PARAMS["MIN"].format(name)] = \
+                    dbus.Array(mins, signature="d")
+                result[HISTORY_PARAMS["MAX"].format(name)] = \
+                    dbus.Array(maxs, signature="d")
+        elif points:
+            indexes = downsample.lttb(
+                timestamps, values[fields.index(field)], points
+            )
+            timestamps = [timestamps[i] for i in indexes]
+            values = [[data[i] for i in indexes] for data in values]
+        result[HISTORY_PARAMS["TIMESTAMPS"]] = \
+            dbus.Array(timestamps, signature="d")
+        for name, data in zip(fields, values):
+            result[name] = dbus.Array(data, signature="d")
+        return dbus.Dictionary(result, signature="sv")
+
     # AGILE API Methods
 
     @dbus.service.method(
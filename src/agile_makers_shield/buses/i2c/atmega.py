@@ -20,8 +20,15 @@ Description: Class to communicate with the ATMega
              in the AGILE Maker's Shield. This allows to
              control several features as the sockets, the
              GPS and the LEDs. Only one instance of this
-             class can be created and most of its methods
-             will lock the class when transmitting over I2C.
+             class can be created. Each register transaction
+             is granted by the I2C arbiter with the priority of
+             the caller, and sequences of several transactions on
+             the same socket (or on the GPS or the LEDs) also hold
+             the lock of that resource. The time spent waiting for
+             and holding the bus and the locks is recorded per
+             method. The LED registers are only
+             written by this class, so their values are kept in a
+             write-through shadow and read from it.
 Author: David Palomares <d.palomares@libelium.com>
 Version: 0.2
 Date: May 2017
@@ -29,9 +36,11 @@ Date: May 2017
 
 
 # --- Imports -----------
+from agile_makers_shield.buses.i2c import i2c_arbiter
 from agile_makers_shield.buses.i2c import i2c_bus
 from agile_makers_shield.utils import singleton
 import threading
+import time
 # -----------------------
 
 
@@ -50,6 +59,7 @@ SOCKET_SHIFT = 0x04  # Shifts the socket to the high part of the byte
 MODE_OFF = 0
 MODE_ON = 1
 ERROR = []
+LOCK_STATS = ["calls", "wait_total", "wait_max", "hold_total", "hold_max"]
 # I2C Addresses
 ATMEGA_CHECK = 0xFF
 FIFO_TX = 0x00
@@ -66,6 +76,8 @@ GPS_UPDATE = 0x00
 GPS_READ_BUFFER_SIZE = 0x01
 GPS_READ_GGA = 0x02
 GPS_READ_RMC = 0x03
+GPS_END = 0x00  # Byte after the sentence in the GPS buffers
+GPS_READ_MARGIN = 4  # Bytes read beyond the length of the last sentence
 # LEDs
 LED_S0_R = 0x0A
 LED_S0_G = 0x0B
@@ -87,6 +99,12 @@ LEDS_AUX = {
     LED_AUX_3: LED_AUX_3_DIR,
     LED_AUX_4: LED_AUX_4_DIR
 }
+# Runs of consecutive LED registers, written with one transaction each
+LED_RUNS = [
+    [LED_AUX_2_DIR, LED_AUX_3_DIR, LED_AUX_4_DIR],
+    [LED_S0_R, LED_S0_G, LED_S0_B, LED_S1_R, LED_S1_G, LED_S1_B]
+]
+LED_REGISTERS = {reg: i for i, run in enumerate(LED_RUNS) for reg in run}
 # UART
 UART_BAUD_0 = 0
 UART_BAUD_50 = 50
@@ -168,19 +186,97 @@ class ATMega(metaclass=singleton.Singleton):
     def __init__(self):
         """Init method."""
         self._bus = i2c_bus.I2C_Bus(ATMEGA_ADDRESS)
-        self._lock = threading.Lock()
+        self._arbiter = i2c_arbiter.I2C_Arbiter()
+        self._resourceLocks = {
+            SOCKET_0: threading.RLock(),
+            SOCKET_1: threading.RLock(),
+            SOCKET_GPS: threading.RLock(),
+            SOCKET_LEDS: threading.RLock()
+        }
+        self._statsLock = threading.Lock()
+        self._lockStats = {}
+        self._ledShadow = {}  # Known values of the LED registers
         if not self._check:
             raise IOError("Could not connect to the I2C Bus")
         self._gpsBufferSize = self._getGPSBufferSize()
+        # Bytes to read of each GPS buffer, from the last sentence read
+        self._gpsReadSize = {
+            GPS_READ_GGA: i2c_bus.BUFFER_SIZE,
+            GPS_READ_RMC: i2c_bus.BUFFER_SIZE
+        }
+
+    def _runLocked(self, lock, name, func, *args, **kwargs):
+        """Run a function holding a lock and record the lock times.
+
+        The lock is a lock or a context manager, like an arbiter grant.
+        """
+        ts = time.perf_counter()
+        with lock:
+            acquired = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                released = time.perf_counter()
+                self._recordLockStats(name, acquired - ts, released - acquired)
+
+    def _recordLockStats(self, name, wait, hold):
+        """Add the wait and hold times of a locked call to the counters."""
+        with self._statsLock:
+            stats = self._lockStats.get(name)
+            if stats is None:
+                stats = dict.fromkeys(LOCK_STATS, 0)
+                self._lockStats[name] = stats
+            stats["calls"] = stats["calls"] + 1
+            stats["wait_total"] = stats["wait_total"] + wait
+            stats["wait_max"] = max(stats["wait_max"], wait)
+            stats["hold_total"] = stats["hold_total"] + hold
+            stats["hold_max"] = max(stats["hold_max"], hold)
+
+    def getLockStats(self):
+        """Return the lock counters (calls and seconds) of each method."""
+        with self._statsLock:
+            return {name: dict(stats)
+                    for name, stats in self._lockStats.items()}
+
+    def resetLockStats(self):
+        """Clear the lock counters."""
+        with self._statsLock:
+            self._lockStats = {}
 
     def lock_decorator(func):
-        """Decorator to lock a function."""
+        """Decorator to hold the bus during a register transaction.
+
+        The bus is granted by the arbiter, so a caller with a higher
+        priority is not kept waiting behind a background one.
+        """
         def lock_wrapper(self, *args, **kwargs):
-            result = func(self, *args, **kwargs)
-            return result
+            return self._runLocked(
+                self._arbiter.grant(ATMEGA_ADDRESS), func.__name__, func,
+                *args, **kwargs
+            )
 
         return lock_wrapper
 
+    def resource_lock_decorator(resource=None):
+        """Decorator to lock a resource during a sequence of transactions.
+
+        If no resource is given, the socket passed as the first argument
+        of the function is locked.
+        """
+        def decorator(func):
+            def lock_wrapper(self, *args, **kwargs):
+                key = resource if resource is not None else args[0]
+                if key not in self._resourceLocks:
+                    raise ValueError("Wrong socket")
+                return self._runLocked(
+                    self._resourceLocks[key], func.__name__, func,
+                    *args, **kwargs
+                )
+
+            return lock_wrapper
+
+        return decorator
+
     def close(self):
         """Close the I2C communication."""
         self._bus.close()
@@ -196,12 +292,23 @@ class ATMega(metaclass=singleton.Singleton):
             return False
         return False
 
+    @lock_decorator
+    def _readRegister(self, reg, size):
+        """Read a list of bytes from a register of the ATMega."""
+        return self._bus.read(reg, size)
+
+    @lock_decorator
+    def _writeRegister(self, reg, data):
+        """Write a list of bytes to a register of the ATMega."""
+        return self._bus.write(reg, data)
+
     @lock_decorator
     def _getGPSBufferSize(self):
         """Return the size of the GPS buffer in the ATMega."""
         reg = (SOCKET_GPS << SOCKET_SHIFT) | GPS_READ_BUFFER_SIZE
         return self._bus.read(reg, 1)[0]
 
+    @resource_lock_decorator()
     def uartON(self, socket, baudrate=UART_BAUD_9600, databits=UART_DATABITS_8,
                stopbits=UART_STOPBITS_1, parity=UART_PARITY_NONE):
         """Turn on the UART of the specified socket."""
@@ -216,15 +323,15 @@ class ATMega(metaclass=singleton.Singleton):
             return False
         if not self._setParity(socket, parity):
             return False
-        return self._bus.write(reg, [MODE_ON])
+        return self._writeRegister(reg, [MODE_ON])
 
-    @lock_decorator
+    @resource_lock_decorator()
     def uartOFF(self, socket):
         """Turn off the UART of the specified socket."""
         if socket not in SOCKETS:
             raise ValueError("Wrong socket")
         reg = (socket << SOCKET_SHIFT) | SOCKET_STATUS
-        return self._bus.write(reg, [MODE_OFF])
+        return self._writeRegister(reg, [MODE_OFF])
 
     @lock_decorator
     def uartStatus(self, socket):
@@ -235,30 +342,53 @@ class ATMega(metaclass=singleton.Singleton):
         return self._bus.read(reg, 1)[0]
 
     @lock_decorator
-    def sendData(self, socket, data):
-        """Send an array of bytes to the UART of the specified socket."""
+    def sendData(self, socket, data, safe=False):
+        """Send a list or buffer of bytes to the UART of the socket.
+
+        With safe, every 32-byte chunk is acknowledged by the ATMega
+        before the next one is sent.
+        """
         if socket not in SOCKETS:
             raise ValueError("Wrong socket")
         reg = (socket << SOCKET_SHIFT) | FIFO_TX
-        return self._bus.write(reg, data)
+        return self._bus.write(reg, data, safe=safe)
 
     @lock_decorator
+    def _getAvailable(self, socket):
+        """Return the number of bytes available in the UART FIFO."""
+        reg = (socket << SOCKET_SHIFT) | FIFO_AVAILABLE
+        lengthBytes = bytearray(2)
+        if self._bus.readinto(reg, lengthBytes) != 2:
+            return 0
+        return (lengthBytes[0] << 8) | (lengthBytes[1])
+
+    @resource_lock_decorator()
     def getData(self, socket):
         """Read all the available bytes of the UART of the specified socket."""
         if socket not in SOCKETS:
             raise ValueError("Wrong socket")
-        # Get the available data
-        reg = (socket << SOCKET_SHIFT) | FIFO_AVAILABLE
-        lengthBytes = self._bus.read(reg, 2)
-        if len(lengthBytes) != 2:
-            return ERROR
-        length = (lengthBytes[0] << 8) | (lengthBytes[1])
-        # Read that data
-        if length > 0:
-            reg = (socket << SOCKET_SHIFT) | FIFO_RX
-            return self._bus.read(reg, length)
+        buffer = bytearray(self._getAvailable(socket))
+        if buffer and (self._readFifo(socket, buffer) == len(buffer)):
+            return list(buffer)
         return ERROR
 
+    @resource_lock_decorator()
+    def getDataInto(self, socket, buffer):
+        """Read the available UART bytes into a buffer, return the count."""
+        if socket not in SOCKETS:
+            raise ValueError("Wrong socket")
+        view = memoryview(buffer).cast("B")
+        length = min(self._getAvailable(socket), len(view))
+        if length > 0:
+            return self._readFifo(socket, view[:length])
+        return 0
+
+    @lock_decorator
+    def _readFifo(self, socket, buffer):
+        """Read the UART FIFO of the socket into a buffer."""
+        reg = (socket << SOCKET_SHIFT) | FIFO_RX
+        return self._bus.readinto(reg, buffer)
+
     @lock_decorator
     def getBaudrate(self, socket):
         """Return the baudrate of the UART in the specified socket."""
@@ -370,63 +500,119 @@ class ATMega(metaclass=singleton.Singleton):
             return True
         return False
 
+    def _readGPSBuffer(self, buffer):
+        """Read a GPS buffer up to the NUL that ends the sentence.
+
+        The read starts with the length of the last sentence plus a
+        margin, and goes on in chunks if the NUL is not found.
+        """
+        reg = (SOCKET_GPS << SOCKET_SHIFT) | buffer
+        data = self._bus.readUntil(
+            reg, self._gpsBufferSize, GPS_END, self._gpsReadSize[buffer]
+        )
+        end = data.find(GPS_END) if data else -1
+        if end >= 0:
+            self._gpsReadSize[buffer] = end + 1 + GPS_READ_MARGIN
+        return data
+
     @lock_decorator
     def getGPSGGA(self):
         """Return the last NMEA GGA sentence stored."""
-        reg = (SOCKET_GPS << SOCKET_SHIFT) | GPS_READ_GGA
-        return self._bus.read(reg, self._gpsBufferSize)
+        return self._readGPSBuffer(GPS_READ_GGA)
 
     @lock_decorator
     def getGPSRMC(self):
         """Return the last NMEA RMC sentece stored."""
-        reg = (SOCKET_GPS << SOCKET_SHIFT) | GPS_READ_RMC
-        return self._bus.read(reg, self._gpsBufferSize)
-
-    @lock_decorator
+        return self._readGPSBuffer(GPS_READ_RMC)
+
+    def _getLed(self, led):
+        """Return an LED register from the shadow, read if unknown."""
+        bright = self._ledShadow.get(led)
+        if bright is None:
+            reg = (SOCKET_LEDS << SOCKET_SHIFT) | led
+            bright = self._readRegister(reg, 1)[0]
+            self._ledShadow[led] = bright
+        return bright
+
+    @resource_lock_decorator(SOCKET_LEDS)
     def getLedSocket(self, socket):
         """Return the RGB brightness of the specified socket LED."""
         if socket not in SOCKETS:
             raise ValueError("Wrong socket LED")
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_SOCKET_R[socket]
-        bright_R = self._bus.read(reg, 1)[0]
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_SOCKET_G[socket]
-        bright_G = self._bus.read(reg, 1)[0]
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_SOCKET_B[socket]
-        bright_B = self._bus.read(reg, 1)[0]
-        return [bright_R, bright_G, bright_B]
+        return [self._getLed(LEDS_SOCKET_R[socket]),
+                self._getLed(LEDS_SOCKET_G[socket]),
+                self._getLed(LEDS_SOCKET_B[socket])]
 
-    @lock_decorator
+    @resource_lock_decorator(SOCKET_LEDS)
     def setLedSocket(self, socket, rgb_bright):
         """Set the RGB brightness of the specified socket LED."""
         if socket not in SOCKETS:
             raise ValueError("Wrong socket LED")
         if len(rgb_bright) != 3:
             raise ValueError("Expected a list with R, G and B")
-        for i, bright in enumerate(rgb_bright):
-            rgb_bright[i] = bright & 0xFF
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_SOCKET_R[socket]
-        if not self._bus.write(reg, [rgb_bright[0]]):
-            return False
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_SOCKET_G[socket]
-        if not self._bus.write(reg, [rgb_bright[1]]):
-            return False
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_SOCKET_B[socket]
-        return self._bus.write(reg, [rgb_bright[2]])
+        return self.setLeds({
+            LEDS_SOCKET_R[socket]: rgb_bright[0],
+            LEDS_SOCKET_G[socket]: rgb_bright[1],
+            LEDS_SOCKET_B[socket]: rgb_bright[2]
+        })
 
-    @lock_decorator
+    @resource_lock_decorator(SOCKET_LEDS)
     def getLedAux(self, aux):
         """Return the brightness of the specified auxiliar LED."""
         if aux not in LEDS_AUX:
             raise ValueError("Wrong auxiliar LED")
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_AUX[aux]
-        return self._bus.read(reg, 1)[0]
+        return self._getLed(LEDS_AUX[aux])
 
-    @lock_decorator
+    @resource_lock_decorator(SOCKET_LEDS)
     def setLedAux(self, aux, bright):
         """Set the brightness of the specified auxiliar LED."""
         if aux not in LEDS_AUX:
             raise ValueError("Wrong auxiliar LED")
-        bright = bright & 0xFF
-        reg = (SOCKET_LEDS << SOCKET_SHIFT) | LEDS_AUX[aux]
-        return self._bus.write(reg, [bright])
+        return self.setLeds({LEDS_AUX[aux]: bright})
+
+    @resource_lock_decorator(SOCKET_LEDS)
+    def getLeds(self, leds):
+        """Return a list with the brightness of several LED registers."""
+        for led in leds:
+            if led not in LED_REGISTERS:
+                raise ValueError("Wrong LED register")
+        return [self._getLed(led) for led in leds]
+
+    @resource_lock_decorator(SOCKET_LEDS)
+    def setLeds(self, brights):
+        """Set several LED registers, a dict of register: brightness.
+
+        Only the registers that change are written. The changed
+        registers of a run of consecutive LED registers are written
+        with one transaction, with the known registers between them.
+        """
+        values = dict(self._ledShadow)
+        changed = []
+        for led, bright in brights.items():
+            if led not in LED_REGISTERS:
+                raise ValueError("Wrong LED register")
+            bright = bright & 0xFF
+            if values.get(led) != bright:
+                values[led] = bright
+                changed.append(led)
+        changed.sort()
+        writes = []
+        for led in changed:
+            if writes and \
+                    (LED_REGISTERS[led] == LED_REGISTERS[writes[-1][-1]]) and \
+                    all((reg in values)
+                        for reg in range(writes[-1][-1] + 1, led)):
+                writes[-1].extend(range(writes[-1][-1] + 1, led + 1))
+            else:
+                writes.append([led])
+        for leds in writes:
+            reg = (SOCKET_LEDS << SOCKET_SHIFT) | leds[0]
+            if not self._writeRegister(reg, [values[led] for led in leds]):
+                # The LEDs may have changed or not
+                for led in leds:
+                    self._ledShadow.pop(led, None)
+                return False
+            for led in leds:
+                self._ledShadow[led] = values[led]
+        return True
 # -----------------------
@@ -19,7 +19,9 @@ AGILE I2C BME280.
 Description: Class to communicate with the BME280
              in the AGILE Maker's Shield. This allows to
              read the temperature, humidity and pressure
-             from the sensor.
+             from the sensor. The calibration coefficients are
+             kept in a cache file, checked against the CRC of the
+             calibration registers on every start.
 Author: David Palomares <d.palomares@libelium.com>
 Version: 0.1
 Date: March 2017
@@ -28,7 +30,16 @@ Date: March 2017
 
 # --- Imports -----------
 from agile_makers_shield.buses.i2c import i2c_bus
+import json
+import os
+import struct
+import threading
 import time
+import zlib
+try:
+    import numpy
+except ImportError:  # The batch compensation falls back to the scalar path
+    numpy = None
 # -----------------------
 
 
@@ -44,6 +55,14 @@ BME280_OVERSAMP_2X = 0x02
 BME280_OVERSAMP_4X = 0x03
 BME280_OVERSAMP_8X = 0x04
 BME280_OVERSAMP_16X = 0x05
+BME280_OVERSAMPS = [
+    BME280_OVERSAMP_SKIPPED,
+    BME280_OVERSAMP_1X,
+    BME280_OVERSAMP_2X,
+    BME280_OVERSAMP_4X,
+    BME280_OVERSAMP_8X,
+    BME280_OVERSAMP_16X
+]
 # I2C Addresses
 BME280_REG_DIG_T1 = 0x88  # 2 bytes LE
 BME280_REG_DIG_T2 = 0x8A  # 2 bytes LE signed
@@ -73,6 +92,62 @@ BME280_REG_CONFIG = 0xF5  # Configuration
 BME280_REG_PRESSURE = 0xF7  # 2 bytes
 BME280_REG_TEMPERATURE = 0xFA  # 2 bytes
 BME280_REG_HUMIDITY = 0xFD  # 2 bytes
+# Register blocks
+BME280_REG_CALIB_00 = 0x88  # dig_T1 to dig_H1
+BME280_CALIB_00_SIZE = 26
+BME280_REG_CALIB_26 = 0xE1  # dig_H2 to dig_H6
+BME280_CALIB_26_SIZE = 7
+BME280_REG_DATA = 0xF7  # Pressure, temperature and humidity
+BME280_DATA_SIZE = 8
+BME280_CALIB_00_FORMAT = "<HhhHhhhhhhhh"
+# Modes
+BME280_MODE_SLEEP = 0x00
+BME280_MODE_FORCED = 0x01
+BME280_MODE_NORMAL = 0x03
+BME280_STAT_MEASURING = 0x08
+# Standby times of the normal mode
+BME280_STANDBY_0_5 = 0x00  # 0.5 ms
+BME280_STANDBY_62_5 = 0x01  # 62.5 ms
+BME280_STANDBY_125 = 0x02  # 125 ms
+BME280_STANDBY_250 = 0x03  # 250 ms
+BME280_STANDBY_500 = 0x04  # 500 ms
+BME280_STANDBY_1000 = 0x05  # 1000 ms
+BME280_STANDBY_10 = 0x06  # 10 ms
+BME280_STANDBY_20 = 0x07  # 20 ms
+BME280_STANDBY_TIME = {  # Seconds
+    BME280_STANDBY_0_5: 0.0005,
+    BME280_STANDBY_62_5: 0.0625,
+    BME280_STANDBY_125: 0.125,
+    BME280_STANDBY_250: 0.25,
+    BME280_STANDBY_500: 0.5,
+    BME280_STANDBY_1000: 1.0,
+    BME280_STANDBY_10: 0.01,
+    BME280_STANDBY_20: 0.02
+}
+# IIR filter coefficients
+BME280_FILTER_OFF = 0x00
+BME280_FILTER_2 = 0x01
+BME280_FILTER_4 = 0x02
+BME280_FILTER_8 = 0x03
+BME280_FILTER_16 = 0x04
+BME280_FILTERS = [
+    BME280_FILTER_OFF,
+    BME280_FILTER_2,
+    BME280_FILTER_4,
+    BME280_FILTER_8,
+    BME280_FILTER_16
+]
+BME280_POLL_MIN = 0.001  # Minimum seconds between status polls
+# Calibration cache
+BME280_CACHE_FILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "agile_makers_shield", "bme280.json"
+)
+BME280_CACHE_VERSION = 1
+BME280_COEFFICIENTS = [
+    "T1", "T2", "T3",
+    "P1", "P2", "P3", "P4", "P5", "P6", "P7", "P8", "P9",
+    "H1", "H2", "H3", "H4", "H5", "H6"
+]
 # -----------------------
 
 
@@ -80,13 +155,26 @@ BME280_REG_HUMIDITY = 0xFD  # 2 bytes
 class BME280():
     """Read from and write to the BME280 via I2C."""
 
-    def __init__(self):
-        """Init method."""
+    def __init__(self, cache_file=BME280_CACHE_FILE):
+        """Init method.
+
+        The calibration cache is not used if cache_file is None.
+        """
         self._bus = i2c_bus.I2C_Bus(BME280_ADDRESS)
-        if not self._check:
-            raise IOError("Could not connect to the I2C Bus")
+        self._cacheFile = cache_file
         self._readCalibration()
         self._t_fine = 0
+        self._normal = None  # Settings of the normal mode, if running
+        self._normalReady = False
+        self._lock = threading.RLock()
+
+    def lock_decorator(func):
+        """Decorator to run a measurement and its reads atomically."""
+        def lock_wrapper(self, *args, **kwargs):
+            with self._lock:
+                return func(self, *args, **kwargs)
+
+        return lock_wrapper
 
     def close(self):
         """Close the I2C communication."""
@@ -113,48 +201,87 @@ class BME280():
         return sint16
 
     def _readCalibration(self):
-        """Read the calibration values stored in the BME280."""
-        # Temperature
-        dig_T1 = self._bus.read(BME280_REG_DIG_T1, 2)
-        dig_T2 = self._bus.read(BME280_REG_DIG_T2, 2)
-        dig_T3 = self._bus.read(BME280_REG_DIG_T3, 2)
-        self._dig_T1 = (dig_T1[1] << 8) | dig_T1[0]
-        self._dig_T2 = self._utosint16((dig_T2[1] << 8) | dig_T2[0])
-        self._dig_T3 = self._utosint16((dig_T3[1] << 8) | dig_T3[0])
-        # Pressure
-        dig_P1 = self._bus.read(BME280_REG_DIG_P1, 2)
-        dig_P2 = self._bus.read(BME280_REG_DIG_P2, 2)
-        dig_P3 = self._bus.read(BME280_REG_DIG_P3, 2)
-        dig_P4 = self._bus.read(BME280_REG_DIG_P4, 2)
-        dig_P5 = self._bus.read(BME280_REG_DIG_P5, 2)
-        dig_P6 = self._bus.read(BME280_REG_DIG_P6, 2)
-        dig_P7 = self._bus.read(BME280_REG_DIG_P7, 2)
-        dig_P8 = self._bus.read(BME280_REG_DIG_P8, 2)
-        dig_P9 = self._bus.read(BME280_REG_DIG_P9, 2)
-        self._dig_P1 = (dig_P1[1] << 8) | dig_P1[0]
-        self._dig_P2 = self._utosint16((dig_P2[1] << 8) | dig_P2[0])
-        self._dig_P3 = self._utosint16((dig_P3[1] << 8) | dig_P3[0])
-        self._dig_P4 = self._utosint16((dig_P4[1] << 8) | dig_P4[0])
-        self._dig_P5 = self._utosint16((dig_P5[1] << 8) | dig_P5[0])
-        self._dig_P6 = self._utosint16((dig_P6[1] << 8) | dig_P6[0])
-        self._dig_P7 = self._utosint16((dig_P7[1] << 8) | dig_P7[0])
-        self._dig_P8 = self._utosint16((dig_P8[1] << 8) | dig_P8[0])
-        self._dig_P9 = self._utosint16((dig_P9[1] << 8) | dig_P9[0])
+        """Read the chip ID and the calibration values in one transaction.
+
+        The coefficients are taken from the cache if the CRC of the
+        calibration registers matches, otherwise they are decoded and
+        the cache is updated.
+        """
+        blocks = self._bus.readBlocks([
+            (BME280_REG_CHIP_ID, 1),
+            (BME280_REG_CALIB_00, BME280_CALIB_00_SIZE),
+            (BME280_REG_CALIB_26, BME280_CALIB_26_SIZE)
+        ])
+        if (not blocks) or (blocks[0][0] != BME280_CHECK_BYTE):
+            raise IOError("Could not connect to the I2C Bus")
+        chipId, calib, calibHum = blocks
+        crc = zlib.crc32(calib + calibHum)
+        key = "0x{:02X}".format(chipId[0])
+        cache = self._loadCache()
+        entry = cache.get(key)
+        if entry and (entry.get("crc") == crc):
+            try:
+                for name in BME280_COEFFICIENTS:
+                    setattr(self, "_dig_" + name, entry["coefficients"][name])
+                return
+            except (KeyError, TypeError):
+                pass
+        self._decodeCalibration(calib, calibHum)
+        cache[key] = {
+            "crc": crc,
+            "coefficients": {
+                name: getattr(self, "_dig_" + name)
+                for name in BME280_COEFFICIENTS
+            }
+        }
+        self._saveCache(cache)
+
+    def _loadCache(self):
+        """Return the calibration cache, empty if missing or outdated."""
+        if self._cacheFile is None:
+            return {}
+        try:
+            with open(self._cacheFile, "r") as f:
+                cache = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        if (not isinstance(cache, dict)) or \
+                (cache.get("version") != BME280_CACHE_VERSION):
+            return {}
+        return cache
+
+    def _saveCache(self, cache):
+        """Write the calibration cache, ignoring the errors."""
+        if self._cacheFile is None:
+            return
+        cache["version"] = BME280_CACHE_VERSION
+        tmp = self._cacheFile + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self._cacheFile), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(cache, f, sort_keys=True)
+            os.replace(tmp, self._cacheFile)
+        except (IOError, OSError):
+            pass
+
+    def _decodeCalibration(self, calib, calibHum):
+        """Decode the calibration blocks at 0x88 and 0xE1."""
+        # Temperature and pressure
+        (self._dig_T1, self._dig_T2, self._dig_T3,
+         self._dig_P1, self._dig_P2, self._dig_P3,
+         self._dig_P4, self._dig_P5, self._dig_P6,
+         self._dig_P7, self._dig_P8, self._dig_P9) = struct.unpack_from(
+            BME280_CALIB_00_FORMAT, calib
+        )
         # Humidity
-        dig_H1 = self._bus.read(BME280_REG_DIG_H1, 1)
-        dig_H2 = self._bus.read(BME280_REG_DIG_H2, 2)
-        dig_H3 = self._bus.read(BME280_REG_DIG_H3, 1)
-        dig_H4 = self._bus.read(BME280_REG_DIG_H4, 2)
-        dig_H5 = self._bus.read(BME280_REG_DIG_H5, 2)
-        dig_H6 = self._bus.read(BME280_REG_DIG_H6, 1)
-        self._dig_H1 = dig_H1[0]
-        self._dig_H2 = self._utosint16((dig_H2[1] << 8) | dig_H2[0])
-        self._dig_H3 = dig_H3[0]
-        self._dig_H4 = ((self._utosint8(dig_H4[0]) << 24) >> 20) | \
-            (dig_H4[1] & 0x0F)
-        self._dig_H5 = ((self._utosint8(dig_H5[1]) << 24) >> 20) | \
-            ((dig_H5[0] >> 4) & 0x0F)
-        self._dig_H6 = self._utosint8(dig_H6[0])
+        self._dig_H1 = calib[BME280_REG_DIG_H1 - BME280_REG_CALIB_00]
+        self._dig_H2 = self._utosint16((calibHum[1] << 8) | calibHum[0])
+        self._dig_H3 = calibHum[2]
+        self._dig_H4 = (self._utosint8(calibHum[3]) << 4) | \
+            (calibHum[4] & 0x0F)
+        self._dig_H5 = (self._utosint8(calibHum[5]) << 4) | \
+            ((calibHum[4] >> 4) & 0x0F)
+        self._dig_H6 = self._utosint8(calibHum[6])
 
     def _compensateTemp(self, utemp):
         """Compensate the temperature with the calibration parameters."""
@@ -212,40 +339,267 @@ class BME280():
         hum = hum >> 12
         return hum
 
-    def getTemperature(self, oversample=BME280_OVERSAMP_16X):
-        """Read the temperature from the BME280 with the data compensated."""
-        # Set the BME280
-        self._bus.write(BME280_REG_CTRL_HUMIDITY, [oversample])
-        oversample_control = (oversample << 5) | (oversample << 2) | 1
+    def compensateBatch(self, upress, utemp, uhum):
+        """Compensate sequences of raw pressure, temperature and humidity.
+
+        Return a dict with NumPy arrays of the temperature (C), humidity
+        (%RH) and pressure (Pa), computed in one vectorised pass with
+        the same integer arithmetic as the scalar path. Without NumPy,
+        the scalar path is used and lists are returned. The t_fine of
+        the last measurement is not modified.
+        """
+        if numpy is None:
+            return self._compensateBatchScalar(upress, utemp, uhum)
+        upress = numpy.asarray(upress, dtype=numpy.int64)
+        utemp = numpy.asarray(utemp, dtype=numpy.int64)
+        uhum = numpy.asarray(uhum, dtype=numpy.int64)
+        # Temperature
+        var1 = (((utemp >> 3) - (self._dig_T1 << 1)) * self._dig_T2) >> 11
+        var2 = (((((utemp >> 4) - self._dig_T1) *
+                ((utemp >> 4) - self._dig_T1)) >> 12) * self._dig_T3) >> 14
+        t_fine = var1 + var2
+        temperature = (((t_fine * 5) + 128) >> 8) / 100
+        # Pressure
+        var1 = t_fine - 128000
+        var2 = var1 * var1 * self._dig_P6
+        var2 = var2 + ((var1 * self._dig_P5) << 17)
+        var2 = var2 + (self._dig_P4 << 35)
+        var1 = (
+            ((var1 * var1 * self._dig_P3) >> 8) +
+            ((var1 * self._dig_P2) << 12)
+        )
+        var1 = (((1 << 47) + var1) * self._dig_P1) >> 33
+        zero = (var1 == 0)  # Avoid div by 0
+        press = 1048576 - upress
+        press = (((press << 31) - var2) * 3125) / numpy.where(zero, 1, var1)
+        var1 = (self._dig_P9 * (press / 8192) * (press / 8192)) / 33554432
+        var2 = (self._dig_P8 * press) / 524288
+        press = ((press + var1 + var2) / 256) + (self._dig_P7 << 4)
+        pressure = numpy.where(zero, 0, press) / 256
+        # Humidity
+        hum = t_fine - 76800
+        hum = (
+            (
+                ((
+                    (uhum << 14) -
+                    (self._dig_H4 << 20) -
+                    (self._dig_H5 * hum)
+                ) + 16384) >> 15
+            ) *
+            (
+                ((((
+                    ((hum * self._dig_H6) >> 10) *
+                    (((hum * self._dig_H3) >> 11) + 32768)
+                ) >> 10) + 2097152) * self._dig_H2 + 8192) >> 14
+            )
+        )
+        hum = hum - (((((hum >> 15) * (hum >> 15)) >> 7) * self._dig_H1) >> 4)
+        hum = numpy.clip(hum, 0, 419430400) >> 12
+        humidity = hum / 1024
+        return {
+            "temperature": temperature,
+            "humidity": humidity,
+            "pressure": pressure
+        }
+
+    def _compensateBatchScalar(self, upress, utemp, uhum):
+        """Compensate sequences of raw data with the scalar path."""
+        t_fine = self._t_fine
+        result = {"temperature": [], "humidity": [], "pressure": []}
+        for up, ut, uh in zip(upress, utemp, uhum):
+            result["temperature"].append(self._compensateTemp(int(ut)))
+            result["humidity"].append(self._compensateHum(int(uh)) / 1024)
+            result["pressure"].append(self._compensatePress(int(up)) / 256)
+        self._t_fine = t_fine
+        return result
+
+    def _measureTime(self, osrs_t, osrs_h, osrs_p):
+        """Return the maximum time of a measurement in seconds."""
+        meassure_time = 1.25 + (2.3 * (1 << (osrs_t - 1)))
+        for osrs in [osrs_h, osrs_p]:
+            if osrs != BME280_OVERSAMP_SKIPPED:
+                meassure_time = meassure_time + (2.3 * (1 << (osrs - 1)))
+                meassure_time = meassure_time + 0.575
+        return meassure_time / 1000
+
+    def _checkOversampling(self, osrs_t, osrs_h, osrs_p):
+        """Raise ValueError if an oversampling is invalid."""
+        for osrs in [osrs_t, osrs_h, osrs_p]:
+            if osrs not in BME280_OVERSAMPS:
+                raise ValueError("Invalid oversampling")
+        if osrs_t == BME280_OVERSAMP_SKIPPED:
+            raise ValueError("The temperature can not be skipped")
+
+    def _setControl(self, osrs_t, osrs_h, osrs_p, mode):
+        """Write the oversamplings and the mode."""
+        # The humidity control is applied when the measure control is set
+        self._bus.write(BME280_REG_CTRL_HUMIDITY, [osrs_h])
+        oversample_control = (osrs_t << 5) | (osrs_p << 2) | mode
         self._bus.write(BME280_REG_CTRL_MEAS, [oversample_control])
+
+    def _measure(self, osrs_t, osrs_h=None, osrs_p=None):
+        """Take a forced measurement and return the raw data.
+
+        The humidity and pressure use the temperature oversampling
+        if omitted. The normal mode is resumed afterwards if it was
+        running.
+        """
+        if osrs_h is None:
+            osrs_h = osrs_t
+        if osrs_p is None:
+            osrs_p = osrs_t
+        self._checkOversampling(osrs_t, osrs_h, osrs_p)
+        # The mode is only changed from sleep mode
+        self._bus.write(BME280_REG_CTRL_MEAS, [BME280_MODE_SLEEP])
+        self._setControl(osrs_t, osrs_h, osrs_p, BME280_MODE_FORCED)
         # Wait for the meassurement
-        meassure_time = (1.25 + (2.3 * (1 << oversample))) / 1000
-        time.sleep(meassure_time)
-        # Read and compensate the temperature
-        tempReg = self._bus.read(BME280_REG_TEMPERATURE, 3)
-        utemp = ((tempReg[0] << 16) | (tempReg[1] << 8) | tempReg[2]) >> 4
+        time.sleep(self._measureTime(osrs_t, osrs_h, osrs_p))
+        data = self._readData()
+        if self._normal is not None:
+            self._resumeNormal(osrs_h)
+        return data
+
+    def _resumeNormal(self, osrs_h):
+        """Resume the normal mode after a forced measurement.
+
+        The sensor is back in sleep mode and the configuration is kept,
+        so only the measure control is written (and the humidity
+        control before it, if the forced measurement changed it).
+        """
+        normal = self._normal
+        if osrs_h != normal["osrs_h"]:
+            self._bus.write(BME280_REG_CTRL_HUMIDITY, [normal["osrs_h"]])
+        oversample_control = (normal["osrs_t"] << 5) | \
+            (normal["osrs_p"] << 2) | BME280_MODE_NORMAL
+        self._bus.write(BME280_REG_CTRL_MEAS, [oversample_control])
+
+    def _readData(self):
+        """Read the raw pressure, temperature and humidity in one burst."""
+        data = self._bus.readBlock(BME280_REG_DATA, BME280_DATA_SIZE)
+        if not data:
+            raise IOError("Could not read the data of the BME280")
+        upress = ((data[0] << 16) | (data[1] << 8) | data[2]) >> 4
+        utemp = ((data[3] << 16) | (data[4] << 8) | data[5]) >> 4
+        uhum = (data[6] << 8) | data[7]
+        return upress, utemp, uhum
+
+    def _compensate(self, data, osrs_h, osrs_p):
+        """Compensate the raw data of one measurement, return a dict."""
+        upress, utemp, uhum = data
+        result = {}
+        result["temperature"] = self._compensateTemp(utemp)
+        if osrs_h != BME280_OVERSAMP_SKIPPED:
+            # _compensateHum returns humidity in Q22.10 format
+            result["humidity"] = self._compensateHum(uhum) / 1024
+        if osrs_p != BME280_OVERSAMP_SKIPPED:
+            # _compensatePres returns pressure in Q24.8 format
+            result["pressure"] = self._compensatePress(upress) / 256
+        return result
+
+    @lock_decorator
+    def readAll(self, osrs_t=BME280_OVERSAMP_16X, osrs_h=BME280_OVERSAMP_16X,
+                osrs_p=BME280_OVERSAMP_16X):
+        """Read the temperature, humidity and pressure of one measurement.
+
+        Return a dict with the compensated temperature (C), humidity
+        (%RH) and pressure (Pa), all of them from the same t_fine. The
+        quantities with the oversampling skipped are not returned.
+        """
+        data = self._measure(osrs_t, osrs_h, osrs_p)
+        return self._compensate(data, osrs_h, osrs_p)
+
+    @lock_decorator
+    def startNormal(self, osrs_t=BME280_OVERSAMP_16X,
+                    osrs_h=BME280_OVERSAMP_16X, osrs_p=BME280_OVERSAMP_16X,
+                    standby=BME280_STANDBY_62_5, iir=BME280_FILTER_OFF):
+        """Start measuring continuously in normal mode."""
+        self._checkOversampling(osrs_t, osrs_h, osrs_p)
+        if standby not in BME280_STANDBY_TIME.keys():
+            raise ValueError("Invalid standby time")
+        if iir not in BME280_FILTERS:
+            raise ValueError("Invalid IIR filter")
+        # The configuration is only written in sleep mode
+        self._bus.write(BME280_REG_CTRL_MEAS, [BME280_MODE_SLEEP])
+        self._bus.write(BME280_REG_CONFIG, [(standby << 5) | (iir << 2)])
+        self._setControl(osrs_t, osrs_h, osrs_p, BME280_MODE_NORMAL)
+        self._normal = {
+            "osrs_t": osrs_t, "osrs_h": osrs_h, "osrs_p": osrs_p,
+            "standby": standby, "iir": iir
+        }
+        self._normalReady = False
+
+    @lock_decorator
+    def stopNormal(self):
+        """Stop the normal mode."""
+        self._bus.write(BME280_REG_CTRL_MEAS, [BME280_MODE_SLEEP])
+        self._normal = None
+
+    def _waitMeasurement(self, fresh):
+        """Poll the status until a measurement is completed.
+
+        With fresh, the measurement must start after the call.
+        """
+        normal = self._normal
+        measure = self._measureTime(
+            normal["osrs_t"], normal["osrs_h"], normal["osrs_p"]
+        )
+        interval = max(measure / 8, BME280_POLL_MIN)
+        timeout = 2 * (measure + BME280_STANDBY_TIME[normal["standby"]])
+        measuring = not fresh
+        ts = time.time()
+        while (time.time() - ts) < timeout:
+            stat = self._bus.read(BME280_REG_STAT, 1)
+            if not stat:
+                raise IOError("Could not read the status of the BME280")
+            if stat[0] & BME280_STAT_MEASURING:
+                measuring = True
+            elif measuring:
+                return
+            time.sleep(interval)
+        raise IOError("Timeout waiting for a measurement of the BME280")
+
+    @lock_decorator
+    def readLatest(self, fresh=False):
+        """Read the last measurement of the normal mode.
+
+        Return the same dict as readAll. Only the first read after
+        starting the normal mode waits for a measurement, unless a
+        fresh one is requested.
+        """
+        if self._normal is None:
+            raise IOError("The normal mode is not running")
+        if fresh or not self._normalReady:
+            self._waitMeasurement(fresh)
+            self._normalReady = True
+        data = self._readData()
+        return self._compensate(
+            data, self._normal["osrs_h"], self._normal["osrs_p"]
+        )
+
+    @lock_decorator
+    def getTemperature(self, oversample=BME280_OVERSAMP_16X):
+        """Read the temperature from the BME280 with the data compensated."""
+        upress, utemp, uhum = self._measure(oversample)
         temp = self._compensateTemp(utemp)
         return temp
 
+    @lock_decorator
     def getHumidity(self, oversample=BME280_OVERSAMP_16X):
         """Read the humidity from the BME280 with the data compensated."""
-        # Read the temperature to set the t_fine
-        self.getTemperature(oversample)
-        # Read and compensate the humidity
-        humReg = self._bus.read(BME280_REG_HUMIDITY, 2)
-        uhum = (humReg[0] << 8) | humReg[1]
+        upress, utemp, uhum = self._measure(oversample)
+        # The temperature sets the t_fine
+        self._compensateTemp(utemp)
         hum = self._compensateHum(uhum)
         # _compensateHum returns humidity in Q22.10 format
         hum = hum / 1024
         return hum
 
+    @lock_decorator
     def getPressure(self, oversample=BME280_OVERSAMP_16X):
         """Read the pressure from the BME280 with the data compensated."""
-        # Read the temperature to set the t_fine
-        self.getTemperature(oversample)
-        # Read and compensate the pressure
-        pressReg = self._bus.read(BME280_REG_PRESSURE, 3)
-        upress = ((pressReg[0] << 16) | (pressReg[1] << 8) | pressReg[2]) >> 4
+        upress, utemp, uhum = self._measure(oversample)
+        # The temperature sets the t_fine
+        self._compensateTemp(utemp)
         press = self._compensatePress(upress)
         # _compensatePres returns pressure in Q24.8 format
         press = press / 256
@@ -0,0 +1,174 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE I2C Arbiter.
+
+Description: Class that schedules the transactions of
+             every device driver on the shared I2C bus. The
+             requests are granted by priority class (interrupt
+             service and UART drains, then user requests, then
+             background sampling) and in round robin between the
+             devices of the same class. Only one instance of this
+             class can be created.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from agile_makers_shield.utils import singleton
+import collections
+import contextlib
+import threading
+import time
+# -----------------------
+
+
+# --- Variables ---------
+PRIORITY_INTERRUPT = 0  # Interrupt service and UART drains
+PRIORITY_USER = 1  # Requests from DBus clients
+PRIORITY_BACKGROUND = 2  # Background sampling
+PRIORITIES = [PRIORITY_INTERRUPT, PRIORITY_USER, PRIORITY_BACKGROUND]
+PRIORITY_DEFAULT = PRIORITY_USER
+QUEUE_SIZE = 32  # Waiting user and background transactions
+# -----------------------
+
+
+# --- Classes -----------
+class I2C_ArbiterFull(IOError):
+    """The queue of the arbiter is full."""
+
+
+class I2C_Arbiter(metaclass=singleton.Singleton):
+    """Grant the I2C bus to one transaction at a time."""
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        """Init method."""
+        self._queueSize = queue_size
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._owner = None
+        self._depth = 0
+        self._waiting = 0
+        # For each priority, the devices in round robin order and the
+        # tickets waiting for each device
+        self._devices = {p: collections.deque() for p in PRIORITIES}
+        self._tickets = {p: {} for p in PRIORITIES}
+        self._stats = {p: {"grants": 0, "wait_total": 0.0, "wait_max": 0.0}
+                       for p in PRIORITIES}
+
+    def _getPriority(self):
+        """Return the priority of the transactions of this thread."""
+        return getattr(self._local, "priority", PRIORITY_DEFAULT)
+
+    @contextlib.contextmanager
+    def priority(self, priority):
+        """Set the priority of the transactions run inside the block."""
+        if priority not in PRIORITIES:
+            raise ValueError("Invalid priority")
+        previous = self._getPriority()
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def _next(self):
+        """Return the ticket that must be granted next, if any."""
+        for p in PRIORITIES:
+            if self._devices[p]:
+                return self._tickets[p][self._devices[p][0]][0]
+        return None
+
+    def _enqueue(self, ticket):
+        """Add a ticket to the queue of its priority and device."""
+        priority, device = ticket[0], ticket[1]
+        if device not in self._tickets[priority]:
+            self._tickets[priority][device] = collections.deque()
+            self._devices[priority].append(device)
+        self._tickets[priority][device].append(ticket)
+        self._waiting = self._waiting + 1
+
+    def _dequeue(self, ticket):
+        """Remove a granted ticket and rotate its device to the end."""
+        priority, device = ticket[0], ticket[1]
+        devices = self._devices[priority]
+        tickets = self._tickets[priority][device]
+        tickets.popleft()
+        devices.popleft()
+        if tickets:
+            devices.append(device)
+        else:
+            del self._tickets[priority][device]
+        self._waiting = self._waiting - 1
+
+    def acquire(self, device, priority=None):
+        """Wait until the bus is granted to a transaction of the device."""
+        me = threading.get_ident()
+        if priority is None:
+            priority = self._getPriority()
+        with self._cond:
+            if self._owner == me:
+                self._depth = self._depth + 1
+                return
+            if (priority != PRIORITY_INTERRUPT) and \
+                    (self._waiting >= self._queueSize):
+                raise I2C_ArbiterFull("I2C arbiter queue is full")
+            ticket = (priority, device, me)
+            ts = time.perf_counter()
+            self._enqueue(ticket)
+            while (self._owner is not None) or (self._next() is not ticket):
+                self._cond.wait()
+            self._dequeue(ticket)
+            self._owner = me
+            self._depth = 1
+            self._local.granted = time.perf_counter()
+            wait = time.perf_counter() - ts
+            stats = self._stats[priority]
+            stats["grants"] = stats["grants"] + 1
+            stats["wait_total"] = stats["wait_total"] + wait
+            stats["wait_max"] = max(stats["wait_max"], wait)
+
+    def release(self):
+        """Release the bus and wake up the next transaction."""
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("I2C arbiter released by a non owner")
+            self._depth = self._depth - 1
+            if self._depth == 0:
+                self._local.held = self.getHeldTime() + \
+                    (time.perf_counter() - self._local.granted)
+                self._owner = None
+                self._cond.notify_all()
+
+    def getHeldTime(self):
+        """Return the seconds this thread has held the bus."""
+        return getattr(self._local, "held", 0.0)
+
+    @contextlib.contextmanager
+    def grant(self, device, priority=None):
+        """Hold the bus for the transaction run inside the block."""
+        self.acquire(device, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def getStats(self):
+        """Return the grants and wait seconds of each priority."""
+        with self._cond:
+            return {p: dict(stats) for p, stats in self._stats.items()}
+# -----------------------
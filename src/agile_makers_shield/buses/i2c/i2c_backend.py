@@ -0,0 +1,204 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE I2C Backend.
+
+Description: Interface of the backends that move the
+             bytes of the I2C_Bus class, and the backend of the
+             Raspberry Pi I2C bus (Linux i2c-dev). A backend opens
+             one handle per device address; the handle reads,
+             writes and runs combined transactions, raising
+             IOError on failures. Retries and chunking are left
+             to the I2C_Bus class.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from abc import ABCMeta, abstractmethod
+import io
+import fcntl
+import ctypes
+# -----------------------
+
+
+# --- Variables ---------
+I2C_SLAVE = 0x0703
+I2C_FUNCS = 0x0705
+I2C_RDWR = 0x0707
+I2C_FUNC_I2C = 0x00000001
+I2C_M_WR = 0x0000
+I2C_M_RD = 0x0001
+I2C_RDWR_MAX_MSGS = 42  # Kernel limit of messages per I2C_RDWR call
+I2C_DEVICE = "/dev/i2c-1"
+I2C_MODE_LEGACY = 0  # Two file objects, pointer write and reads apart
+I2C_MODE_RDWR = 1  # One file object, combined I2C_RDWR transactions
+I2C_MODES = [I2C_MODE_LEGACY, I2C_MODE_RDWR]
+# -----------------------
+
+
+# --- Classes -----------
+class I2C_Msg(ctypes.Structure):
+    """Message of an I2C_RDWR transaction (struct i2c_msg)."""
+
+    _fields_ = [
+        ("addr", ctypes.c_uint16),
+        ("flags", ctypes.c_uint16),
+        ("len", ctypes.c_uint16),
+        ("buf", ctypes.POINTER(ctypes.c_uint8))
+    ]
+
+
+class I2C_RdwrData(ctypes.Structure):
+    """Argument of the I2C_RDWR ioctl (struct i2c_rdwr_ioctl_data)."""
+
+    _fields_ = [
+        ("msgs", ctypes.POINTER(I2C_Msg)),
+        ("nmsgs", ctypes.c_uint32)
+    ]
+
+
+class I2C_Backend(metaclass=ABCMeta):
+    """Class to be extended by the I2C backends."""
+
+    @abstractmethod
+    def open(self, address, mode):
+        """Return the I2C_Handle of the device with the given address."""
+        pass
+
+    def addInterruptCallback(self, callback, channel):
+        """Call callback(channel) on ATMega interrupts, if supported.
+
+        Return False if the interrupts must be read from the GPIO.
+        """
+        return False
+
+
+class I2C_Handle(metaclass=ABCMeta):
+    """Class to be extended by the device handles of the backends."""
+
+    @property
+    @abstractmethod
+    def mode(self):
+        """Return the transaction mode of the handle."""
+        return None
+
+    @abstractmethod
+    def readinto(self, buffer):
+        """Read from the device into a buffer, return the bytes read."""
+        pass
+
+    @abstractmethod
+    def write(self, data):
+        """Write a buffer of bytes to the device."""
+        pass
+
+    @abstractmethod
+    def transfer(self, msgs):
+        """Run a list of (flags, buffer) messages as one transaction."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Close the handle."""
+        pass
+
+
+class Linux_I2C_Backend(I2C_Backend):
+    """Backend of the I2C bus of the Raspberry Pi."""
+
+    def __init__(self, path=I2C_DEVICE):
+        """Init method."""
+        self._path = path
+
+    def open(self, address, mode):
+        """Return the I2C_Handle of the device with the given address."""
+        return Linux_I2C_Handle(self._path, address, mode)
+
+
+class Linux_I2C_Handle(I2C_Handle):
+    """Device handle over /dev/i2c-N."""
+
+    def __init__(self, path, address, mode):
+        """Init method."""
+        if mode not in I2C_MODES:
+            raise ValueError("Invalid I2C mode")
+        self._path = path
+        self._address = address
+        self._mode = I2C_MODE_LEGACY
+        if (mode == I2C_MODE_RDWR) and self._openRdwr():
+            self._mode = I2C_MODE_RDWR
+        else:
+            self._fr = io.open(path, "rb", buffering=0)
+            self._fw = io.open(path, "wb", buffering=0)
+            fcntl.ioctl(self._fr, I2C_SLAVE, address)
+            fcntl.ioctl(self._fw, I2C_SLAVE, address)
+
+    @property
+    def mode(self):
+        """Return the transaction mode of the handle."""
+        return self._mode
+
+    def _openRdwr(self):
+        """Open a single file for the device if I2C_RDWR is supported."""
+        f = io.open(self._path, "r+b", buffering=0)
+        funcs = ctypes.c_ulong(0)
+        try:
+            fcntl.ioctl(f, I2C_FUNCS, funcs)
+        except IOError:
+            f.close()
+            return False
+        if not (funcs.value & I2C_FUNC_I2C):
+            f.close()
+            return False
+        fcntl.ioctl(f, I2C_SLAVE, self._address)
+        self._fr = f
+        self._fw = f
+        return True
+
+    def readinto(self, buffer):
+        """Read from the device into a buffer, return the bytes read."""
+        return self._fr.readinto(buffer)
+
+    def write(self, data):
+        """Write a buffer of bytes to the device."""
+        return self._fw.write(data)
+
+    def transfer(self, msgs):
+        """Run a list of (flags, buffer) messages as one I2C_RDWR call."""
+        i2c_msgs = (I2C_Msg * len(msgs))()
+        bufs = []  # Keep the ctypes buffers alive during the ioctl
+        for i, (flags, buffer) in enumerate(msgs):
+            length = len(buffer)
+            if flags & I2C_M_RD:
+                buf = (ctypes.c_uint8 * length).from_buffer(buffer)
+            else:
+                buf = (ctypes.c_uint8 * length).from_buffer_copy(buffer)
+            bufs.append(buf)
+            i2c_msgs[i] = I2C_Msg(
+                self._address, flags, length,
+                ctypes.cast(buf, ctypes.POINTER(ctypes.c_uint8))
+            )
+        data = I2C_RdwrData(i2c_msgs, len(msgs))
+        fcntl.ioctl(self._fr, I2C_RDWR, data)
+
+    def close(self):
+        """Close the handle."""
+        self._fw.close()
+        if self._fr is not self._fw:
+            self._fr.close()
+# -----------------------
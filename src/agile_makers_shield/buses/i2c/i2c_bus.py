@@ -17,27 +17,74 @@
 AGILE I2C Bus.
 
 Description: Class to read from and write to
-             the I2C bus of the Raspberry Pi.
+             the I2C bus of the Raspberry Pi. Register reads
+             are sent as a single combined transaction (register
+             pointer write plus repeated-start reads) when the
+             backend supports it, falling back to separate write
+             and read calls otherwise. Every transaction is
+             granted by the I2C arbiter shared by all the devices
+             of the bus and retried by the retry policy, which
+             fails at once on devices known to be down. The bytes
+             are moved by a pluggable backend: the Linux i2c-dev
+             bus by default, or the in-memory simulator of the
+             shield.
 Author: David Palomares <d.palomares@libelium.com>
-Version: 0.1
+Version: 0.2
 Date: February 2016
 """
 
 
 # --- Imports -----------
-import io
-import fcntl
+from agile_makers_shield.buses.i2c import i2c_arbiter
+from agile_makers_shield.buses.i2c import i2c_backend
+from agile_makers_shield.buses.i2c import i2c_stats
+from agile_makers_shield.buses.i2c import i2c_retry
 import time
 # -----------------------
 
 
 # --- Variables ---------
-I2C_SLAVE = 0x0703
-I2C_DEVICE = "/dev/i2c-1"
+I2C_M_WR = i2c_backend.I2C_M_WR
+I2C_M_RD = i2c_backend.I2C_M_RD
+I2C_RDWR_MAX_MSGS = i2c_backend.I2C_RDWR_MAX_MSGS
+I2C_MODE_LEGACY = i2c_backend.I2C_MODE_LEGACY
+I2C_MODE_RDWR = i2c_backend.I2C_MODE_RDWR
+I2C_MODES = i2c_backend.I2C_MODES
+I2C_MODE_DEFAULT = I2C_MODE_RDWR
 BUFFER_SIZE = 32
-TRIES = 10
-GUARDTIME = 0.1
 ERROR = []
+_backend = None
+_retryPolicy = None
+# -----------------------
+
+
+# --- Functions ---------
+def setBackend(backend):
+    """Set the backend of the I2C buses opened from now on."""
+    global _backend
+    _backend = backend
+
+
+def getBackend():
+    """Return the backend in use, the Linux I2C bus if none was set."""
+    global _backend
+    if _backend is None:
+        _backend = i2c_backend.Linux_I2C_Backend()
+    return _backend
+
+
+def setRetryPolicy(policy):
+    """Set the retry policy of the I2C buses opened from now on."""
+    global _retryPolicy
+    _retryPolicy = policy
+
+
+def getRetryPolicy():
+    """Return the retry policy in use, the default one if none was set."""
+    global _retryPolicy
+    if _retryPolicy is None:
+        _retryPolicy = i2c_retry.RetryPolicy()
+    return _retryPolicy
 # -----------------------
 
 
@@ -45,71 +92,288 @@ ERROR = []
 class I2C_Bus:
     """Read from and write to the I2C bus."""
 
-    def __init__(self, device):
+    def __init__(self, device, mode=I2C_MODE_DEFAULT, arbiter=None,
+                 stats=None, retry=None):
         """Init method."""
-        self._fr = io.open(I2C_DEVICE, "rb", buffering=0)
-        self._fw = io.open(I2C_DEVICE, "wb", buffering=0)
-        fcntl.ioctl(self._fr, I2C_SLAVE, device)
-        fcntl.ioctl(self._fw, I2C_SLAVE, device)
+        if mode not in I2C_MODES:
+            raise ValueError("Invalid I2C mode")
+        self._device = device
+        if arbiter is None:
+            arbiter = i2c_arbiter.I2C_Arbiter()
+        self._arbiter = arbiter
+        if stats is None:
+            stats = i2c_stats.I2C_Stats()
+        self._stats = stats
+        if retry is None:
+            retry = getRetryPolicy()
+        self._retry = retry
+        self._retries = 0
+        self._handle = getBackend().open(device, mode)
+
+    def arbiter_decorator(func):
+        """Decorator to run a function as an arbitrated transaction."""
+        def arbiter_wrapper(self, *args, **kwargs):
+            with self._arbiter.grant(self._device):
+                return func(self, *args, **kwargs)
+
+        return arbiter_wrapper
 
+    def stats_decorator(op, transaction):
+        """Decorator to record the latency and retries of a transaction.
+
+        transaction(args, result) returns the register and the bytes of
+        the transaction from the arguments and the result of the call.
+        """
+        def stats_decorator_wrapper(func):
+            def stats_wrapper(self, *args, **kwargs):
+                if not self._stats.enabled:
+                    return func(self, *args, **kwargs)
+                self._retries = 0
+                ts = time.perf_counter()
+                result = func(self, *args, **kwargs)
+                elapsed = time.perf_counter() - ts
+                reg, size = transaction(args, result)
+                ok = bool(result) or (size == 0)
+                self._stats.record(
+                    self._device, reg, op, size if ok else 0,
+                    self._retries, elapsed, ok
+                )
+                return result
+
+            return stats_wrapper
+
+        return stats_decorator_wrapper
+
+    @property
+    def mode(self):
+        """Return the transaction mode in use."""
+        return self._handle.mode
+
+    @arbiter_decorator
+    @stats_decorator(i2c_stats.OP_READ,
+                     lambda args, result: (i2c_stats.REG_RAW, args[0]))
     def _readRaw(self, size):
         """Read a list of bytes of the specified size from the device."""
-        for i in range(TRIES):
+        buf = bytearray(size)
+        if self._readRawInto(buf) != size:
+            return ERROR
+        return list(buf)
+
+    @arbiter_decorator
+    @stats_decorator(i2c_stats.OP_WRITE,
+                     lambda args, result: (i2c_stats.REG_RAW, len(args[0])))
+    def writeRaw(self, data):
+        """Write a buffer of bytes to the device, without a register."""
+        return self._writeRaw(data)
+
+    def _attempt(self, func, *args):
+        """Run an operation of the handle with the retry policy.
+
+        Return the result of the operation or raise the IOError of
+        the last try.
+        """
+        self._retry.check(self._device)
+        attempt = 0
+        while True:
             try:
-                data = self._fr.read(size)
-            except IOError:
-                time.sleep(GUARDTIME)
+                result = func(*args)
+            except IOError as e:
+                attempt = attempt + 1
+                delay = self._retry.backoff(self._device, e, attempt)
+                if delay is None:
+                    raise
+                self._retries = self._retries + 1
+                if delay:
+                    time.sleep(delay)
             else:
-                return list(data)
-        return ERROR
+                self._retry.succeeded(self._device)
+                return result
+
+    def _readRawInto(self, buffer):
+        """Read from the device into a buffer, return the bytes read."""
+        try:
+            return self._attempt(self._handle.readinto, buffer)
+        except IOError:
+            return 0
 
     def _writeRaw(self, data):
-        """Write a list of bytes to the device."""
-        for i in range(TRIES):
-            try:
-                self._fw.write(bytes(data))
-            except IOError:
-                time.sleep(GUARDTIME)
-            else:
-                return True
-        return False
+        """Write a list or buffer of bytes to the device."""
+        try:
+            self._attempt(self._handle.write, data)
+        except IOError:
+            return False
+        return True
+
+    def _transfer(self, msgs):
+        """Run a list of I2C messages as one combined transaction."""
+        try:
+            self._attempt(self._handle.transfer, msgs)
+        except IOError:
+            return False
+        return True
+
+    def _readCombinedInto(self, reg, view):
+        """Read from a register with repeated-start messages."""
+        size = len(view)
+        msgs = [(I2C_M_WR, bytes((reg,)))]
+        for offset in range(0, size, BUFFER_SIZE):
+            msgs.append((I2C_M_RD, view[offset:(offset + BUFFER_SIZE)]))
+            if len(msgs) == I2C_RDWR_MAX_MSGS:
+                if not self._transfer(msgs):
+                    return 0
+                msgs = []
+        if msgs and not self._transfer(msgs):
+            return 0
+        return size
+
+    def _readSeparateInto(self, reg, view):
+        """Read from a register with a pointer write and separate reads."""
+        size = len(view)
+        if not self._writeRaw(bytes((reg,))):
+            return 0
+        for offset in range(0, size, BUFFER_SIZE):
+            chunk = view[offset:(offset + BUFFER_SIZE)]
+            if self._readRawInto(chunk) != len(chunk):
+                return 0
+        return size
+
+    @arbiter_decorator
+    @stats_decorator(i2c_stats.OP_READ,
+                     lambda args, result: (
+                         args[0], len(memoryview(args[1]).cast("B"))
+                     ))
+    def readinto(self, reg, buffer):
+        """Fill a writable buffer from a register, return the bytes read."""
+        view = memoryview(buffer).cast("B")
+        size = len(view)
+        if size == 0:
+            return 0
+        if self.mode == I2C_MODE_RDWR:
+            return self._readCombinedInto(reg, view)
+        return self._readSeparateInto(reg, view)
 
     def read(self, reg, size):
         """Read a list of bytes from a register of the device."""
-        if self._writeRaw([reg]):
-            data = []
-            for i in range(size // BUFFER_SIZE):
-                chunk = self._readRaw(BUFFER_SIZE)
-                if not chunk:
-                    return ERROR
-                data = data + chunk
-            if not ((size % BUFFER_SIZE) == 0):
-                chunk = self._readRaw(size % BUFFER_SIZE)
-                if not chunk:
-                    return ERROR
-                data = data + chunk
-            return data
+        buf = bytearray(size)
+        if self.readinto(reg, buf) != size:
+            return ERROR
+        return list(buf)
+
+    def readBlock(self, start, length):
+        """Read a block of consecutive registers in one transaction.
+
+        Return a bytearray, empty on error.
+        """
+        buf = bytearray(length)
+        if self.readinto(start, buf) != length:
+            return bytearray()
+        return buf
+
+    @arbiter_decorator
+    @stats_decorator(i2c_stats.OP_READ,
+                     lambda args, result: (args[0], len(result)))
+    def readUntil(self, reg, size, terminator=0x00, hint=BUFFER_SIZE):
+        """Read a register until the terminator, in chunks.
+
+        The first hint bytes are read like a register read, and then
+        chunks are read until the one with the terminator, without
+        writing the register pointer again. No more than size bytes are
+        read. Return a bytearray with the bytes read, ERROR on error.
+        """
+        buf = bytearray(size)
+        view = memoryview(buf)
+        offset = min(max(hint, 1), size)
+        if self.mode == I2C_MODE_RDWR:
+            read = self._readCombinedInto(reg, view[0:offset])
         else:
+            read = self._readSeparateInto(reg, view[0:offset])
+        if read != offset:
             return ERROR
+        start = 0
+        while (buf.find(terminator, start, offset) < 0) and (offset < size):
+            chunk = view[offset:(offset + BUFFER_SIZE)]
+            if self._readRawInto(chunk) != len(chunk):
+                return ERROR
+            start = offset
+            offset = offset + len(chunk)
+        return buf[0:offset]
 
-    def write(self, reg, data):
-        """Write a list of bytes to the register of the device."""
-        for i in range(len(data) // BUFFER_SIZE):
-            if not self._writeRaw(
-                [reg] + data[(i * BUFFER_SIZE):((i + 1) * BUFFER_SIZE)]
-            ):
-                return False
-            if not self._readRaw(1):
-                return False
-        if not ((len(data) % BUFFER_SIZE) == 0):
-            if not self._writeRaw([reg] + data[-(len(data) % BUFFER_SIZE):]):
-                return False
-            if not self._readRaw(1):
+    @arbiter_decorator
+    @stats_decorator(i2c_stats.OP_READ,
+                     lambda args, result: (
+                         args[0][0][0] if args[0] else i2c_stats.REG_RAW,
+                         sum([length for start, length in args[0]])
+                     ))
+    def readBlocks(self, blocks):
+        """Read several blocks of registers, in one transaction if possible.
+
+        The blocks are a list of (start, length). Return a list with a
+        bytearray per block, empty on error.
+        """
+        if not blocks:
+            return []
+        bufs = [bytearray(length) for start, length in blocks]
+        if self.mode == I2C_MODE_RDWR:
+            msgs = []
+            for (start, length), buf in zip(blocks, bufs):
+                view = memoryview(buf)
+                msgs.append((I2C_M_WR, bytes((start,))))
+                for offset in range(0, length, BUFFER_SIZE):
+                    msgs.append(
+                        (I2C_M_RD, view[offset:(offset + BUFFER_SIZE)])
+                    )
+            if len(msgs) <= I2C_RDWR_MAX_MSGS:
+                if not self._transfer(msgs):
+                    return ERROR
+                return bufs
+        for (start, length), buf in zip(blocks, bufs):
+            if self._readSeparateInto(start, memoryview(buf)) != length:
+                return ERROR
+        return bufs
+
+    @arbiter_decorator
+    @stats_decorator(i2c_stats.OP_WRITE,
+                     lambda args, result: (args[0], len(args[1])))
+    def write(self, reg, data, safe=False):
+        """Write a list or buffer of bytes to the register of the device.
+
+        The chunks are sent back to back (as one combined transaction
+        if the backend supports it) and acknowledged with a single read
+        at the end. In safe mode every chunk is acknowledged before the
+        next one is sent.
+        """
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+        view = memoryview(data).cast("B")
+        if len(view) == 0:
+            return True
+        ack = bytearray(1)
+        if safe:
+            frame = bytearray(BUFFER_SIZE + 1)
+            frame[0] = reg
+            for offset in range(0, len(view), BUFFER_SIZE):
+                frame[1:] = view[offset:(offset + BUFFER_SIZE)]
+                if not self._writeRaw(frame):
+                    return False
+                if not self._readRawInto(ack):
+                    return False
+            return True
+        prefix = bytes((reg,))
+        frames = [prefix + view[offset:(offset + BUFFER_SIZE)]
+                  for offset in range(0, len(view), BUFFER_SIZE)]
+        if self.mode == I2C_MODE_RDWR:
+            msgs = [(I2C_M_WR, frame) for frame in frames]
+            msgs.append((I2C_M_RD, ack))
+            for i in range(0, len(msgs), I2C_RDWR_MAX_MSGS):
+                if not self._transfer(msgs[i:(i + I2C_RDWR_MAX_MSGS)]):
+                    return False
+            return True
+        for frame in frames:
+            if not self._writeRaw(frame):
                 return False
-        return True
+        return self._readRawInto(ack) == 1
 
     def close(self):
         """Close the I2C communication."""
-        self._fw.close()
-        self._fr.close()
+        self._handle.close()
 # -----------------------
@@ -0,0 +1,132 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE I2C Retry Policy.
+
+Description: Class that decides how the I2C_Bus class
+             retries a failed transaction. The first retry is
+             immediate, the next ones wait an exponential backoff
+             with jitter, shorter for a NACK in the middle of a
+             transfer (EREMOTEIO) than for other errors, and a
+             missing device (ENXIO) is not retried. After a number
+             of failed transactions in a row a device is considered
+             down and its transactions fail at once until a trial
+             transaction succeeds.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import errno
+import random
+import threading
+import time
+# -----------------------
+
+
+# --- Variables ---------
+TRIES = 10
+ERRNO_FAST = [errno.EREMOTEIO, errno.EAGAIN]  # Transient, retried fast
+ERRNO_FATAL = [errno.ENXIO, errno.ENODEV]  # The device is not there
+BACKOFF_FAST = (0.0005, 0.01)  # Base and cap seconds of the fast errors
+BACKOFF_SLOW = (0.005, 0.1)  # Base and cap seconds of the rest of errors
+JITTER = 0.5  # Fraction of the backoff that is randomized
+BREAKER_THRESHOLD = 3  # Failed transactions in a row to open the breaker
+BREAKER_TIMEOUT = 5.0  # Seconds before a trial transaction is let through
+# -----------------------
+
+
+# --- Classes -----------
+class I2C_DeviceDown(IOError):
+    """The device is known to be down."""
+
+
+class RetryPolicy():
+    """Retry, backoff and circuit breaker of the I2C transactions."""
+
+    def __init__(self, tries=TRIES, fast=BACKOFF_FAST, slow=BACKOFF_SLOW,
+                 jitter=JITTER, threshold=BREAKER_THRESHOLD,
+                 timeout=BREAKER_TIMEOUT):
+        """Init method."""
+        self.tries = tries
+        self.fast = fast
+        self.slow = slow
+        self.jitter = jitter
+        self.threshold = threshold
+        self.timeout = timeout
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self._failures = {}  # Failed transactions in a row of each device
+        self._openUntil = {}  # Time until the breaker of a device is open
+
+    def check(self, device):
+        """Raise I2C_DeviceDown if the breaker of the device is open."""
+        with self._lock:
+            until = self._openUntil.get(device)
+            if until is None:
+                return
+            if time.monotonic() < until:
+                raise I2C_DeviceDown(
+                    errno.ENXIO,
+                    "I2C device 0x{:02X} is down".format(device)
+                )
+            # Half open, let one trial transaction through
+            del self._openUntil[device]
+            self._failures[device] = self.threshold - 1
+
+    def backoff(self, device, error, attempt):
+        """Return the seconds to wait before a retry, None to give up."""
+        code = getattr(error, "errno", None)
+        if (code in ERRNO_FATAL) or (attempt >= self.tries):
+            self._failed(device)
+            return None
+        if attempt == 1:
+            return 0
+        base, cap = self.fast if code in ERRNO_FAST else self.slow
+        delay = min(cap, base * (1 << (attempt - 2)))
+        return delay * (1 - (self.jitter * self._random.random()))
+
+    def succeeded(self, device):
+        """Close the breaker of a device after a successful transaction."""
+        if self._failures.get(device):
+            with self._lock:
+                self._failures[device] = 0
+
+    def _failed(self, device):
+        """Count a failed transaction and open the breaker if needed."""
+        with self._lock:
+            failures = self._failures.get(device, 0) + 1
+            self._failures[device] = failures
+            if failures >= self.threshold:
+                self._openUntil[device] = time.monotonic() + self.timeout
+
+    def isDown(self, device):
+        """Return if the breaker of a device is open."""
+        with self._lock:
+            until = self._openUntil.get(device)
+            return (until is not None) and (time.monotonic() < until)
+
+    def reset(self, device=None):
+        """Close the breaker of a device, or of all of them."""
+        with self._lock:
+            if device is None:
+                self._failures = {}
+                self._openUntil = {}
+            else:
+                self._failures.pop(device, None)
+                self._openUntil.pop(device, None)
+# -----------------------
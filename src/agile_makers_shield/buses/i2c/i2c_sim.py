@@ -0,0 +1,551 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE I2C Simulator.
+
+Description: In-memory backend of the I2C bus that
+             emulates the devices of the AGILE Maker's Shield:
+             the ATMega (UART FIFOs, interrupts, GPS buffers and
+             LEDs), the MCP3424 (conversion timing of each
+             resolution) and the BME280 (calibration, forced and
+             normal mode measurements). Transactions take a
+             configurable time and can fail on purpose, so the
+             drivers and the DBus server can be run and load
+             tested without the shield.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from agile_makers_shield.buses.i2c import i2c_backend
+from agile_makers_shield.buses.i2c import atmega
+from agile_makers_shield.buses.i2c import mcp3424
+from agile_makers_shield.buses.i2c import bme280
+import errno
+import math
+import os
+import random
+import struct
+import threading
+import time
+# -----------------------
+
+
+# --- Variables ---------
+# Bus
+DEFAULT_LATENCY = 0.0002  # Seconds of every transaction
+DEFAULT_BYTE_TIME = 0.00009  # Seconds of every byte (100 kHz)
+DEFAULT_ERROR_RATE = 0.0  # Probability of a failed transaction
+# ATMega
+UART_FIFO_SIZE = 512
+GPS_BUFFER_SIZE = 100
+GPS_CENTER = (41.6488, -0.8891)  # Latitude and longitude in degrees
+GPS_RADIUS = 0.001  # Radius of the simulated track in degrees
+GPS_LAP = 600  # Seconds to go around the track
+GPS_ALTITUDE = 207.0
+# MCP3424
+MCP3424_CONVERSION_TIME = {
+    mcp3424.MCP3424_RESOLUTION_12: 1 / 240,
+    mcp3424.MCP3424_RESOLUTION_14: 1 / 60,
+    mcp3424.MCP3424_RESOLUTION_16: 1 / 15,
+    mcp3424.MCP3424_RESOLUTION_18: 1 / 3.75
+}
+MCP3424_VOLTAGES = {  # Millivolts of each channel
+    mcp3424.MCP3424_CHANNEL_1: 500.0,
+    mcp3424.MCP3424_CHANNEL_2: 1000.0,
+    mcp3424.MCP3424_CHANNEL_3: 1500.0,
+    mcp3424.MCP3424_CHANNEL_4: 2000.0
+}
+MCP3424_DEFAULT_CONFIG = 0x90
+# BME280
+BME280_CALIBRATION = {
+    "T1": 27504, "T2": 26435, "T3": -1000,
+    "P1": 36477, "P2": -10685, "P3": 3024, "P4": 2855, "P5": 140,
+    "P6": -7, "P7": 15500, "P8": -14600, "P9": 6000,
+    "H1": 75, "H2": 370, "H3": 0, "H4": 305, "H5": 50, "H6": 30
+}
+BME280_ADC = {"T": 519888, "P": 415148, "H": 30000}
+BME280_DRIFT = {"T": 2000, "P": 1000, "H": 1000}  # Amplitude of the drift
+BME280_DRIFT_PERIOD = 300
+BME280_STANDBY = [0.0005, 0.0625, 0.125, 0.25, 0.5, 1.0, 0.010, 0.020]
+BME280_RESET_DATA = b"\x80\x00\x00\x80\x00\x00\x80\x00"
+BME280_MODE_SLEEP = 0x00
+BME280_MODE_NORMAL = 0x03
+BME280_STAT_MEASURING = 0x08
+# -----------------------
+
+
+# --- Classes -----------
+class I2C_Simulator(i2c_backend.I2C_Backend):
+    """Backend with the simulated devices of the shield."""
+
+    def __init__(self, latency=DEFAULT_LATENCY, byte_time=DEFAULT_BYTE_TIME,
+                 error_rate=DEFAULT_ERROR_RATE, seed=None):
+        """Init method."""
+        self.latency = latency
+        self.byte_time = byte_time
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._down = set()
+        self._callbacks = []
+        self.atmega = ATMega_Model(self)
+        self.mcp3424 = MCP3424_Model()
+        self.bme280 = BME280_Model()
+        self._models = {
+            atmega.ATMEGA_ADDRESS: self.atmega,
+            mcp3424.MCP3424_ADDRESS: self.mcp3424,
+            bme280.BME280_ADDRESS: self.bme280
+        }
+        self.stats = {"transactions": 0, "bytes": 0, "errors": 0}
+
+    def open(self, address, mode):
+        """Return the I2C_Handle of the device with the given address."""
+        return Sim_I2C_Handle(self, address, mode)
+
+    def addInterruptCallback(self, callback, channel):
+        """Call callback(channel) on simulated ATMega interrupts."""
+        self._callbacks.append((callback, channel))
+        return True
+
+    def interrupt(self):
+        """Raise the interrupt pin of the ATMega."""
+        for callback, channel in self._callbacks:
+            threading.Thread(target=callback, args=(channel,)).start()
+
+    def setDeviceDown(self, address, down=True):
+        """Make a device stop (or start again) answering."""
+        if down:
+            self._down.add(address)
+        else:
+            self._down.discard(address)
+
+    def resetStats(self):
+        """Clear the transaction counters."""
+        with self._lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def transfer(self, address, msgs):
+        """Run a list of (flags, buffer) messages on a device."""
+        with self._lock:
+            self.stats["transactions"] = self.stats["transactions"] + 1
+            model = self._models.get(address)
+            if (model is None) or (address in self._down):
+                self.stats["errors"] = self.stats["errors"] + 1
+                time.sleep(self.latency)
+                raise IOError(errno.ENXIO, os.strerror(errno.ENXIO))
+            if self.error_rate and (self._random.random() < self.error_rate):
+                self.stats["errors"] = self.stats["errors"] + 1
+                time.sleep(self.latency)
+                raise IOError(errno.EREMOTEIO, os.strerror(errno.EREMOTEIO))
+            size = 0
+            for flags, buffer in msgs:
+                if flags & i2c_backend.I2C_M_RD:
+                    view = memoryview(buffer).cast("B")
+                    view[:] = model.read(len(view))
+                    size = size + len(view)
+                else:
+                    data = bytes(buffer)
+                    model.write(data)
+                    size = size + len(data)
+            self.stats["bytes"] = self.stats["bytes"] + size
+            time.sleep(self.latency + (size * self.byte_time))
+        return size
+
+
+class Sim_I2C_Handle(i2c_backend.I2C_Handle):
+    """Device handle of the simulated bus."""
+
+    def __init__(self, simulator, address, mode):
+        """Init method."""
+        if mode not in i2c_backend.I2C_MODES:
+            raise ValueError("Invalid I2C mode")
+        self._sim = simulator
+        self._address = address
+        self._mode = mode
+
+    @property
+    def mode(self):
+        """Return the transaction mode of the handle."""
+        return self._mode
+
+    def readinto(self, buffer):
+        """Read from the device into a buffer, return the bytes read."""
+        return self._sim.transfer(
+            self._address, [(i2c_backend.I2C_M_RD, buffer)]
+        )
+
+    def write(self, data):
+        """Write a buffer of bytes to the device."""
+        return self._sim.transfer(
+            self._address, [(i2c_backend.I2C_M_WR, data)]
+        )
+
+    def transfer(self, msgs):
+        """Run a list of (flags, buffer) messages as one transaction."""
+        self._sim.transfer(self._address, msgs)
+
+    def close(self):
+        """Close the handle."""
+        pass
+
+
+class ATMega_Model():
+    """Registers of the ATMega of the shield."""
+
+    def __init__(self, simulator):
+        """Init method."""
+        self._sim = simulator
+        self._regs = bytearray(256)
+        self._regs[atmega.ATMEGA_CHECK] = atmega.ATMEGA_CHECK_BYTE
+        self._reg = 0
+        self._offset = 0
+        self._rx = {s: bytearray() for s in atmega.SOCKETS}
+        self.tx_bytes = {s: 0 for s in atmega.SOCKETS}
+        self.overflows = {s: 0 for s in atmega.SOCKETS}
+        self.loopback = True
+        self.gps = GPS_Model()
+        self._gga = bytes(GPS_BUFFER_SIZE)
+        self._rmc = bytes(GPS_BUFFER_SIZE)
+
+    def receive(self, socket, data):
+        """Add bytes received by the UART of a socket and interrupt."""
+        fifo = self._rx[socket]
+        space = UART_FIFO_SIZE - len(fifo)
+        if len(data) > space:
+            self.overflows[socket] = self.overflows[socket] + 1
+        fifo += data[0:space]
+        self._regs[(socket << atmega.SOCKET_SHIFT) | atmega.INT_UART] = 1
+        self._sim.interrupt()
+
+    def pressButton(self, socket):
+        """Press the button of a socket."""
+        self._regs[(socket << atmega.SOCKET_SHIFT) | atmega.INT_BUTTON] = 1
+        self._sim.interrupt()
+
+    def getLeds(self):
+        """Return the LED registers."""
+        leds = atmega.SOCKET_LEDS << atmega.SOCKET_SHIFT
+        return bytes(self._regs[leds:(leds + 0x10)])
+
+    def write(self, data):
+        """Set the register pointer and write the rest of the bytes."""
+        self._reg = data[0]
+        self._offset = 0
+        if len(data) > 1:
+            self._writeReg(self._reg, data[1:])
+
+    def read(self, size):
+        """Read from the register pointer."""
+        data = self._readReg(self._reg, self._offset, size)
+        self._offset = self._offset + size
+        return data
+
+    def _writeReg(self, reg, data):
+        socket = reg >> atmega.SOCKET_SHIFT
+        sub = reg & 0x0F
+        if socket in atmega.SOCKETS:
+            status = (socket << atmega.SOCKET_SHIFT) | atmega.SOCKET_STATUS
+            if sub == atmega.FIFO_TX:
+                self.tx_bytes[socket] = self.tx_bytes[socket] + len(data)
+                if self.loopback and \
+                        (self._regs[status] == atmega.MODE_ON):
+                    self.receive(socket, data)
+                return
+            if (sub == atmega.SOCKET_STATUS) and \
+                    (data[0] == atmega.MODE_OFF):
+                del self._rx[socket][:]
+        elif socket == atmega.SOCKET_GPS:
+            if sub == atmega.GPS_UPDATE:
+                self._gga, self._rmc = self.gps.sentences(time.time())
+            return
+        for i, byte in enumerate(data):
+            self._regs[(reg + i) & 0xFF] = byte
+
+    def _readReg(self, reg, offset, size):
+        socket = reg >> atmega.SOCKET_SHIFT
+        sub = reg & 0x0F
+        if socket in atmega.SOCKETS:
+            if sub == atmega.FIFO_TX:
+                return bytes(size)
+            if sub == atmega.FIFO_RX:
+                fifo = self._rx[socket]
+                data = bytes(fifo[0:size])
+                del fifo[0:size]
+                return data + bytes(size - len(data))
+            if sub == atmega.FIFO_AVAILABLE:
+                return self._slice(
+                    struct.pack(">H", len(self._rx[socket])), offset, size
+                )
+            if sub in [atmega.INT_UART, atmega.INT_BUTTON]:
+                data = self._slice(bytes((self._regs[reg],)), offset, size)
+                self._regs[reg] = 0
+                return data
+        elif socket == atmega.SOCKET_GPS:
+            if sub == atmega.GPS_READ_BUFFER_SIZE:
+                return self._slice(bytes((GPS_BUFFER_SIZE,)), offset, size)
+            if sub == atmega.GPS_READ_GGA:
+                return self._slice(self._gga, offset, size)
+            if sub == atmega.GPS_READ_RMC:
+                return self._slice(self._rmc, offset, size)
+        return bytes(
+            self._regs[(reg + offset + i) & 0xFF] for i in range(size)
+        )
+
+    def _slice(self, data, offset, size):
+        data = data[offset:(offset + size)]
+        return data + bytes(size - len(data))
+
+
+class GPS_Model():
+    """GPS moving around a circular track."""
+
+    def __init__(self):
+        """Init method."""
+        self.center = GPS_CENTER
+        self.radius = GPS_RADIUS
+        self.lap = GPS_LAP
+        self.altitude = GPS_ALTITUDE
+        self.fix = 1
+        self.nsat = 8
+        self.hdop = 0.9
+
+    def _nmea(self, sentence):
+        """Return the GPS buffer with a sentence and its checksum.
+
+        The buffer ends with at least one NUL, so a sentence longer
+        than the buffer is cut, as the ATMega does.
+        """
+        checksum = 0
+        for char in sentence.encode("ascii"):
+            checksum = checksum ^ char
+        frame = "${}*{:02X}".format(sentence, checksum).encode("ascii")
+        frame = frame[0:(GPS_BUFFER_SIZE - 1)]
+        return frame + bytes(GPS_BUFFER_SIZE - len(frame))
+
+    def _coordinate(self, value, positive, negative, width):
+        hemisphere = positive if value >= 0 else negative
+        value = abs(value)
+        degrees = int(value)
+        minutes = (value - degrees) * 60
+        return "{:0{}d}{:07.4f}".format(degrees, width, minutes), hemisphere
+
+    def position(self, ts):
+        """Return the latitude, longitude and course at a given time."""
+        angle = (2 * math.pi * ts) / self.lap
+        latitude = self.center[0] + (self.radius * math.sin(angle))
+        longitude = self.center[1] + (self.radius * math.cos(angle))
+        course = math.degrees(-angle) % 360
+        return latitude, longitude, course
+
+    def sentences(self, ts):
+        """Return the GGA and RMC buffers at a given time."""
+        latitude, longitude, course = self.position(ts)
+        utc = time.gmtime(ts)
+        hhmmss = time.strftime("%H%M%S", utc) + \
+            ".{:02d}".format(int((ts % 1) * 100))
+        lat, latDir = self._coordinate(latitude, "N", "S", 2)
+        lon, lonDir = self._coordinate(longitude, "E", "W", 3)
+        speed = ((2 * math.pi * self.radius * 60) / self.lap) * 3600
+        gga = self._nmea(
+            "GPGGA,{},{},{},{},{},{},{:02d},{:.1f},{:.1f},M,51.0,M,,".format(
+                hhmmss, lat, latDir, lon, lonDir, self.fix, self.nsat,
+                self.hdop, self.altitude
+            )
+        )
+        rmc = self._nmea(
+            "GPRMC,{},{},{},{},{},{},{:.2f},{:.2f},{},,,{}".format(
+                hhmmss, "A" if self.fix else "V", lat, latDir, lon, lonDir,
+                speed, course, time.strftime("%d%m%y", utc),
+                "A" if self.fix else "N"
+            )
+        )
+        return gga, rmc
+
+
+class MCP3424_Model():
+    """MCP3424 converting at the rate of its resolution."""
+
+    def __init__(self):
+        """Init method."""
+        self.voltages = dict(MCP3424_VOLTAGES)
+        self.conversions = 0
+        self._config = MCP3424_DEFAULT_CONFIG
+        self._start = time.time()
+        self._lastRead = 0
+
+    def _decode(self):
+        config = self._config
+        channel = (config >> mcp3424.MCP3424_SHIFT_CHANNEL) & 0x03
+        mode = (config >> mcp3424.MCP3424_SHIFT_MODE) & 0x01
+        resolution = (config >> mcp3424.MCP3424_SHIFT_RESOLUTION) & 0x03
+        pga = (config >> mcp3424.MCP3424_SHIFT_PGA) & 0x03
+        return channel, mode, resolution, pga
+
+    def write(self, data):
+        """Write the configuration byte."""
+        config = data[0]
+        self._config = config & mcp3424.MCP3424_MASK_RDY
+        channel, mode, resolution, pga = self._decode()
+        if (mode == mcp3424.MCP3424_MODE_CONTINUOUS) or (config & 0x80):
+            self._start = time.time()
+            self._lastRead = 0
+
+    def read(self, size):
+        """Read the last conversion and the configuration byte."""
+        channel, mode, resolution, pga = self._decode()
+        period = MCP3424_CONVERSION_TIME[resolution]
+        done = int((time.time() - self._start) / period)
+        if mode == mcp3424.MCP3424_MODE_ONE_SHOOT:
+            done = min(done, 1)
+        ready = (done > 0) and (done != self._lastRead)
+        if ready and (mode == mcp3424.MCP3424_MODE_CONTINUOUS):
+            self._lastRead = done
+        if ready:
+            self.conversions = self.conversions + 1
+        config = self._config
+        if not ((done > 0) and ((mode == mcp3424.MCP3424_MODE_ONE_SHOOT) or
+                                ready)):
+            config = config | 0x80
+        bits = mcp3424.MCP3424_RESOLUTION_BITS[resolution]
+        code = int(self.voltages[channel] * (1 << (resolution * 2)) *
+                   (1 << pga))
+        code = max(-(1 << (bits - 1)), min(code, (1 << (bits - 1)) - 1))
+        if resolution == mcp3424.MCP3424_RESOLUTION_18:
+            data = (code & 0xFFFFFF).to_bytes(3, "big")
+        else:
+            data = (code & 0xFFFF).to_bytes(2, "big")
+        data = data + bytes((config,)) * max(1, size - len(data))
+        return data[0:size]
+
+
+class BME280_Model():
+    """BME280 with forced and normal mode measurements."""
+
+    def __init__(self):
+        """Init method."""
+        self.adc = dict(BME280_ADC)
+        self.drift = dict(BME280_DRIFT)
+        self.measurements = 0
+        self._regs = bytearray(256)
+        self._regs[bme280.BME280_REG_CHIP_ID] = bme280.BME280_CHECK_BYTE
+        self._writeCalibration(BME280_CALIBRATION)
+        self._regs[0xF7:0xFF] = BME280_RESET_DATA
+        self._reg = 0
+        self._offset = 0
+        self._start = 0
+        self._end = 0
+        self._latched = 0
+
+    def _writeCalibration(self, cal):
+        regs = self._regs
+        regs[0x88:0xA0] = struct.pack(
+            "<HhhHhhhhhhhh", cal["T1"], cal["T2"], cal["T3"], cal["P1"],
+            cal["P2"], cal["P3"], cal["P4"], cal["P5"], cal["P6"],
+            cal["P7"], cal["P8"], cal["P9"]
+        )
+        regs[bme280.BME280_REG_DIG_H1] = cal["H1"]
+        regs[0xE1:0xE3] = struct.pack("<h", cal["H2"])
+        regs[0xE3] = cal["H3"]
+        regs[0xE4] = (cal["H4"] >> 4) & 0xFF
+        regs[0xE5] = (cal["H4"] & 0x0F) | ((cal["H5"] & 0x0F) << 4)
+        regs[0xE6] = (cal["H5"] >> 4) & 0xFF
+        regs[0xE7] = cal["H6"] & 0xFF
+
+    def _oversampling(self, value):
+        return 0 if value == 0 else (1 << (min(value, 5) - 1))
+
+    def _measureTime(self):
+        osrs_h = self._oversampling(
+            self._regs[bme280.BME280_REG_CTRL_HUMIDITY] & 0x07
+        )
+        ctrl = self._regs[bme280.BME280_REG_CTRL_MEAS]
+        osrs_t = self._oversampling((ctrl >> 5) & 0x07)
+        osrs_p = self._oversampling((ctrl >> 2) & 0x07)
+        ms = 1.25 + (2.3 * osrs_t)
+        if osrs_p:
+            ms = ms + (2.3 * osrs_p) + 0.575
+        if osrs_h:
+            ms = ms + (2.3 * osrs_h) + 0.575
+        return ms / 1000
+
+    def _latch(self, ts):
+        """Store a measurement made at a given time in the data registers."""
+        ctrl = self._regs[bme280.BME280_REG_CTRL_MEAS]
+        phase = math.sin((2 * math.pi * ts) / BME280_DRIFT_PERIOD)
+        adc = {k: int(v + (self.drift[k] * phase))
+               for k, v in self.adc.items()}
+        if not ((ctrl >> 2) & 0x07):
+            adc["P"] = 0x80000
+        if not ((ctrl >> 5) & 0x07):
+            adc["T"] = 0x80000
+        if not (self._regs[bme280.BME280_REG_CTRL_HUMIDITY] & 0x07):
+            adc["H"] = 0x8000
+        self._regs[0xF7:0xFA] = (adc["P"] << 4).to_bytes(3, "big")
+        self._regs[0xFA:0xFD] = (adc["T"] << 4).to_bytes(3, "big")
+        self._regs[0xFD:0xFF] = adc["H"].to_bytes(2, "big")
+        self.measurements = self.measurements + 1
+
+    def _update(self):
+        """Bring the measurements and the status up to date."""
+        now = time.time()
+        ctrl = self._regs[bme280.BME280_REG_CTRL_MEAS]
+        mode = ctrl & 0x03
+        measuring = False
+        if mode == BME280_MODE_NORMAL:
+            standby = BME280_STANDBY[
+                self._regs[bme280.BME280_REG_CONFIG] >> 5
+            ]
+            period = self._measureTime() + standby
+            cycles = int((now - self._start) / period)
+            end = self._start + (cycles * period) + self._measureTime()
+            measuring = now < end
+            done = cycles if measuring else cycles + 1
+            if done > self._latched:
+                self._latched = done
+                self._latch(now)
+        elif mode != BME280_MODE_SLEEP:
+            if now >= self._end:
+                self._latch(self._end)
+                self._regs[bme280.BME280_REG_CTRL_MEAS] = ctrl & 0xFC
+            else:
+                measuring = True
+        self._regs[bme280.BME280_REG_STAT] = \
+            BME280_STAT_MEASURING if measuring else 0x00
+
+    def write(self, data):
+        """Set the register pointer and write (register, value) pairs."""
+        self._reg = data[0]
+        self._offset = 0
+        pairs = [(data[0], data[1])] if len(data) > 1 else []
+        pairs.extend(zip(data[2::2], data[3::2]))
+        for reg, value in pairs:
+            self._update()
+            self._regs[reg] = value
+            if reg == bme280.BME280_REG_CTRL_MEAS:
+                self._start = time.time()
+                self._end = self._start + self._measureTime()
+                self._latched = 0
+
+    def read(self, size):
+        """Read from the register pointer."""
+        self._update()
+        start = self._reg + self._offset
+        self._offset = self._offset + size
+        data = bytes(self._regs[start:(start + size)])
+        return data + bytes(size - len(data))
+# -----------------------
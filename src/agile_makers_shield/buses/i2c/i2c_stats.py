@@ -0,0 +1,122 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE I2C Statistics.
+
+Description: Class that records the transactions of the
+             I2C bus per device address, register and operation:
+             calls, bytes moved, retries, errors and a histogram
+             of the latency in power of two microsecond buckets,
+             from which the percentiles are estimated. Recording
+             is a few integer operations under a lock, so it can
+             be left enabled. Only one instance of this class can
+             be created.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from agile_makers_shield.utils import singleton
+import threading
+# -----------------------
+
+
+# --- Variables ---------
+OP_READ = "read"
+OP_WRITE = "write"
+REG_RAW = None  # Reads and writes without a register pointer
+BUCKETS = 25  # Bucket i holds latencies below 2^i us, the last up to ~16 s
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+# -----------------------
+
+
+# --- Classes -----------
+class I2C_Stats(metaclass=singleton.Singleton):
+    """Record the transactions of every device on the I2C bus."""
+
+    def __init__(self, enabled=True):
+        """Init method."""
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, device, reg, op, size, retries, elapsed, ok=True):
+        """Add a transaction that took elapsed seconds."""
+        if not self.enabled:
+            return
+        key = (device, reg, op)
+        bucket = min(int(elapsed * 1000000).bit_length(), BUCKETS - 1)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [0, 0, 0, 0, 0.0, 0.0, [0] * BUCKETS]
+                self._entries[key] = entry
+            entry[0] = entry[0] + 1
+            entry[1] = entry[1] + size
+            entry[2] = entry[2] + retries
+            if not ok:
+                entry[3] = entry[3] + 1
+            entry[4] = entry[4] + elapsed
+            if elapsed > entry[5]:
+                entry[5] = elapsed
+            entry[6][bucket] = entry[6][bucket] + 1
+
+    def reset(self):
+        """Clear the recorded transactions."""
+        with self._lock:
+            self._entries = {}
+
+    def _percentile(self, histogram, calls, fraction, maximum):
+        """Return the upper bound in seconds of the percentile bucket."""
+        target = calls * fraction
+        count = 0
+        for i, n in enumerate(histogram):
+            count = count + n
+            if count >= target:
+                return min((1 << i) / 1000000, maximum)
+        return maximum
+
+    def _name(self, device, reg, op):
+        """Return the name of an entry, e.g. 0x14:0x01:read."""
+        reg = "raw" if reg is REG_RAW else "0x{:02X}".format(reg)
+        return "0x{:02X}:{}:{}".format(device, reg, op)
+
+    def getStats(self):
+        """Return the statistics of each device, register and operation."""
+        with self._lock:
+            entries = [(key, list(entry[0:6]), list(entry[6]))
+                       for key, entry in self._entries.items()]
+        stats = {}
+        for key, entry, histogram in sorted(
+                entries, key=lambda e: (e[0][0], e[0][2], e[0][1] or 0)):
+            calls, size, retries, errors, total, maximum = entry
+            result = {
+                "calls": calls,
+                "bytes": size,
+                "retries": retries,
+                "errors": errors,
+                "time_total": total,
+                "time_mean": total / calls,
+                "time_max": maximum
+            }
+            for name, fraction in PERCENTILES.items():
+                result[name] = self._percentile(
+                    histogram, calls, fraction, maximum
+                )
+            stats[self._name(*key)] = result
+        return stats
+# -----------------------
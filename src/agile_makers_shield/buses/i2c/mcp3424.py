@@ -18,7 +18,9 @@ AGILE I2C MCP3424.
 
 Description: Class to communicate with the MCP3424
              in the AGILE Maker's Shield. This allows to
-             read the different channels of the ADC.
+             read the different channels of the ADC, one
+             conversion at a time or as a stream of samples in
+             continuous mode.
 Author: David Palomares <d.palomares@libelium.com>
 Version: 0.1
 Date: March 2017
@@ -27,6 +29,9 @@ Date: March 2017
 
 # --- Imports -----------
 from agile_makers_shield.buses.i2c import i2c_bus
+from agile_makers_shield.buses.dbus import constants as db_cons
+import logging
+import threading
 import time
 # -----------------------
 
@@ -36,6 +41,7 @@ import time
 MCP3424_ADDRESS = 0x6C
 MCP3424_REG = 0x00
 DUMMY_DATA = [0x00]
+ERROR = []
 MCP3424_TIMEOUT = 0.5
 # MCP3424 configuration
 MCP3424_ACTION_RDY = 0x01
@@ -87,6 +93,15 @@ MCP3424_PGAS = [
     MCP3424_PGA_8
 ]
 MCP3424_SHIFT_PGA = 0
+MCP3424_CONVERSION_TIME = {  # Seconds per conversion
+    MCP3424_RESOLUTION_12: 1 / 240,
+    MCP3424_RESOLUTION_14: 1 / 60,
+    MCP3424_RESOLUTION_16: 1 / 15,
+    MCP3424_RESOLUTION_18: 1 / 3.75
+}
+MCP3424_POLL_DIVIDER = 8  # Retry a read not ready after 1/8 of a conversion
+MCP3424_POLL_MAX = 0.02  # Maximum seconds between polls of a conversion
+MCP3424_STREAM_BLOCK = 16  # Samples per block of a stream
 # -----------------------
 
 
@@ -97,14 +112,28 @@ class MCP3424():
     def __init__(self):
         """Init method."""
         self._bus = i2c_bus.I2C_Bus(MCP3424_ADDRESS)
+        self._config = None  # Last configuration written, without RDY
+        self._lock = threading.RLock()
+        self._streaming = False  # A stream generator owns the device
+        self._streamThread = None
+        self._streamStop = threading.Event()
+        self._logger = logging.getLogger(db_cons.LOGGER_NAME)
+
+    def lock_decorator(func):
+        """Decorator to run a configuration and its reads atomically."""
+        def lock_wrapper(self, *args, **kwargs):
+            with self._lock:
+                return func(self, *args, **kwargs)
+
+        return lock_wrapper
 
     def close(self):
         """Close the I2C communication."""
+        self.stopStream()
         self._bus.close()
 
-    def read(self, channel, mode=MCP3424_MODE_ONE_SHOOT,
-             resolution=MCP3424_RESOLUTION_18, pga=MCP3424_PGA_1):
-        """Read the specified channel from the MCP3424."""
+    def _configuration(self, channel, mode, resolution, pga):
+        """Return the configuration byte that starts a conversion."""
         # Check params
         if channel not in MCP3424_CHANNELS:
             raise ValueError("Invalid channel")
@@ -114,27 +143,217 @@ class MCP3424():
             raise ValueError("Invalid resolution")
         if pga not in MCP3424_PGAS:
             raise ValueError("Invalid pga")
-        # Configure the MCP3424
         configuration = (MCP3424_ACTION_RDY << MCP3424_SHIFT_ACTION)
         configuration = configuration | (channel << MCP3424_SHIFT_CHANNEL)
         configuration = configuration | (mode << MCP3424_SHIFT_MODE)
         configuration = configuration | \
             (resolution << MCP3424_SHIFT_RESOLUTION)
         configuration = configuration | (pga << MCP3424_SHIFT_PGA)
-        # Read the data
+        return configuration
+
+    def _size(self, resolution):
+        """Return the bytes of a conversion plus the configuration byte."""
         size_bits = MCP3424_RESOLUTION_BITS[resolution]
-        size = (size_bits // 8) + ((size_bits % 8) > 0) + 1
-        data = self._bus.read(configuration, size)
-        if (mode == MCP3424_MODE_ONE_SHOOT):
-            ts = time.time()
-            while ((data[-1] != (configuration & MCP3424_MASK_RDY)) and
-                   ((time.time() - ts) < MCP3424_TIMEOUT)):
-                data = self._bus._readRaw(size)
-        # Convert the data
-        data[0] = data[0] & ((1 << (size_bits % 8)) - 1)
+        return (size_bits // 8) + ((size_bits % 8) > 0) + 1
+
+    def _convert(self, data, resolution, pga):
+        """Convert the bytes of a conversion to millivolts."""
         value = 0
         for byte in data[0:-1]:
             value = (value << 8) | byte
+        value = value & ((1 << MCP3424_RESOLUTION_BITS[resolution]) - 1)
         divisor = 1 << ((resolution * 2) + pga)
         return (value / divisor)
+
+    def _isReady(self, data):
+        """Return if the data holds a conversion not read before."""
+        return not (data[-1] & (MCP3424_ACTION_RDY << MCP3424_SHIFT_ACTION))
+
+    def isStreaming(self):
+        """Return if a stream is running."""
+        return self._streaming
+
+    @lock_decorator
+    def read(self, channel, mode=MCP3424_MODE_ONE_SHOOT,
+             resolution=MCP3424_RESOLUTION_18, pga=MCP3424_PGA_1):
+        """Read the specified channel from the MCP3424."""
+        if self.isStreaming():
+            raise IOError("The MCP3424 is streaming")
+        # Configure the MCP3424
+        configuration = self._configuration(channel, mode, resolution, pga)
+        size = self._size(resolution)
+        if (mode == MCP3424_MODE_CONTINUOUS) and \
+                (self._config == (configuration & MCP3424_MASK_RDY)):
+            # Already converting with this configuration, read the last one
+            data = self._bus._readRaw(size)
+        else:
+            # A one-shot read always writes the configuration to start
+            # the conversion
+            data = ERROR
+            if self._configure(configuration):
+                data = self._waitConversion(size, resolution)
+        if not data:
+            self._config = None
+            raise IOError("Could not read the MCP3424")
+        # Convert the data
+        return self._convert(data, resolution, pga)
+
+    def _configure(self, configuration):
+        """Write the configuration, return if it was written."""
+        self._config = None
+        if not self._bus.writeRaw(bytes((configuration,))):
+            return False
+        self._config = configuration & MCP3424_MASK_RDY
+        return True
+
+    def _waitConversion(self, size, resolution):
+        """Wait for the conversion started by a configuration write.
+
+        Sleep for the conversion time, then poll with a growing
+        interval until the conversion is ready or the timeout passes.
+        """
+        period = MCP3424_CONVERSION_TIME[resolution]
+        ts = time.monotonic()
+        time.sleep(period)
+        interval = period / MCP3424_POLL_DIVIDER
+        while True:
+            data = self._bus._readRaw(size)
+            if (not data) or self._isReady(data) or \
+                    ((time.monotonic() - ts) >= MCP3424_TIMEOUT):
+                return data
+            time.sleep(interval)
+            interval = min(interval * 2, MCP3424_POLL_MAX)
+
+    @lock_decorator
+    def readMulti(self, configs):
+        """Read a list of (channel, resolution, pga) one after another.
+
+        The conversions are one-shot and run back to back: the
+        configuration of the next one is written right after the
+        previous one is read. Return a list with the values.
+        """
+        if self.isStreaming():
+            raise IOError("The MCP3424 is streaming")
+        configurations = [
+            self._configuration(channel, MCP3424_MODE_ONE_SHOOT,
+                                resolution, pga)
+            for channel, resolution, pga in configs
+        ]
+        values = []
+        for configuration, (channel, resolution, pga) in zip(
+                configurations, configs):
+            size = self._size(resolution)
+            data = ERROR
+            if self._configure(configuration):
+                data = self._waitConversion(size, resolution)
+            if (not data) or (not self._isReady(data)):
+                self._config = None
+                raise IOError("Could not read the MCP3424")
+            values.append(self._convert(data, resolution, pga))
+        return values
+
+    def stream(self, channel, resolution=MCP3424_RESOLUTION_12,
+               pga=MCP3424_PGA_1, stop=None):
+        """Yield (timestamp, value) samples of a channel in continuous mode.
+
+        The configuration is written once and every conversion is read
+        at the rate of the resolution. The generator ends when the stop
+        event is set. The device is streaming from the configuration
+        until the generator ends or is closed, and the reads fail
+        meanwhile; then it is left in one-shot mode.
+        """
+        configuration = self._configuration(
+            channel, MCP3424_MODE_CONTINUOUS, resolution, pga
+        )
+        size = self._size(resolution)
+        period = MCP3424_CONVERSION_TIME[resolution]
+        with self._lock:
+            if self._streaming:
+                raise IOError("The MCP3424 is streaming")
+            self._streaming = True
+        try:
+            with self._lock:
+                if not self._configure(configuration):
+                    raise IOError("Could not configure the MCP3424")
+            deadline = time.monotonic() + period
+            while (stop is None) or (not stop.is_set()):
+                now = time.monotonic()
+                if now < deadline:
+                    time.sleep(deadline - now)
+                elif now > (deadline + period):
+                    # Too late, the missed conversions are lost
+                    deadline = now
+                data = self._bus._readRaw(size)
+                if not data:
+                    raise IOError("Could not read the MCP3424")
+                if not self._isReady(data):
+                    # Early, move the reads closer to the end of the
+                    # conversions
+                    deadline = time.monotonic() + \
+                        (period / MCP3424_POLL_DIVIDER)
+                    continue
+                deadline = deadline + period
+                yield (time.time(), self._convert(data, resolution, pga))
+        finally:
+            with self._lock:
+                # Back to one-shot without starting a conversion, so the
+                # device stops converting and the next read configures it
+                standby = configuration & MCP3424_MASK_RDY & \
+                    ~(MCP3424_MODE_CONTINUOUS << MCP3424_SHIFT_MODE)
+                self._bus.writeRaw(bytes((standby,)))
+                self._config = None
+                self._streaming = False
+
+    def _streamLoop(self, callback, channel, resolution, pga, block,
+                    end_callback):
+        """Read a stream and call the callback with every block."""
+        timestamps = []
+        values = []
+        error = None
+        try:
+            for ts, value in self.stream(channel, resolution, pga,
+                                         self._streamStop):
+                timestamps.append(ts)
+                values.append(value)
+                if len(values) >= block:
+                    callback(channel, timestamps, values)
+                    timestamps = []
+                    values = []
+        except IOError as e:
+            self._logger.error("MCP3424: Stream of channel {} stopped: "
+                               "{}".format(channel + 1, e))
+            error = str(e)
+        if values:
+            callback(channel, timestamps, values)
+        if end_callback is not None:
+            end_callback(channel, error)
+
+    def startStream(self, callback, channel,
+                    resolution=MCP3424_RESOLUTION_12, pga=MCP3424_PGA_1,
+                    block=MCP3424_STREAM_BLOCK, end_callback=None):
+        """Stream a channel in a thread.
+
+        callback(channel, timestamps, values) is called from the thread
+        with every block of samples, and end_callback(channel, error)
+        when the stream ends, with the error that stopped it or None if
+        it was stopped.
+        """
+        self._configuration(channel, MCP3424_MODE_CONTINUOUS, resolution, pga)
+        if block < 1:
+            raise ValueError("Invalid block size")
+        self.stopStream()
+        self._streamStop.clear()
+        self._streamThread = threading.Thread(
+            target=self._streamLoop,
+            args=(callback, channel, resolution, pga, block, end_callback)
+        )
+        self._streamThread.daemon = True
+        self._streamThread.start()
+
+    def stopStream(self):
+        """Stop the stream and wait for its thread."""
+        if self._streamThread is not None:
+            self._streamStop.set()
+            self._streamThread.join()
+            self._streamThread = None
 # -----------------------
@@ -29,7 +29,12 @@ Date: May 2017
 # --- Imports -----------
 from agile_makers_shield.utils import singleton
 from agile_makers_shield.buses.i2c import atmega
-import RPi.GPIO as GPIO
+from agile_makers_shield.buses.i2c import i2c_arbiter
+from agile_makers_shield.buses.i2c import i2c_bus
+try:
+    import RPi.GPIO as GPIO
+except ImportError:  # Not a Raspberry Pi, the I2C backend must interrupt
+    GPIO = None
 # -----------------------
 
 
@@ -63,28 +68,38 @@ class Interruptions(metaclass=singleton.Singleton):
             INT_BUTTON_1: False
         }
         self._atmega = atmega.ATMega()
-        GPIO.setmode(GPIO.BOARD)
-        GPIO.setwarnings(False)
-        GPIO.setup(PININT, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-        GPIO.add_event_detect(
-            PININT, GPIO.RISING,
-            callback=self._interruption_handler,
-            bouncetime=250
+        self._arbiter = i2c_arbiter.I2C_Arbiter()
+        self._gpio = not i2c_bus.getBackend().addInterruptCallback(
+            self._interruption_handler, PININT
         )
+        if self._gpio:
+            if GPIO is None:
+                raise IOError("RPi.GPIO is needed to read the interruptions")
+            GPIO.setmode(GPIO.BOARD)
+            GPIO.setwarnings(False)
+            GPIO.setup(PININT, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+            GPIO.add_event_detect(
+                PININT, GPIO.RISING,
+                callback=self._interruption_handler,
+                bouncetime=250
+            )
 
     def _interruption_handler(self, channel):
         if channel == PININT:
-            interrupt = 0
-            if self._atmega.getUartInterrupt(atmega.SOCKET_0):
-                interrupt = interrupt | INT_UART_0
-            if self._atmega.getUartInterrupt(atmega.SOCKET_1):
-                interrupt = interrupt | INT_UART_1
-            if self._atmega.getButtonInterrupt(atmega.SOCKET_0):
-                interrupt = interrupt | INT_BUTTON_0
-            if self._atmega.getButtonInterrupt(atmega.SOCKET_1):
-                interrupt = interrupt | INT_BUTTON_1
-            self._int = interrupt
-            self._update_observers(interrupt)
+            # The interrupt service and the UART drains of the observers
+            # go before any other transaction on the I2C bus
+            with self._arbiter.priority(i2c_arbiter.PRIORITY_INTERRUPT):
+                interrupt = 0
+                if self._atmega.getUartInterrupt(atmega.SOCKET_0):
+                    interrupt = interrupt | INT_UART_0
+                if self._atmega.getUartInterrupt(atmega.SOCKET_1):
+                    interrupt = interrupt | INT_UART_1
+                if self._atmega.getButtonInterrupt(atmega.SOCKET_0):
+                    interrupt = interrupt | INT_BUTTON_0
+                if self._atmega.getButtonInterrupt(atmega.SOCKET_1):
+                    interrupt = interrupt | INT_BUTTON_1
+                self._int = interrupt
+                self._update_observers(interrupt)
 
     def _update_observers(self, interrupt):
         for observer in self._observers:
@@ -125,6 +140,7 @@ class Interruptions(metaclass=singleton.Singleton):
 
     def close(self):
         """Clean up the GPIOs."""
-        GPIO.remove_event_detect(PININT)
-        GPIO.cleanup()
+        if self._gpio:
+            GPIO.remove_event_detect(PININT)
+            GPIO.cleanup()
 # -----------------------
@@ -40,6 +40,7 @@ DEFAULT_STOPBITS = atmega.UART_STOPBITS_1
 DEFAULT_PARITY = atmega.UART_PARITY_NONE
 DEFAULT_TIMEOUT = 2
 CHAR_NEWLINE = 0x0A
+RX_BUFFER_SIZE = 256  # Bytes drained from the ATMega FIFO per read
 # FIXME: Sometimes the available data readed from the I2C bus is 0xFF, although
 #        the ATMega sends 0x00. When this happens, the following 255 bytes
 #        are always the following sequence. Why? This sequence will be filtered
@@ -70,6 +71,7 @@ NOISE_DATA = [0x00, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff,
               0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff,
               0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff,
               0xff, 0xff, 0xff, 0xff, 0xff]
+NOISE_BYTES = bytes(NOISE_DATA)
 # -----------------------
 
 
@@ -117,7 +119,8 @@ class Serial(observer.Observer):
         self.timeout = timeout
         self.raises_timeout = raises_timeout
         self._open = False
-        self._buffer = []
+        self._buffer = bytearray()
+        self._rx = bytearray(RX_BUFFER_SIZE)
         self._interrupts = 0
         if self._socket == atmega.SOCKET_0:
             self._interrupts = interruptions.INT_UART_0
@@ -151,12 +154,14 @@ class Serial(observer.Observer):
         return self._interrupts
 
     def _updateBuffer(self):
-        data = self._atmega.getData(self._socket)
-        # FIXME: If the noise data from the I2C is fixed, remove this
-        if len(data) == 255:
-            if data == NOISE_DATA:
-                return
-        self._buffer.extend(data)
+        length = len(self._rx)
+        while length == len(self._rx):
+            length = self._atmega.getDataInto(self._socket, self._rx)
+            # FIXME: If the noise data from the I2C is fixed, remove this
+            if length == len(NOISE_BYTES):
+                if self._rx[:length] == NOISE_BYTES:
+                    return
+            self._buffer += memoryview(self._rx)[:length]
 
     def _check_timeout(self, limit):
         if time.time() > limit:
@@ -184,7 +189,7 @@ class Serial(observer.Observer):
         self._interruptions.register(self)
         self._atmega.uartON(self._socket, self.baudrate, self.databits,
                             self.stopbits, self.parity)
-        self._buffer = []
+        self._buffer = bytearray()
         self._open = True
 
     def close(self):
@@ -195,52 +200,54 @@ class Serial(observer.Observer):
             )
         self._interruptions.unregister(self)
         self._atmega.uartOFF(self._socket)
-        self._buffer = []
+        self._buffer = bytearray()
         self._open = False
 
     def write(self, data):
         """Write to the serial port."""
         if not self._open:
             raise SerialException("Socket {} is closed".format(self._socket))
-        self._atmega.sendData(self._socket, list(data))
+        self._atmega.sendData(self._socket, data)
 
-    def read(self, size=1):
-        """Read N bytes from the serial port."""
+    def readinto(self, buffer):
+        """Read into a buffer from the serial port, return the bytes read."""
         if not self._open:
             raise SerialException("Socket {} is closed".format(self._socket))
-        data = []
-        current_size = size
+        view = memoryview(buffer).cast("B")
+        size = len(view)
+        length = 0
         timeout = Timeout(self.timeout, self.raises_timeout)
-        while (len(data) < current_size):
-            buffer_size = len(self._buffer)
-            if buffer_size >= current_size:
-                data.extend(self._buffer[0:current_size])
-                self._buffer = self._buffer[current_size:]
-                current_size = 0
-            else:
-                data.extend(self._buffer[0:buffer_size])
-                self._buffer = []
-                current_size = current_size - buffer_size
-            if timeout.check() and (len(data) < current_size):
+        while length < size:
+            chunk = min(len(self._buffer), size - length)
+            if chunk > 0:
+                view[length:(length + chunk)] = self._buffer[0:chunk]
+                del self._buffer[0:chunk]
+                length = length + chunk
+            if timeout.check() and (length < size):
                 break
+        return length
+
+    def read(self, size=1):
+        """Read N bytes from the serial port."""
+        data = bytearray(size)
+        length = self.readinto(data)
+        del data[length:]
         return bytes(data)
 
     def readline(self):
         """Read one line from the serial port."""
         if not self._open:
             raise SerialException("Socket {} is closed".format(self._socket))
-        line = []
+        line = b""
         timeout = Timeout(self.timeout, self.raises_timeout)
         while not line:
-            try:
-                index = self._buffer.index(CHAR_NEWLINE)
-                line = self._buffer[0:(index+1)]
-                self._buffer = self._buffer[(index+1):]
-            except ValueError:
-                pass
+            index = self._buffer.find(CHAR_NEWLINE)
+            if index >= 0:
+                line = bytes(self._buffer[0:(index+1)])
+                del self._buffer[0:(index+1)]
             if timeout.check() and not line:
                 break
-        return bytes(line)
+        return line
 
     def readlines(self):
         """Read all lines from the serial port."""
@@ -249,14 +256,11 @@ class Serial(observer.Observer):
         lines = []
         timeout = Timeout(self.timeout, self.raises_timeout)
         while True:
-            while (len(self._buffer) > 0):
-                try:
-                    index = self._buffer.index(CHAR_NEWLINE)
-                    line = self._buffer[0:(index+1)]
-                    self._buffer = self._buffer[(index+1):]
-                    lines.append(bytes(line))
-                except ValueError:
-                    break
+            index = self._buffer.find(CHAR_NEWLINE)
+            while index >= 0:
+                lines.append(bytes(self._buffer[0:(index+1)]))
+                del self._buffer[0:(index+1)]
+                index = self._buffer.find(CHAR_NEWLINE)
             if timeout.check():
                 break
         return lines
@@ -265,5 +269,5 @@ class Serial(observer.Observer):
         """Empty the serial buffer."""
         if not self._open:
             raise SerialException("Socket {} is closed".format(self._socket))
-        self._buffer = []
+        self._buffer = bytearray()
 # -----------------------
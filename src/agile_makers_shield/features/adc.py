@@ -27,9 +27,13 @@ Date: April 2017
 # --- Imports -----------
 import dbus
 import dbus.service
+import functools
+import time
+from gi.repository import GLib
 from agile_makers_shield.buses.dbus import feature_base as dbF
 from agile_makers_shield.buses.dbus import constants as db_cons
 from agile_makers_shield.buses.i2c import mcp3424
+from agile_makers_shield.utils import sampler
 # -----------------------
 
 
@@ -40,12 +44,23 @@ ADC_PARAMS = {
     "MODE": "mode",
     "RESOLUTION": "resolution",
     "PGA": "pga",
-    "VALUE": "value"
+    "VALUE": "value",
+    "BLOCK": "block",
+    "TIMESTAMPS": "timestamps",
+    "VALUES": "values",
+    "CHANNELS": "channels",
+    "TIMESTAMP": "timestamp",
+    "AGE": "age",
+    "ERROR": "error"
 }
 ADC_DEFAULTS = {
     "MODE": "one_shoot",
     "RESOLUTION": 18,
-    "PGA": 1
+    "PGA": 1,
+    "STREAM_RESOLUTION": 12,
+    "BLOCK": mcp3424.MCP3424_STREAM_BLOCK,
+    "SAMPLING_PERIOD": 0.0,  # Seconds, 0 if not sampled
+    "SAMPLING_RESOLUTION": 16
 }
 ADC_CHANNELS = {
     1: mcp3424.MCP3424_CHANNEL_1,
@@ -53,6 +68,7 @@ ADC_CHANNELS = {
     3: mcp3424.MCP3424_CHANNEL_3,
     4: mcp3424.MCP3424_CHANNEL_4
 }
+ADC_CHANNEL_NAMES = {dev: name for name, dev in ADC_CHANNELS.items()}
 ADC_MODES = {
     "one_shoot": mcp3424.MCP3424_MODE_ONE_SHOOT,
     "continuous": mcp3424.MCP3424_MODE_CONTINUOUS
@@ -99,6 +115,31 @@ class ADC_Obj(dbF.FeatureObj):
         """Init method."""
         super().__init__(FEATURE_NAME)
         self._mcp3424 = mcp3424.MCP3424()
+        # Sample every channel in the background
+        self._sampler = sampler.Sampler()
+        for channel in ADC_CHANNELS.keys():
+            self._sampler.addSource(
+                self._sourceName(channel),
+                functools.partial(self._sampleChannel, channel),
+                [ADC_PARAMS["VALUE"]],
+                ADC_DEFAULTS["SAMPLING_PERIOD"]
+            )
+
+    def _sourceName(self, channel):
+        """Return the name of the sampler source of a channel."""
+        return "{}/{}".format(FEATURE_NAME, channel)
+
+    def _sampleChannel(self, channel):
+        """Return a sample of a channel, None while streaming."""
+        if self._mcp3424.isStreaming():
+            return None
+        value = self._mcp3424.read(
+            ADC_CHANNELS[channel],
+            mcp3424.MCP3424_MODE_ONE_SHOOT,
+            ADC_RESOLUTIONS[ADC_DEFAULTS["SAMPLING_RESOLUTION"]],
+            ADC_PGAS[ADC_DEFAULTS["PGA"]]
+        )
+        return (value,)
 
     # Override DBus object methods
 
@@ -160,4 +201,181 @@ class ADC_Obj(dbF.FeatureObj):
         result[ADC_PARAMS["VALUE"]] = value
         self._logger.debug("{}@readADC: OK".format(self._full_path))
         return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature="a{sv}"
+    )
+    def readADCLatest(self, args):
+        """Return the last background sample of a channel over DBus."""
+        self._logger.debug("{}@readADCLatest: INIT".format(self._full_path))
+        channel = self._popChannel(args, "readADCLatest")
+        latest = self._sampler.getLatest(self._sourceName(channel))
+        if latest is None:
+            self._logger.debug(
+                "{}@readADCLatest: No sample".format(self._full_path)
+            )
+            raise ADC_Exception("No sample of the channel.")
+        ts, values = latest
+        result = {}
+        result[ADC_PARAMS["CHANNEL"]] = channel
+        result[ADC_PARAMS["VALUE"]] = values[0]
+        result[ADC_PARAMS["TIMESTAMP"]] = self._sampler.toWallTime(ts)
+        result[ADC_PARAMS["AGE"]] = time.monotonic() - ts
+        self._logger.debug("{}@readADCLatest: OK".format(self._full_path))
+        return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature="a{sv}"
+    )
+    def getADCHistory(self, args):
+        """Return the background samples of a channel over DBus."""
+        self._logger.debug("{}@getADCHistory: INIT".format(self._full_path))
+        channel = self._popChannel(args, "getADCHistory")
+        result = self._getHistory(
+            self._sourceName(channel), args, "getADCHistory"
+        )
+        result[ADC_PARAMS["CHANNEL"]] = channel
+        self._logger.debug("{}@getADCHistory: OK".format(self._full_path))
+        return result
+
+    def _popChannel(self, args, method):
+        """Return the channel of the arguments."""
+        try:
+            channel = args.pop(ADC_PARAMS["CHANNEL"])
+        except KeyError:
+            self._logger.debug(
+                "{}@{}: Channel not specified".format(self._full_path, method)
+            )
+            raise ADC_Exception("Channel not specified.")
+        if channel not in ADC_CHANNELS.keys():
+            self._logger.debug(
+                "{}@{}: Invalid channel".format(self._full_path, method)
+            )
+            raise ADC_Exception("Invalid channel.")
+        return channel
+
+    def _parseChannel(self, args, method, resolution):
+        """Return the channel, resolution and pga of the arguments."""
+        channel = self._popChannel(args, method)
+        resolution = args.pop(ADC_PARAMS["RESOLUTION"], resolution)
+        if resolution not in ADC_RESOLUTIONS.keys():
+            self._logger.debug(
+                "{}@{}: Invalid resolution".format(self._full_path, method)
+            )
+            raise ADC_Exception("Invalid resolution.")
+        pga = args.pop(ADC_PARAMS["PGA"], ADC_DEFAULTS["PGA"])
+        if pga not in ADC_PGAS.keys():
+            self._logger.debug(
+                "{}@{}: Invalid pga".format(self._full_path, method)
+            )
+            raise ADC_Exception("Invalid pga.")
+        return channel, resolution, pga
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="aa{sv}",
+        out_signature="a{sv}"
+    )
+    def readADCMulti(self, args):
+        """Read several channels of the ADC back to back over DBus."""
+        self._logger.debug("{}@readADCMulti: INIT".format(self._full_path))
+        channels = []
+        configs = []
+        for channel_args in args:
+            channel, resolution, pga = self._parseChannel(
+                channel_args, "readADCMulti", ADC_DEFAULTS["RESOLUTION"]
+            )
+            channels.append(channel)
+            configs.append((
+                ADC_CHANNELS[channel],
+                ADC_RESOLUTIONS[resolution],
+                ADC_PGAS[pga]
+            ))
+        try:
+            values = self._mcp3424.readMulti(configs)
+        except:
+            self._logger.debug("{}@readADCMulti: Problem reading from the "
+                               "AGILE Maker's Shield".format(self._full_path))
+            raise ADC_Exception("Problem reading from "
+                                "the AGILE Maker's Shield.")
+        result = {}
+        result[ADC_PARAMS["CHANNELS"]] = dbus.Array(channels, signature="i")
+        result[ADC_PARAMS["VALUES"]] = dbus.Array(values, signature="d")
+        self._logger.debug("{}@readADCMulti: OK".format(self._full_path))
+        return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature=""
+    )
+    def startStream(self, args):
+        """Stream a channel of the ADC with a StreamBlock signal per block."""
+        self._logger.debug("{}@startStream: INIT".format(self._full_path))
+        channel, resolution, pga = self._parseChannel(
+            args, "startStream", ADC_DEFAULTS["STREAM_RESOLUTION"]
+        )
+        block = args.pop(ADC_PARAMS["BLOCK"], ADC_DEFAULTS["BLOCK"])
+        if block < 1:
+            self._logger.debug(
+                "{}@startStream: Invalid block".format(self._full_path)
+            )
+            raise ADC_Exception("Invalid block.")
+        self._mcp3424.startStream(
+            self._streamCallback,
+            ADC_CHANNELS[channel],
+            ADC_RESOLUTIONS[resolution],
+            ADC_PGAS[pga],
+            block,
+            self._streamEndCallback
+        )
+        self._logger.debug("{}@startStream: OK".format(self._full_path))
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="",
+        out_signature=""
+    )
+    def stopStream(self):
+        """Stop the stream of the ADC."""
+        self._logger.debug("{}@stopStream: INIT".format(self._full_path))
+        self._mcp3424.stopStream()
+        self._logger.debug("{}@stopStream: OK".format(self._full_path))
+
+    def _streamCallback(self, channel, timestamps, values):
+        """Emit a block of the stream from the mainloop."""
+        result = {}
+        result[ADC_PARAMS["CHANNEL"]] = ADC_CHANNEL_NAMES[channel]
+        result[ADC_PARAMS["TIMESTAMPS"]] = dbus.Array(
+            timestamps, signature="d"
+        )
+        result[ADC_PARAMS["VALUES"]] = dbus.Array(values, signature="d")
+        block = dbus.Dictionary(result, signature="sv")
+        GLib.idle_add(self.StreamBlock, block)
+
+    def _streamEndCallback(self, channel, error):
+        """Emit the end of the stream from the mainloop."""
+        result = {}
+        result[ADC_PARAMS["CHANNEL"]] = ADC_CHANNEL_NAMES[channel]
+        if error is not None:
+            self._logger.debug("{}@startStream: Stream stopped: {}".format(
+                self._full_path, error
+            ))
+            result[ADC_PARAMS["ERROR"]] = error
+        GLib.idle_add(self.StreamEnded, dbus.Dictionary(result,
+                                                        signature="sv"))
+
+    @dbus.service.signal(db_cons.BUS_NAME["Feature"], signature="a{sv}")
+    def StreamBlock(self, block):
+        """Signal with a block of samples of the stream."""
+        pass
+
+    @dbus.service.signal(db_cons.BUS_NAME["Feature"], signature="a{sv}")
+    def StreamEnded(self, end):
+        """Signal with the channel and the error when the stream ends."""
+        pass
 # -----------------------
@@ -28,9 +28,11 @@ Date: April 2017
 # --- Imports -----------
 import dbus
 import dbus.service
+import time
 from agile_makers_shield.buses.dbus import feature_base as dbF
 from agile_makers_shield.buses.dbus import constants as db_cons
 from agile_makers_shield.buses.i2c import bme280
+from agile_makers_shield.utils import sampler
 # -----------------------
 
 
@@ -39,8 +41,23 @@ FEATURE_NAME = "Atmospheric_Sensor"
 SENSOR_PARAMS = {
     "TEMPERATURE": "temperature",
     "HUMIDITY": "humidity",
-    "PRESSURE": "pressure"
+    "PRESSURE": "pressure",
+    "TIMESTAMP": "timestamp",
+    "AGE": "age"
 }
+SENSOR_OVERSAMPLINGS = {
+    0: bme280.BME280_OVERSAMP_SKIPPED,
+    1: bme280.BME280_OVERSAMP_1X,
+    2: bme280.BME280_OVERSAMP_2X,
+    4: bme280.BME280_OVERSAMP_4X,
+    8: bme280.BME280_OVERSAMP_8X,
+    16: bme280.BME280_OVERSAMP_16X
+}
+SENSOR_DEFAULTS = {
+    "OVERSAMPLING": 16,
+    "SAMPLING_PERIOD": 0.0  # Seconds, 0 if not sampled
+}
+SENSOR_FIELDS = ["TEMPERATURE", "HUMIDITY", "PRESSURE"]
 # -----------------------
 
 
@@ -71,6 +88,27 @@ class Atmospheric_Sensor_Obj(dbF.FeatureObj):
         """Init method."""
         super().__init__(FEATURE_NAME)
         self._bme280 = bme280.BME280()
+        self._normal = False  # If the sensor measures continuously
+        # Sample the last measurement in the background
+        self._sampler = sampler.Sampler()
+        self._sampler.addSource(
+            FEATURE_NAME,
+            self._sample,
+            [SENSOR_PARAMS[field] for field in SENSOR_FIELDS],
+            SENSOR_DEFAULTS["SAMPLING_PERIOD"]
+        )
+
+    def _sample(self):
+        """Return a sample with the last measurement of the normal mode.
+
+        The normal mode is started by the first sample, so the sensor
+        only measures continuously once it is sampled in the background.
+        """
+        if not self._normal:
+            self._bme280.startNormal()
+            self._normal = True
+        result = self._bme280.readLatest()
+        return tuple(result[SENSOR_PARAMS[field]] for field in SENSOR_FIELDS)
 
     # Override DBus object methods
 
@@ -85,9 +123,7 @@ class Atmospheric_Sensor_Obj(dbF.FeatureObj):
             "{}@readAtmosphericSensor: INIT".format(self._full_path)
         )
         try:
-            temperature = self._bme280.getTemperature()
-            humidity = self._bme280.getHumidity()
-            pressure = self._bme280.getPressure()
+            result = self._bme280.readAll()
         except:
             self._logger.debug(
                 "{}@readAtmosphericSensor: Problem reading "
@@ -96,12 +132,104 @@ class Atmospheric_Sensor_Obj(dbF.FeatureObj):
             raise Atmospheric_Sensor_Exception(
                 "Problem reading from the AGILE Maker's Shield."
             )
-        result = {}
-        result[SENSOR_PARAMS["TEMPERATURE"]] = temperature
-        result[SENSOR_PARAMS["HUMIDITY"]] = humidity
-        result[SENSOR_PARAMS["PRESSURE"]] = pressure
         self._logger.debug(
             "{}@readAtmosphericSensor: OK".format(self._full_path)
         )
         return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="",
+        out_signature="a{sv}"
+    )
+    def readAtmosphericSensorLatest(self):
+        """Return the last background sample of the sensor over DBus."""
+        self._logger.debug(
+            "{}@readAtmosphericSensorLatest: INIT".format(self._full_path)
+        )
+        latest = self._sampler.getLatest(FEATURE_NAME)
+        if latest is None:
+            self._logger.debug(
+                "{}@readAtmosphericSensorLatest: No sample".format(
+                    self._full_path
+                )
+            )
+            raise Atmospheric_Sensor_Exception("No sample of the sensor.")
+        ts, values = latest
+        result = {}
+        for field, value in zip(SENSOR_FIELDS, values):
+            result[SENSOR_PARAMS[field]] = value
+        result[SENSOR_PARAMS["TIMESTAMP"]] = self._sampler.toWallTime(ts)
+        result[SENSOR_PARAMS["AGE"]] = time.monotonic() - ts
+        self._logger.debug(
+            "{}@readAtmosphericSensorLatest: OK".format(self._full_path)
+        )
+        return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature="a{sv}"
+    )
+    def getAtmosphericSensorHistory(self, args):
+        """Return the background samples of the sensor over DBus."""
+        self._logger.debug(
+            "{}@getAtmosphericSensorHistory: INIT".format(self._full_path)
+        )
+        result = self._getHistory(
+            FEATURE_NAME, args, "getAtmosphericSensorHistory"
+        )
+        self._logger.debug(
+            "{}@getAtmosphericSensorHistory: OK".format(self._full_path)
+        )
+        return result
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature="a{sv}"
+    )
+    def readAtmosphericSensorOversampled(self, args):
+        """Read the Atmospheric Sensor with the given oversamplings."""
+        self._logger.debug(
+            "{}@readAtmosphericSensorOversampled: INIT".format(
+                self._full_path
+            )
+        )
+        oversamplings = {}
+        for param in SENSOR_FIELDS:
+            oversampling = args.pop(
+                SENSOR_PARAMS[param],
+                SENSOR_DEFAULTS["OVERSAMPLING"]
+            )
+            if (oversampling not in SENSOR_OVERSAMPLINGS.keys()) or \
+                    ((param == "TEMPERATURE") and (oversampling == 0)):
+                self._logger.debug(
+                    "{}@readAtmosphericSensorOversampled: Invalid {} "
+                    "oversampling".format(
+                        self._full_path, SENSOR_PARAMS[param]
+                    )
+                )
+                raise Atmospheric_Sensor_Exception(
+                    "Invalid {} oversampling.".format(SENSOR_PARAMS[param])
+                )
+            oversamplings[param] = SENSOR_OVERSAMPLINGS[oversampling]
+        try:
+            result = self._bme280.readAll(
+                oversamplings["TEMPERATURE"],
+                oversamplings["HUMIDITY"],
+                oversamplings["PRESSURE"]
+            )
+        except:
+            self._logger.debug(
+                "{}@readAtmosphericSensorOversampled: Problem reading "
+                "from the AGILE Maker's Shield".format(self._full_path)
+            )
+            raise Atmospheric_Sensor_Exception(
+                "Problem reading from the AGILE Maker's Shield."
+            )
+        self._logger.debug(
+            "{}@readAtmosphericSensorOversampled: OK".format(self._full_path)
+        )
+        return dbus.Dictionary(result, signature="sv")
 # -----------------------
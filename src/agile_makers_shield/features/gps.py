@@ -27,9 +27,16 @@ Date: April 2017
 # --- Imports -----------
 import dbus
 import dbus.service
+import threading
+import time
+from gi.repository import GLib
 from agile_makers_shield.buses.dbus import feature_base as dbF
 from agile_makers_shield.buses.dbus import constants as db_cons
 from agile_makers_shield.buses.i2c import atmega
+from agile_makers_shield.utils import geofence
+from agile_makers_shield.utils import nmea
+from agile_makers_shield.utils import sampler
+from agile_makers_shield.utils import track_log
 # -----------------------
 
 
@@ -53,6 +60,45 @@ GPS_FRAME = {
                    "magneticVar", "magneticVarDir", "fix"]
     }
 }
+GPS_PARAMS = {
+    "LATITUDE": "latitude",
+    "LONGITUDE": "longitude",
+    "ALTITUDE": "altitude",
+    "SPEED": "speed",
+    "COURSE": "course",
+    "FIX": "fix",
+    "TIMESTAMP": "timestamp",
+    "AGE": "age",
+    "DISTANCE": "distance",
+    "INTERVAL": "interval",
+    "TIMESTAMPS": "timestamps",
+    "NAME": "name",
+    "TYPE": "type",
+    "RADIUS": "radius",
+    "LATITUDES": "latitudes",
+    "LONGITUDES": "longitudes",
+    "INSIDE": "inside"
+}
+GEOFENCE_TYPES = ["circle", "polygon"]
+GPS_FIELDS = ["LATITUDE", "LONGITUDE", "ALTITUDE"]
+GPS_DEFAULTS = {
+    "SAMPLING_PERIOD": 0.0,  # Seconds, 0 if not sampled
+    "SIGNAL_DISTANCE": 10.0,  # Meters moved that fire a FixChanged signal
+    "SIGNAL_INTERVAL": 60.0  # Seconds that fire a FixChanged signal
+}
+GPS_FIX = [  # Values of getFix: (name, sentence, field)
+    ("quality", "GGA", "quality"),
+    ("satellites", "GGA", "satellites"),
+    ("hdop", "GGA", "hdop"),
+    ("latitude", "GGA", "latitude"),
+    ("longitude", "GGA", "longitude"),
+    ("altitude", "GGA", "altitude"),
+    ("geoid", "GGA", "geoid"),
+    ("speed", "RMC", "speed"),
+    ("course", "RMC", "course"),
+    ("variation", "RMC", "variation"),
+    ("time", "RMC", "time")
+]
 # -----------------------
 
 
@@ -60,12 +106,12 @@ GPS_FRAME = {
 class GPS(dbF.Feature):
     """Expose the GPS over DBus."""
 
-    def __init__(self):
+    def __init__(self, track_path=None):
         """Init method."""
         super().__init__()
         self.feature_name = FEATURE_NAME
         self._exception = GPS_Exception()
-        self._obj = GPS_Obj()
+        self._obj = GPS_Obj(track_path)
 
 
 class GPS_Exception(dbF.FeatureException):
@@ -79,66 +125,218 @@ class GPS_Exception(dbF.FeatureException):
 class GPS_Obj(dbF.FeatureObj):
     """DBus object for the GPS."""
 
-    def __init__(self):
+    def __init__(self, track_path=None):
         """Init method."""
         super().__init__(FEATURE_NAME)
         self._atmega = atmega.ATMega()
+        self._lock = threading.Lock()
+        self._fix = None  # Last update of the GPS, parsed
+        self._signaled = None  # Last fix sent with FixChanged
+        self._signalDistance = GPS_DEFAULTS["SIGNAL_DISTANCE"]
+        self._signalInterval = GPS_DEFAULTS["SIGNAL_INTERVAL"]
+        self._geofences = geofence.Geofences()
+        self._fenced = None  # Last fix checked against the geofences
+        # Update the GPS in the background and sample the position
+        self._sampler = sampler.Sampler()
+        self._sampler.addSource(
+            FEATURE_NAME,
+            self._sample,
+            [GPS_PARAMS[field] for field in GPS_FIELDS],
+            GPS_DEFAULTS["SAMPLING_PERIOD"]
+        )
+        # Record the fixes of the updates in a file
+        self._track = None
+        if track_path is not None:
+            self._track = track_log.TrackLog(track_path)
 
-    def _frameToArray(self, frame):
-        """Parse the GPS frame and convert it to bytearray."""
-        return bytearray(frame).decode("utf-8").strip("\x00")[0:-3].split(",")
-
-    def _checkFrame(self, frame, nmeaType):
-        """Check if the GPS NMEA frame is valid."""
-        length = 0
-        while length < len(frame):
-            if frame[length] == 0x00:
-                break
-            length = length + 1
-        if length < 10:
-            self._logger.debug("{}@getLast{}: Frame is too "
-                               "short".format(self._full_path, nmeaType))
-            return False
-        if frame[0] != ord("$"):
-            self._logger.debug("{}@getLast{}: Invalid start of "
-                               "frame".format(self._full_path, nmeaType))
-            return False
-        if frame[length-3] != ord("*"):
-            self._logger.debug("{}@getLast{}: Invalid end of "
-                               "frame".format(self._full_path, nmeaType))
-            return False
-        checksum = 0
-        for char in frame[1:(length-3)]:
-            checksum = checksum ^ char
-        checkFrame = (int(chr(frame[length-2]), 16) << 4) | \
-            int(chr(frame[length-1]), 16)
-        if checksum != checkFrame:
-            # self._logger.warning("Checksum failed")
-            return False
-        return True
-
-    def _getGPSFrame(self, nmeaType, getFrameFunction):
-        """Return a dict with the GPS NMEA sentence from the GPS."""
-        nmea = GPS_FRAME[nmeaType]
+    def _update(self):
+        """Update the GPS, parse both frames and cache the fix.
+
+        Return the fix: a dict with the GGA and RMC frames as text and
+        parsed (None if invalid), the monotonic time of the update and,
+        if the GPS has a fix, the position, speed (knots) and course
+        (degrees).
+        """
+        with self._lock:
+            if not self._atmega.updateGPS():
+                raise IOError("Could not update the GPS")
+            fix = {"time": time.monotonic()}
+            for nmeaType, getFrameFunction in [
+                    ("GGA", self._atmega.getGPSGGA),
+                    ("RMC", self._atmega.getGPSRMC)]:
+                fields = nmea.split(bytes(getFrameFunction()))
+                fix[nmeaType] = self._getGPSFrame(nmeaType, fields)
+                fix[nmeaType.lower()] = None if fields is None \
+                    else nmea.convert(fields)
+            gga = fix["gga"] or {}
+            rmc = fix["rmc"] or {}
+            fix["valid"] = bool(gga.get("quality")) and \
+                (gga["latitude"] is not None) and \
+                (gga["longitude"] is not None)
+            if fix["valid"]:
+                fix["latitude"] = gga["latitude"]
+                fix["longitude"] = gga["longitude"]
+                fix["altitude"] = gga["altitude"]
+                fix["speed"] = rmc.get("speed")
+                fix["course"] = rmc.get("course")
+            self._fix = fix
+            self._logFix(fix)
+            self._checkGeofences(fix)
+        self._checkFixChanged(fix)
+        return fix
+
+    def _logFix(self, fix):
+        """Record a fix with a GGA frame in the track log."""
+        gga = fix["gga"]
+        if (self._track is None) or (gga is None):
+            return
+        nan = float("nan")
+        try:
+            self._track.append(
+                self._sampler.toWallTime(fix["time"]),
+                fix["latitude"] if fix["valid"] else nan,
+                fix["longitude"] if fix["valid"] else nan,
+                nan if gga["altitude"] is None else gga["altitude"],
+                int(fix["valid"]),
+                gga["satellites"] or 0,
+                nan if gga["hdop"] is None else gga["hdop"]
+            )
+        except (IOError, ValueError) as e:
+            # The clock went back or the file could not be written
+            self._logger.warning("{}: Fix not recorded in the track log: "
+                                 "{}".format(self._full_path, e))
+
+    def _getFix(self):
+        """Return the cached fix, updating the GPS if there is none."""
+        fix = self._fix
+        if fix is None:
+            fix = self._update()
+        return fix
+
+    def _sample(self):
+        """Update the GPS, return the position or None without a fix."""
+        fix = self._update()
+        if not fix["valid"]:
+            return None
+        altitude = fix["altitude"]
+        if altitude is None:
+            altitude = float("nan")
+        return (fix["latitude"], fix["longitude"], altitude)
+
+    def _distance(self, fix1, fix2):
+        """Return the meters between the positions of two fixes."""
+        return geofence.distance(fix1["latitude"], fix1["longitude"],
+                                 fix2["latitude"], fix2["longitude"])
+
+    def _checkFixChanged(self, fix):
+        """Emit FixChanged if the fix moved, was lost or got old."""
+        last = self._signaled
+        if last is None:
+            changed = True
+        elif fix["valid"] != last["valid"]:
+            changed = True
+        elif fix["valid"] and \
+                (self._distance(last, fix) >= self._signalDistance):
+            changed = True
+        else:
+            changed = bool(self._signalInterval) and \
+                ((fix["time"] - last["time"]) >= self._signalInterval)
+        if changed:
+            self._signaled = fix
+            GLib.idle_add(self.FixChanged, self._fixToDict(fix))
+
+    def _checkGeofences(self, fix):
+        """Emit GeofenceEntered and GeofenceExited for a new fix.
+
+        Without a fix the fences are left as they were.
+        """
+        if not fix["valid"]:
+            return
+        self._fenced = fix
+        entered, exited = self._geofences.update(
+            fix["latitude"], fix["longitude"]
+        )
+        self._emitGeofences(entered, exited, fix)
+
+    def _emitGeofences(self, entered, exited, fix):
+        """Emit GeofenceEntered and GeofenceExited with a fix."""
+        for name in exited:
+            GLib.idle_add(self.GeofenceExited, name, self._fixToDict(fix))
+        for name in entered:
+            GLib.idle_add(self.GeofenceEntered, name, self._fixToDict(fix))
+
+    def _fenceToDict(self, fence, inside):
+        """Return the DBus dictionary of a fence."""
+        result = {}
+        if isinstance(fence, geofence.Circle):
+            result[GPS_PARAMS["TYPE"]] = "circle"
+            result[GPS_PARAMS["LATITUDE"]] = fence.latitude
+            result[GPS_PARAMS["LONGITUDE"]] = fence.longitude
+            result[GPS_PARAMS["RADIUS"]] = fence.radius
+        else:
+            result[GPS_PARAMS["TYPE"]] = "polygon"
+            result[GPS_PARAMS["LATITUDES"]] = \
+                dbus.Array(fence.latitudes, signature="d")
+            result[GPS_PARAMS["LONGITUDES"]] = \
+                dbus.Array(fence.longitudes, signature="d")
+        result[GPS_PARAMS["INSIDE"]] = inside
+        return dbus.Dictionary(result, signature="sv")
+
+    def _fixToDict(self, fix):
+        """Return the DBus dictionary of a fix."""
+        result = {}
+        result[GPS_PARAMS["FIX"]] = fix["valid"]
+        if fix["valid"]:
+            for param in ["LATITUDE", "LONGITUDE", "ALTITUDE",
+                          "SPEED", "COURSE"]:
+                if fix[GPS_PARAMS[param]] is not None:
+                    result[GPS_PARAMS[param]] = fix[GPS_PARAMS[param]]
+        result[GPS_PARAMS["TIMESTAMP"]] = self._sampler.toWallTime(
+            fix["time"]
+        )
+        return dbus.Dictionary(result, signature="sv")
+
+    def _getCachedFrame(self, nmeaType, method):
+        """Return the cached frame of a type with its age over DBus."""
+        self._logger.debug("{}@{}: INIT".format(self._full_path, method))
+        try:
+            fix = self._getFix()
+        except:
+            self._logger.debug("{}@{}: Problem reading from the AGILE "
+                               "Maker's Shield.".format(self._full_path,
+                                                        method))
+            raise GPS_Exception("Problem reading from the AGILE "
+                                "Maker's Shield.")
+        result = dict(fix[nmeaType])
+        result[GPS_PARAMS["AGE"]] = time.monotonic() - fix["time"]
+        self._logger.debug("{}@{}: OK".format(self._full_path, method))
+        return dbus.Dictionary(result, signature="sv")
+
+    def _getGPSFrame(self, nmeaType, fields):
+        """Return a dict with the fields of a GPS NMEA frame as text.
+
+        The fields are empty if the frame is not valid.
+        """
+        frame = GPS_FRAME[nmeaType]
         # Create an empty frame
         gpsFrame = {}
-        for field in nmea["fields"]:
+        for field in frame["fields"]:
             gpsFrame[field] = ""
-        gpsFrame["type"] = nmea["type"]
-        # Get the frame from the GPS
-        frame = getFrameFunction()
-        # Check the frame and save the data if it is correct
-        if self._checkFrame(frame, nmeaType):
-            data = self._frameToArray(frame)
-            if (data[0] != nmea["header"]) or (len(data) != nmea["length"]):
-                self._logger.debug(
-                    "{}@getLast{}: Frame does not match {} "
-                    "frame".format(self._full_path, nmeaType, nmeaType)
-                )
-            else:
-                for i, field in enumerate(nmea["fields"]):
-                    gpsFrame[field] = data[i]
-                gpsFrame["type"] = nmea["type"]
+        gpsFrame["type"] = frame["type"]
+        # Save the data if the frame is correct
+        if fields is None:
+            self._logger.debug("{}@getLast{}: Invalid "
+                               "frame".format(self._full_path, nmeaType))
+        elif (("$" + fields[0]) != frame["header"]) or \
+                (len(fields) != frame["length"]):
+            self._logger.debug(
+                "{}@getLast{}: Frame does not match {} "
+                "frame".format(self._full_path, nmeaType, nmeaType)
+            )
+        else:
+            for i, field in enumerate(frame["fields"]):
+                gpsFrame[field] = fields[i]
+            gpsFrame["type"] = frame["type"]
         return gpsFrame
 
     # Override DBus object methods
@@ -152,7 +350,7 @@ class GPS_Obj(dbF.FeatureObj):
         """Update the GPS with new information."""
         self._logger.debug("{}@updateGPS: INIT".format(self._full_path))
         try:
-            self._atmega.updateGPS()
+            self._update()
         except:
             self._logger.debug("{}@updateGPS: Problem writing to the AGILE "
                                "Maker's Shield.".format(self._full_path))
@@ -165,17 +363,12 @@ class GPS_Obj(dbF.FeatureObj):
         out_signature="a{sv}"
     )
     def getLastGGA(self):
-        """Return the last GGA frame stored after updating the GPS."""
-        self._logger.debug("{}@getLastGGA: INIT".format(self._full_path))
-        try:
-            result = self._getGPSFrame("GGA", self._atmega.getGPSGGA)
-        except:
-            self._logger.debug("{}@getLastGGA: Problem reading from the AGILE "
-                               "Maker's Shield.".format(self._full_path))
-            raise GPS_Exception("Problem reading from the AGILE "
-                                "Maker's Shield.")
-        self._logger.debug("{}@getLastGGA: OK".format(self._full_path))
-        return dbus.Dictionary(result, signature="sv")
+        """Return the GGA frame cached by the last update of the GPS.
+
+        The update is the one of the background sampling or of
+        updateGPS, the frame is not read from the GPS here.
+        """
+        return self._getCachedFrame("GGA", "getLastGGA")
 
     @dbus.service.method(
         db_cons.BUS_NAME["Feature"],
@@ -183,15 +376,230 @@ class GPS_Obj(dbF.FeatureObj):
         out_signature="a{sv}"
     )
     def getLastRMC(self):
-        """Return the last RMC frame stored after updating the GPS."""
-        self._logger.debug("{}@getLastRMC: INIT".format(self._full_path))
+        """Return the RMC frame cached by the last update of the GPS.
+
+        The update is the one of the background sampling or of
+        updateGPS, the frame is not read from the GPS here.
+        """
+        return self._getCachedFrame("RMC", "getLastRMC")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="",
+        out_signature="a{sv}"
+    )
+    def getLatestPosition(self):
+        """Return the last background sample of the position over DBus."""
+        self._logger.debug(
+            "{}@getLatestPosition: INIT".format(self._full_path)
+        )
+        latest = self._sampler.getLatest(FEATURE_NAME)
+        if latest is None:
+            self._logger.debug(
+                "{}@getLatestPosition: No sample".format(self._full_path)
+            )
+            raise GPS_Exception("No sample of the position.")
+        ts, values = latest
+        result = {}
+        for field, value in zip(GPS_FIELDS, values):
+            result[GPS_PARAMS[field]] = value
+        result[GPS_PARAMS["TIMESTAMP"]] = self._sampler.toWallTime(ts)
+        result[GPS_PARAMS["AGE"]] = time.monotonic() - ts
+        self._logger.debug("{}@getLatestPosition: OK".format(self._full_path))
+        return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature="a{sv}"
+    )
+    def getPositionHistory(self, args):
+        """Return the background samples of the position over DBus."""
+        self._logger.debug(
+            "{}@getPositionHistory: INIT".format(self._full_path)
+        )
+        result = self._getHistory(FEATURE_NAME, args, "getPositionHistory")
+        self._logger.debug(
+            "{}@getPositionHistory: OK".format(self._full_path)
+        )
+        return result
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature=""
+    )
+    def setFixSignal(self, args):
+        """Set the distance and time that fire a FixChanged signal."""
+        self._logger.debug("{}@setFixSignal: INIT".format(self._full_path))
+        distance = args.pop(GPS_PARAMS["DISTANCE"], self._signalDistance)
+        if distance < 0:
+            self._logger.debug(
+                "{}@setFixSignal: Invalid distance".format(self._full_path)
+            )
+            raise GPS_Exception("Invalid distance.")
+        interval = args.pop(GPS_PARAMS["INTERVAL"], self._signalInterval)
+        if interval < 0:
+            self._logger.debug(
+                "{}@setFixSignal: Invalid interval".format(self._full_path)
+            )
+            raise GPS_Exception("Invalid interval.")
+        self._signalDistance = distance
+        self._signalInterval = interval
+        self._logger.debug("{}@setFixSignal: OK".format(self._full_path))
+
+    @dbus.service.signal(db_cons.BUS_NAME["Feature"], signature="a{sv}")
+    def FixChanged(self, fix):
+        """Signal with the fix when it moves, is lost or gets old."""
+        pass
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="",
+        out_signature="a{sv}"
+    )
+    def getFix(self):
+        """Return the last fix with typed values over DBus."""
+        self._logger.debug("{}@getFix: INIT".format(self._full_path))
         try:
-            result = self._getGPSFrame("RMC", self._atmega.getGPSGGA)
+            fix = self._getFix()
         except:
-            self._logger.debug("{}@getLastRMC: Problem reading from the AGILE "
+            self._logger.debug("{}@getFix: Problem reading from the AGILE "
                                "Maker's Shield.".format(self._full_path))
             raise GPS_Exception("Problem reading from the AGILE "
                                 "Maker's Shield.")
-        self._logger.debug("{}@getLastRMC: OK".format(self._full_path))
+        result = {}
+        for name, nmeaType, field in GPS_FIX:
+            frame = fix[nmeaType.lower()]
+            if (frame is not None) and (frame.get(field) is not None):
+                result[name] = frame[field]
+        result[GPS_PARAMS["FIX"]] = int(fix["valid"])
+        result[GPS_PARAMS["AGE"]] = time.monotonic() - fix["time"]
+        self._logger.debug("{}@getFix: OK".format(self._full_path))
+        return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="ddu",
+        out_signature="a{sv}"
+    )
+    def getTrack(self, start, end, max_points):
+        """Return the fixes of the track log over DBus."""
+        self._logger.debug("{}@getTrack: INIT".format(self._full_path))
+        if self._track is None:
+            self._logger.debug(
+                "{}@getTrack: No track log".format(self._full_path)
+            )
+            raise GPS_Exception("The track log is disabled.")
+        if max_points == 1:
+            self._logger.debug(
+                "{}@getTrack: Invalid points".format(self._full_path)
+            )
+            raise GPS_Exception("Invalid points.")
+        try:
+            timestamps, values = self._track.getRange(
+                start or None, end or None, max_points
+            )
+        except IOError:
+            self._logger.debug("{}@getTrack: Problem reading the track "
+                               "log".format(self._full_path))
+            raise GPS_Exception("Problem reading the track log.")
+        result = {}
+        result[GPS_PARAMS["TIMESTAMPS"]] = \
+            dbus.Array(timestamps, signature="d")
+        for name, data in zip(track_log.FIELDS, values):
+            result[name] = dbus.Array(data, signature="d")
+        self._logger.debug("{}@getTrack: OK".format(self._full_path))
         return dbus.Dictionary(result, signature="sv")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature=""
+    )
+    def addGeofence(self, args):
+        """Add a circle or polygon fence, replacing one with its name."""
+        self._logger.debug("{}@addGeofence: INIT".format(self._full_path))
+        name = args.pop(GPS_PARAMS["NAME"], "")
+        if not name:
+            self._logger.debug(
+                "{}@addGeofence: Invalid name".format(self._full_path)
+            )
+            raise GPS_Exception("Invalid name.")
+        fenceType = args.pop(GPS_PARAMS["TYPE"], "")
+        if fenceType not in GEOFENCE_TYPES:
+            self._logger.debug(
+                "{}@addGeofence: Invalid type".format(self._full_path)
+            )
+            raise GPS_Exception("Invalid type.")
+        try:
+            if fenceType == "circle":
+                fence = geofence.Circle(
+                    float(args.pop(GPS_PARAMS["LATITUDE"])),
+                    float(args.pop(GPS_PARAMS["LONGITUDE"])),
+                    float(args.pop(GPS_PARAMS["RADIUS"]))
+                )
+            else:
+                fence = geofence.Polygon(
+                    [float(value)
+                     for value in args.pop(GPS_PARAMS["LATITUDES"])],
+                    [float(value)
+                     for value in args.pop(GPS_PARAMS["LONGITUDES"])]
+                )
+        except KeyError as e:
+            self._logger.debug("{}@addGeofence: Missing {}".format(
+                self._full_path, e.args[0]
+            ))
+            raise GPS_Exception("Missing {}.".format(e.args[0]))
+        except ValueError as e:
+            self._logger.debug("{}@addGeofence: {}".format(
+                self._full_path, e
+            ))
+            raise GPS_Exception("{}.".format(e))
+        # A replaced fence is exited if the last fix is out of the new one
+        entered, exited = self._geofences.add(str(name), fence)
+        if self._fenced is not None:
+            self._emitGeofences(entered, exited, self._fenced)
+        self._logger.debug("{}@addGeofence: OK".format(self._full_path))
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="s",
+        out_signature=""
+    )
+    def removeGeofence(self, name):
+        """Remove a fence by name."""
+        self._logger.debug("{}@removeGeofence: INIT".format(self._full_path))
+        try:
+            self._geofences.remove(name)
+        except ValueError:
+            self._logger.debug(
+                "{}@removeGeofence: Invalid geofence".format(self._full_path)
+            )
+            raise GPS_Exception("Invalid geofence.")
+        self._logger.debug("{}@removeGeofence: OK".format(self._full_path))
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="",
+        out_signature="a{sa{sv}}"
+    )
+    def getGeofences(self):
+        """Return the fences and if the position is inside them."""
+        self._logger.debug("{}@getGeofences: INIT".format(self._full_path))
+        result = {}
+        for name, (fence, inside) in self._geofences.getFences().items():
+            result[name] = self._fenceToDict(fence, inside)
+        self._logger.debug("{}@getGeofences: OK".format(self._full_path))
+        return dbus.Dictionary(result, signature="sa{sv}")
+
+    @dbus.service.signal(db_cons.BUS_NAME["Feature"], signature="sa{sv}")
+    def GeofenceEntered(self, name, fix):
+        """Signal with the name of a fence entered and the fix."""
+        pass
+
+    @dbus.service.signal(db_cons.BUS_NAME["Feature"], signature="sa{sv}")
+    def GeofenceExited(self, name, fix):
+        """Signal with the name of a fence exited and the fix."""
+        pass
 # -----------------------
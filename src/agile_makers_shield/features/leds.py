@@ -30,6 +30,7 @@ import dbus.service
 from agile_makers_shield.buses.dbus import feature_base as dbF
 from agile_makers_shield.buses.dbus import constants as db_cons
 from agile_makers_shield.buses.i2c import atmega
+from agile_makers_shield.utils import led_animation
 # -----------------------
 
 
@@ -38,7 +39,21 @@ FEATURE_NAME = "LEDs"
 LED_PARAMS = {
     "LED": "led",
     "COLOR": "color",
-    "BRIGHT": "bright"
+    "BRIGHT": "bright",
+    "EFFECT": "effect",
+    "PERIOD": "period",
+    "DUTY": "duty",
+    "COUNT": "count",
+    "DURATION": "duration",
+    "STEPS": "steps"
+}
+LED_EFFECTS = ["blink", "breathe", "fade", "sequence"]
+LED_DEFAULTS = {
+    "PERIOD": 1.0,
+    "DUTY": 0.5,
+    "COUNT": 0,  # Forever
+    "SEQUENCE_COUNT": 1,
+    "DURATION": 1.0
 }
 LED_NAMES = {
     "0": atmega.SOCKET_0,
@@ -87,33 +102,126 @@ class LEDs_Obj(dbF.FeatureObj):
         """Init method."""
         super().__init__(FEATURE_NAME)
         self._atmega = atmega.ATMega()
+        self._animator = led_animation.Animator(
+            self._atmega.getLeds, self._atmega.setLeds
+        )
 
-    # Override DBus object methods
-
-    @dbus.service.method(
-        db_cons.BUS_NAME["Feature"],
-        in_signature="a{sv}",
-        out_signature="a{sv}"
-    )
-    def getLedStatus(self, args):
-        """Get the status of a given LED."""
-        self._logger.debug("{}@getLedStatus: INIT".format(self._full_path))
+    def _getLed(self, args, method):
+        """Return the LED name of the arguments."""
         try:
             led = args.pop(LED_PARAMS["LED"])
         except KeyError:
             self._logger.debug(
-                "{}@getLedStatus: LED not specified.".format(self._full_path)
+                "{}@{}: LED not specified.".format(self._full_path, method)
             )
             raise LEDs_Exception("LED not specified.")
         if led not in LED_NAMES.keys():
             self._logger.debug(
-                "{}@getLedStatus: Not recognized LED.".format(self._full_path)
+                "{}@{}: Not recognized LED.".format(self._full_path, method)
             )
             raise LEDs_Exception("Not recognized LED.")
+        return led
+
+    def _getRegisters(self, led):
+        """Return a tuple with the registers of an LED."""
+        if LED_NAMES[led] in atmega.SOCKETS:
+            socket = LED_NAMES[led]
+            return (atmega.LEDS_SOCKET_R[socket],
+                    atmega.LEDS_SOCKET_G[socket],
+                    atmega.LEDS_SOCKET_B[socket])
+        return (atmega.LEDS_AUX[LED_NAMES[led]],)
+
+    def _parseColor(self, args, led, method):
+        """Return a tuple with the value of each register of an LED."""
+        if LED_NAMES[led] in atmega.SOCKETS:
+            try:
+                color = args.pop(LED_PARAMS["COLOR"])
+            except KeyError:
+                self._logger.debug("{}@{}: Color value not "
+                                   "specified.".format(self._full_path,
+                                                       method))
+                raise LEDs_Exception("Color value not specified.")
+            if len(color) != 3:
+                self._logger.debug("{}@{}: Invalid color "
+                                   "value.".format(self._full_path, method))
+                raise LEDs_Exception("Invalid color value.")
+            return tuple(int(value) & 0xFF for value in color)
+        try:
+            bright = int(args.pop(LED_PARAMS["BRIGHT"])) & 0xFF
+        except KeyError:
+            self._logger.debug("{}@{}: Bright value not "
+                               "specified.".format(self._full_path, method))
+            raise LEDs_Exception("Bright value not specified.")
+        return (bright,)
+
+    def _parseLed(self, args, method):
+        """Return the registers of an LED and the values to set."""
+        led = self._getLed(args, method)
+        return self._getRegisters(led), self._parseColor(args, led, method)
+
+    def _parseEffect(self, args, led, method):
+        """Return the effect described by the arguments for an LED."""
+        effect = args.pop(LED_PARAMS["EFFECT"], "")
+        if effect not in LED_EFFECTS:
+            self._logger.debug(
+                "{}@{}: Invalid effect.".format(self._full_path, method)
+            )
+            raise LEDs_Exception("Invalid effect.")
+        try:
+            if effect == "sequence":
+                steps = [self._parseEffect(dict(step), led, method)
+                         for step in args.pop(LED_PARAMS["STEPS"], [])]
+                return led_animation.Sequence(steps, int(args.pop(
+                    LED_PARAMS["COUNT"], LED_DEFAULTS["SEQUENCE_COUNT"]
+                )))
+            color = self._parseColor(args, led, method)
+            if effect == "fade":
+                return led_animation.Fade(color, float(args.pop(
+                    LED_PARAMS["DURATION"], LED_DEFAULTS["DURATION"]
+                )))
+            period = float(args.pop(LED_PARAMS["PERIOD"],
+                                    LED_DEFAULTS["PERIOD"]))
+            count = int(args.pop(LED_PARAMS["COUNT"], LED_DEFAULTS["COUNT"]))
+            if effect == "blink":
+                return led_animation.Blink(color, period, float(args.pop(
+                    LED_PARAMS["DUTY"], LED_DEFAULTS["DUTY"]
+                )), count)
+            return led_animation.Breathe(color, period, count)
+        except ValueError as e:
+            self._logger.debug(
+                "{}@{}: {}.".format(self._full_path, method, e)
+            )
+            raise LEDs_Exception("{}.".format(e))
+
+    def _setLeds(self, brights, method):
+        """Write the LED registers."""
+        try:
+            if not self._animator.write(brights):
+                raise IOError("Could not write the LEDs")
+        except:
+            self._logger.debug(
+                "{}@{}: Problem writing to the AGILE "
+                "Maker's Shield.".format(self._full_path, method)
+            )
+            raise LEDs_Exception(
+                "Problem writing to the AGILE Maker's Shield."
+            )
+
+    # Override DBus object methods
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature="a{sv}"
+    )
+    def getLedStatus(self, args):
+        """Get the status of a given LED."""
+        self._logger.debug("{}@getLedStatus: INIT".format(self._full_path))
+        led = self._getLed(args, "getLedStatus")
         result = {}
         result[LED_PARAMS["LED"]] = led
         try:
-            if led == "S0" or led == "S1":
+            if LED_NAMES[led] in atmega.SOCKETS:
                 color = self._atmega.getLedSocket(LED_NAMES[led])
                 result[LED_PARAMS["COLOR"]] = color
             else:
@@ -136,55 +244,80 @@ class LEDs_Obj(dbF.FeatureObj):
     def setLedStatus(self, args):
         """Set the status of a given LED."""
         self._logger.debug("{}@setLedStatus: INIT".format(self._full_path))
+        registers, values = self._parseLed(args, "setLedStatus")
+        self._animator.stop(registers)
+        self._setLeds(dict(zip(registers, values)), "setLedStatus")
+        self._logger.debug("{}@setLedStatus: OK".format(self._full_path))
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="aa{sv}",
+        out_signature=""
+    )
+    def setLeds(self, leds):
+        """Set the status of several LEDs at once."""
+        self._logger.debug("{}@setLeds: INIT".format(self._full_path))
+        brights = {}
+        for args in leds:
+            registers, values = self._parseLed(args, "setLeds")
+            self._animator.stop(registers)
+            brights.update(zip(registers, values))
+        self._setLeds(brights, "setLeds")
+        self._logger.debug("{}@setLeds: OK".format(self._full_path))
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature=""
+    )
+    def animateLed(self, args):
+        """Run an effect on an LED in the server."""
+        self._logger.debug("{}@animateLed: INIT".format(self._full_path))
+        led = self._getLed(args, "animateLed")
+        effect = self._parseEffect(args, led, "animateLed")
         try:
-            led = args.pop(LED_PARAMS["LED"])
-        except KeyError:
-            self._logger.debug(
-                "{}@setLedStatus: LED not specified.".format(self._full_path)
-            )
-            raise LEDs_Exception("LED not specified.")
-        if led not in LED_NAMES.keys():
-            self._logger.debug(
-                "{}@setLedStatus: Not recognized LED.".format(self._full_path)
+            self._animator.animate(self._getRegisters(led), effect)
+        except:
+            self._logger.debug("{}@animateLed: Problem reading from the "
+                               "AGILE Maker's Shield.".format(self._full_path))
+            raise LEDs_Exception(
+                "Problem reading from the AGILE Maker's Shield."
             )
-            raise LEDs_Exception("Not recognized LED.")
-        if led == "S0" or led == "S1":
-            try:
-                color_dbus = args.pop(LED_PARAMS["COLOR"])
-                color = []
-                color.append(int(color_dbus[0]) & 0xFF)
-                color.append(int(color_dbus[1]) & 0xFF)
-                color.append(int(color_dbus[2]) & 0xFF)
-            except KeyError:
-                self._logger.debug("{}@setLedStatus: Color value not "
-                                   "specified.".format(self._full_path))
-                raise LEDs_Exception("Color value not specified.")
-            try:
-                self._atmega.setLedSocket(LED_NAMES[led], color)
-            except:
-                self._logger.debug(
-                    "{}@setLedStatus: Problem writing to the AGILE "
-                    "Maker's Shield.".format(self._full_path)
-                )
-                raise LEDs_Exception(
-                    "Problem writing to the AGILE Maker's Shield."
-                )
+        self._logger.debug("{}@animateLed: OK".format(self._full_path))
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="a{sv}",
+        out_signature=""
+    )
+    def stopLedAnimation(self, args):
+        """Stop the effect of an LED, or of all of them without one."""
+        self._logger.debug(
+            "{}@stopLedAnimation: INIT".format(self._full_path)
+        )
+        if LED_PARAMS["LED"] in args:
+            led = self._getLed(args, "stopLedAnimation")
+            self._animator.stop(self._getRegisters(led))
         else:
-            try:
-                bright = int(args.pop(LED_PARAMS["BRIGHT"])) & 0xFF
-            except KeyError:
-                self._logger.debug("{}@setLedStatus: Bright value not "
-                                   "specified.".format(self._full_path))
-                raise LEDs_Exception("Bright value not specified.")
-            try:
-                self._atmega.setLedAux(LED_NAMES[led], bright)
-            except:
-                self._logger.debug(
-                    "{}@setLedStatus: Problem writing to the AGILE "
-                    "Maker's Shield.".format(self._full_path)
-                )
-                raise LEDs_Exception(
-                    "Problem writing to the AGILE Maker's Shield."
+            self._animator.stop()
+        self._logger.debug("{}@stopLedAnimation: OK".format(self._full_path))
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Feature"],
+        in_signature="d",
+        out_signature=""
+    )
+    def setLedFrameRate(self, fps):
+        """Set the frames per second of the effects at most."""
+        self._logger.debug("{}@setLedFrameRate: INIT".format(self._full_path))
+        try:
+            self._animator.setFrameRate(fps)
+        except ValueError:
+            self._logger.debug(
+                "{}@setLedFrameRate: Invalid frame rate".format(
+                    self._full_path
                 )
-        self._logger.debug("{}@setLedStatus: OK".format(self._full_path))
+            )
+            raise LEDs_Exception("Invalid frame rate.")
+        self._logger.debug("{}@setLedFrameRate: OK".format(self._full_path))
 # -----------------------
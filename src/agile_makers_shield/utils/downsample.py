@@ -0,0 +1,133 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE Downsample.
+
+Description: Functions to reduce a time series to a
+             number of points: the minimum, maximum and mean of
+             equal time buckets, or the points kept by the
+             Largest-Triangle-Three-Buckets algorithm, which
+             keeps the shape of the series when it is plotted,
+             or evenly spaced points. The timestamps must not
+             decrease.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import bisect
+import math
+# -----------------------
+
+
+# --- Variables ---------
+LTTB_MIN_POINTS = 3  # The first point, the last one and one in between
+STRIDE_MIN_POINTS = 2  # The first point and the last one
+# -----------------------
+
+
+# --- Functions ---------
+def lttb(timestamps, values, points):
+    """Return the indexes of the points kept by LTTB, in order."""
+    n = len(values)
+    if points >= n:
+        return list(range(n))
+    if points < LTTB_MIN_POINTS:
+        raise ValueError("Invalid number of points")
+    every = (n - 2) / (points - 2)
+    indexes = [0]
+    a = 0
+    for i in range(points - 2):
+        # Average of the next bucket, the third vertex of the triangles
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_t = sum(timestamps[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_v = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+        # The point of this bucket with the largest triangle
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        at, av = timestamps[a], values[a]
+        area_max = -1
+        a = start
+        for j in range(start, end):
+            area = abs(((at - avg_t) * (values[j] - av)) -
+                       ((at - timestamps[j]) * (avg_v - av)))
+            if area > area_max:
+                area_max = area
+                a = j
+        indexes.append(a)
+    indexes.append(n - 1)
+    return indexes
+
+
+def buckets(timestamps, fields, points, start=None, end=None):
+    """Return the minimum, maximum and mean of equal time buckets.
+
+    The buckets split the time from start to end (the first and last
+    timestamps by default) and the empty ones are left out. Return a
+    tuple with the start time of each bucket and a list with a tuple
+    of (minimums, maximums, means) per field. The NaN values are
+    skipped, and a bucket with only NaN values of a field has NaN
+    statistics for it.
+    """
+    if points < 1:
+        raise ValueError("Invalid number of points")
+    result = [([], [], []) for _ in fields]
+    starts = []
+    if not len(timestamps):
+        return starts, result
+    if start is None:
+        start = timestamps[0]
+    if end is None:
+        end = timestamps[-1]
+    width = (end - start) / points
+    first = bisect.bisect_left(timestamps, start)
+    for i in range(points):
+        if i == (points - 1):
+            last = bisect.bisect_right(timestamps, end)
+        else:
+            last = bisect.bisect_left(timestamps, start + ((i + 1) * width))
+        if last > first:
+            starts.append(start + (i * width))
+            for (mins, maxs, means), values in zip(result, fields):
+                bucket = [value for value in values[first:last]
+                          if not math.isnan(value)]
+                if not bucket:
+                    mins.append(math.nan)
+                    maxs.append(math.nan)
+                    means.append(math.nan)
+                    continue
+                mins.append(min(bucket))
+                maxs.append(max(bucket))
+                means.append(sum(bucket) / len(bucket))
+        first = last
+    return starts, result
+
+
+def stride(n, points):
+    """Return the indexes of points evenly spaced, first and last kept.
+
+    Only the indexes are computed, so the points can be read without
+    reading the whole series.
+    """
+    if points >= n:
+        return list(range(n))
+    if points < STRIDE_MIN_POINTS:
+        raise ValueError("Invalid number of points")
+    every = (n - 1) / (points - 1)
+    return [int(round(i * every)) for i in range(points)]
+# -----------------------
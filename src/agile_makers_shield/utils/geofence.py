@@ -0,0 +1,239 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE Geofence.
+
+Description: Classes that check the positions of the GPS
+             against circles and polygons. The fences are indexed
+             in a grid of cells of latitude and longitude by their
+             bounding box, so a position is only checked against
+             the fences of its cell and the ones it was inside,
+             and the fences entered and exited are found from the
+             previous position. The polygons are planar in
+             degrees and must not cross the antimeridian, the
+             circles may cross it.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import math
+import threading
+# -----------------------
+
+
+# --- Variables ---------
+EARTH_RADIUS = 6371000.0  # Mean radius in meters
+GRID_SIZE = 0.01  # Degrees of the cells, about 1 km
+MAX_CELLS = 1024  # Larger fences are checked against every position
+# -----------------------
+
+
+# --- Classes -----------
+class Circle():
+    """Fence of the positions within a radius of a center."""
+
+    def __init__(self, latitude, longitude, radius):
+        """Init method."""
+        if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+            raise ValueError("Invalid center")
+        if radius <= 0:
+            raise ValueError("Invalid radius")
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius = radius
+
+    def bounds(self):
+        """Return the (south, west, north, east) bounding box.
+
+        The longitudes are wrapped to [-180, 180), so west is greater
+        than east when the box crosses the antimeridian.
+        """
+        dlat = math.degrees(self.radius / EARTH_RADIUS)
+        cos = math.cos(math.radians(self.latitude))
+        dlon = 180.0 if cos < 1e-9 else min(180.0, dlat / cos)
+        south = max(-90.0, self.latitude - dlat)
+        north = min(90.0, self.latitude + dlat)
+        if (dlon >= 180.0) or (south <= -90.0) or (north >= 90.0):
+            # Around a pole every longitude is in the box
+            return (south, -180.0, north, 180.0)
+        return (south, _wrap(self.longitude - dlon),
+                north, _wrap(self.longitude + dlon))
+
+    def contains(self, latitude, longitude):
+        """Return if a position is inside the fence."""
+        return distance(self.latitude, self.longitude,
+                        latitude, longitude) <= self.radius
+
+
+class Polygon():
+    """Fence of the positions inside a polygon."""
+
+    def __init__(self, latitudes, longitudes):
+        """Init method."""
+        if (len(latitudes) != len(longitudes)) or (len(latitudes) < 3):
+            raise ValueError("Invalid polygon")
+        for latitude, longitude in zip(latitudes, longitudes):
+            if not (-90 <= latitude <= 90) or \
+                    not (-180 <= longitude <= 180):
+                raise ValueError("Invalid polygon")
+        self.latitudes = list(latitudes)
+        self.longitudes = list(longitudes)
+
+    def bounds(self):
+        """Return the (south, west, north, east) bounding box."""
+        return (min(self.latitudes), min(self.longitudes),
+                max(self.latitudes), max(self.longitudes))
+
+    def contains(self, latitude, longitude):
+        """Return if a position is inside the fence (ray casting)."""
+        inside = False
+        lats, lons = self.latitudes, self.longitudes
+        j = len(lats) - 1
+        for i in range(len(lats)):
+            if (lats[i] > latitude) != (lats[j] > latitude):
+                cross = lons[i] + ((latitude - lats[i]) *
+                                   (lons[j] - lons[i]) / (lats[j] - lats[i]))
+                if longitude < cross:
+                    inside = not inside
+            j = i
+        return inside
+
+
+class Geofences():
+    """Grid index of fences and the fences a position is inside."""
+
+    def __init__(self, size=GRID_SIZE):
+        """Init method."""
+        if size <= 0:
+            raise ValueError("Invalid size")
+        self._size = size
+        self._lock = threading.Lock()
+        self._fences = {}  # name: (fence, cells)
+        self._grid = {}  # cell: set of names
+        self._large = set()  # Names of the fences with too many cells
+        self._inside = set()
+        self._position = None  # Last (latitude, longitude) checked
+
+    def _cell(self, latitude, longitude):
+        """Return the cell of a position."""
+        return (math.floor(latitude / self._size),
+                math.floor(longitude / self._size))
+
+    def _cells(self, fence):
+        """Return the cells of the bounding box of a fence, or None."""
+        south, west, north, east = fence.bounds()
+        s, w = self._cell(south, west)
+        n, e = self._cell(north, east)
+        if west <= east:
+            columns = list(range(w, e + 1))
+        else:
+            # Split at the antimeridian: from west to 180, -180 to east
+            columns = list(range(w, self._cell(0, 180.0)[1] + 1)) + \
+                list(range(self._cell(0, -180.0)[1], e + 1))
+        if ((n - s + 1) * len(columns)) > MAX_CELLS:
+            return None
+        return [(i, j) for i in range(s, n + 1) for j in columns]
+
+    def add(self, name, fence):
+        """Add a fence, replacing the one with the same name.
+
+        The last position is checked against the fence. Return the
+        fences entered and exited, as update.
+        """
+        cells = self._cells(fence)
+        with self._lock:
+            was = name in self._inside
+            self._remove(name)
+            self._fences[name] = (fence, cells)
+            if cells is None:
+                self._large.add(name)
+            else:
+                for cell in cells:
+                    self._grid.setdefault(cell, set()).add(name)
+            inside = (self._position is not None) and \
+                fence.contains(*self._position)
+            if inside:
+                self._inside.add(name)
+            if inside and not was:
+                return [name], []
+            if was and not inside:
+                return [], [name]
+            return [], []
+
+    def _remove(self, name):
+        """Remove a fence, return if it existed."""
+        if name not in self._fences:
+            return False
+        fence, cells = self._fences.pop(name)
+        self._large.discard(name)
+        self._inside.discard(name)
+        for cell in cells or []:
+            names = self._grid[cell]
+            names.discard(name)
+            if not names:
+                del self._grid[cell]
+        return True
+
+    def remove(self, name):
+        """Remove a fence."""
+        with self._lock:
+            if not self._remove(name):
+                raise ValueError("Invalid geofence")
+
+    def getFences(self):
+        """Return a dict with the fences and if the position is inside."""
+        with self._lock:
+            return {name: (fence, name in self._inside)
+                    for name, (fence, cells) in self._fences.items()}
+
+    def update(self, latitude, longitude):
+        """Check a new position, return the fences entered and exited.
+
+        Only the fences of the cell of the position are checked: the
+        fences it was inside and are not in the cell are exited.
+        """
+        with self._lock:
+            names = self._grid.get(self._cell(latitude, longitude), ())
+            inside = set()
+            for name in self._large.union(names):
+                if self._fences[name][0].contains(latitude, longitude):
+                    inside.add(name)
+            entered = sorted(inside - self._inside)
+            exited = sorted(self._inside - inside)
+            self._inside = inside
+            self._position = (latitude, longitude)
+            return entered, exited
+# -----------------------
+
+
+# --- Functions ---------
+def distance(latitude1, longitude1, latitude2, longitude2):
+    """Return the meters between two positions (haversine)."""
+    lat1 = math.radians(latitude1)
+    lat2 = math.radians(latitude2)
+    dlat = lat2 - lat1
+    dlon = math.radians(longitude2 - longitude1)
+    a = (math.sin(dlat / 2) ** 2) + \
+        (math.cos(lat1) * math.cos(lat2) * (math.sin(dlon / 2) ** 2))
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _wrap(longitude):
+    """Return a longitude wrapped to [-180, 180)."""
+    return ((longitude + 180.0) % 360.0) - 180.0
+# -----------------------
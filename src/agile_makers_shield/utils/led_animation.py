@@ -0,0 +1,349 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE LED Animation.
+
+Description: Classes that animate the LEDs of the shield
+             in a background thread. An effect (blink, breathe,
+             fade or a sequence of effects) gives the values of
+             the registers of an LED at any time since it started,
+             and the frames are rendered at a capped frame rate.
+             Only the registers that changed since the last frame
+             are written, with background priority on the I2C bus,
+             and the effects are stopped after repeated failures.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from agile_makers_shield.buses.dbus import constants as db_cons
+from agile_makers_shield.buses.i2c import i2c_arbiter
+from abc import ABCMeta, abstractmethod
+import logging
+import math
+import threading
+import time
+# -----------------------
+
+
+# --- Variables ---------
+FRAME_RATE = 30.0  # Frames per second at most
+MAX_FRAME_RATE = 100.0
+MAX_FAILURES = 10  # Frames failed in a row that stop the effects
+# -----------------------
+
+
+# --- Classes -----------
+class Effect(metaclass=ABCMeta):
+    """Base class of the effects.
+
+    The duration is the seconds the effect lasts, None if it runs
+    until it is stopped.
+    """
+
+    duration = None
+
+    @abstractmethod
+    def value(self, t, start):
+        """Return the values of the registers at t seconds.
+
+        start are the values of the registers when the effect started.
+        From the duration on, the last values are returned.
+        """
+        pass
+
+
+class Blink(Effect):
+    """Turn the LED on and off every period."""
+
+    def __init__(self, color, period, duty=0.5, count=0):
+        """Init method."""
+        if period <= 0:
+            raise ValueError("Invalid period")
+        if not (0 < duty < 1):
+            raise ValueError("Invalid duty")
+        if count < 0:
+            raise ValueError("Invalid count")
+        self.color = tuple(color)
+        self.period = period
+        self.duty = duty
+        self.duration = (period * count) if count else None
+
+    def value(self, t, start):
+        """Return the color during the duty of each period, else off."""
+        if (self.duration is not None) and (t >= self.duration):
+            return (0,) * len(self.color)
+        if ((t % self.period) / self.period) < self.duty:
+            return self.color
+        return (0,) * len(self.color)
+
+
+class Breathe(Effect):
+    """Fade the LED in and out every period."""
+
+    def __init__(self, color, period, count=0):
+        """Init method."""
+        if period <= 0:
+            raise ValueError("Invalid period")
+        if count < 0:
+            raise ValueError("Invalid count")
+        self.color = tuple(color)
+        self.period = period
+        self.duration = (period * count) if count else None
+
+    def value(self, t, start):
+        """Return the color scaled by a raised cosine, off at 0."""
+        if (self.duration is not None) and (t >= self.duration):
+            t = self.duration
+        k = (1 - math.cos(2 * math.pi * t / self.period)) / 2
+        return tuple(_clip(c * k) for c in self.color)
+
+
+class Fade(Effect):
+    """Fade the LED from its value to a color."""
+
+    def __init__(self, color, duration):
+        """Init method."""
+        if duration < 0:
+            raise ValueError("Invalid duration")
+        self.color = tuple(color)
+        self.duration = duration
+
+    def value(self, t, start):
+        """Return the values between the start and the color."""
+        if t >= self.duration:
+            return self.color
+        k = t / self.duration
+        return tuple(_clip(s + ((c - s) * k))
+                     for s, c in zip(start, self.color))
+
+
+class Sequence(Effect):
+    """Run effects one after the other, count times (0 forever)."""
+
+    def __init__(self, effects, count=1):
+        """Init method."""
+        if not effects:
+            raise ValueError("Invalid sequence")
+        for effect in effects:
+            if effect.duration is None:
+                raise ValueError("Invalid sequence")
+        if count < 0:
+            raise ValueError("Invalid count")
+        self.effects = list(effects)
+        self.loop = sum(effect.duration for effect in self.effects)
+        if not self.loop:
+            raise ValueError("Invalid sequence")
+        self.duration = (self.loop * count) if count else None
+
+    def value(self, t, start):
+        """Return the values of the effect running at t."""
+        if (self.duration is not None) and (t >= self.duration):
+            t = self.loop
+        else:
+            t = t % self.loop
+        for effect in self.effects[0:-1]:
+            if t < effect.duration:
+                return effect.value(t, start)
+            start = effect.value(effect.duration, start)
+            t = t - effect.duration
+        return self.effects[-1].value(t, start)
+
+
+class Animator():
+    """Render the effects of the LEDs in a thread.
+
+    The LEDs are tuples of registers. read returns a list with the
+    values of some registers and write writes a dict of register:
+    value. The frames are rendered holding the lock of the effects and
+    written after releasing it, holding only the write lock.
+    """
+
+    def __init__(self, read, write, fps=FRAME_RATE):
+        """Init method."""
+        self._read = read
+        self._write = write
+        self._cond = threading.Condition(threading.Lock())
+        self._writeLock = threading.Lock()
+        self._animations = {}  # LED: (effect, start values, start time)
+        self._last = {}  # Register: value of the last frame
+        self._stopped = set()  # Registers stopped since the last frame
+        self._next = 0.0
+        self._thread = None
+        self._stop = False
+        self._failures = 0  # Frames failed in a row
+        self._logger = logging.getLogger(db_cons.LOGGER_NAME)
+        self.setFrameRate(fps)
+
+    def setFrameRate(self, fps):
+        """Set the frames per second at most."""
+        if not (0 < fps <= MAX_FRAME_RATE):
+            raise ValueError("Invalid frame rate")
+        self._period = 1.0 / fps
+
+    def getFrameRate(self):
+        """Return the frames per second at most."""
+        return 1.0 / self._period
+
+    def getAnimations(self):
+        """Return the LEDs with an effect running."""
+        with self._cond:
+            return list(self._animations.keys())
+
+    def animate(self, led, effect):
+        """Start an effect on an LED, replacing the one running."""
+        start = tuple(self._read(led))
+        with self._cond:
+            self._animations[led] = (effect, start, time.monotonic())
+            for reg in led:
+                self._last.pop(reg, None)
+            if self._thread is None:
+                self._stop = False
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+
+    def stop(self, led=None):
+        """Stop the effect of an LED, or of all of them.
+
+        The LED keeps the values of the last frame. It does not wait
+        for a frame being written: a write made through write after
+        this returns is done after that frame, and the frames rendered
+        before this are written without the LED.
+        """
+        with self._cond:
+            if led is None:
+                leds = list(self._animations.keys())
+                self._animations.clear()
+            else:
+                leds = [led] if self._animations.pop(led, None) else []
+            for stopped in leds:
+                self._stopped.update(stopped)
+
+    def write(self, values):
+        """Write a dict of register: value after the frame being written.
+
+        Return the result of the write function.
+        """
+        with self._writeLock:
+            return self._write(values)
+
+    def close(self):
+        """Stop every effect and the thread."""
+        with self._cond:
+            thread = self._thread
+            self._animations.clear()
+            if thread is None:
+                return
+            self._stop = True
+            self._cond.notify()
+        thread.join()
+        self._thread = None
+
+    def _render(self, now):
+        """Return the registers changed since the last frame."""
+        self._stopped.clear()
+        frame = {}
+        finished = []
+        for led, (effect, start, started) in self._animations.items():
+            t = now - started
+            frame.update(zip(led, effect.value(t, start)))
+            if (effect.duration is not None) and (t >= effect.duration):
+                finished.append(led)
+        for led in finished:
+            del self._animations[led]
+        changed = {reg: value for reg, value in frame.items()
+                   if self._last.get(reg) != value}
+        self._last.update(frame)
+        return changed
+
+    def _nextFrame(self):
+        """Wait for the next frame, return the registers changed.
+
+        Return None when the animator is closed.
+        """
+        with self._cond:
+            while not self._stop:
+                if not self._animations:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                if now < self._next:
+                    self._cond.wait(self._next - now)
+                    continue
+                self._next = self._next + self._period
+                if self._next <= now:
+                    self._next = now + self._period
+                changed = self._render(now)
+                if changed:
+                    return changed
+            return None
+
+    def _writeFrame(self, changed):
+        """Write a frame, without the registers stopped since rendered."""
+        with self._writeLock:
+            with self._cond:
+                # So a stopped effect does not overwrite the values set
+                # after it
+                for reg in self._stopped.intersection(changed):
+                    del changed[reg]
+                    self._last.pop(reg, None)
+            if not changed:
+                return
+            try:
+                if not self._write(changed):
+                    raise IOError("Could not write the LEDs")
+                error = None
+            except (IOError, ValueError) as e:
+                error = e
+        with self._cond:
+            if error is None:
+                self._failures = 0
+                return
+            for reg in changed:
+                self._last.pop(reg, None)
+            self._failures = self._failures + 1
+            if self._failures == 1:
+                self._logger.warning(
+                    "LED animation: Frame not written: {}".format(error)
+                )
+            if self._failures >= MAX_FAILURES:
+                self._logger.error(
+                    "LED animation: {} frames failed in a row, effects "
+                    "stopped: {}".format(self._failures, error)
+                )
+                self._animations.clear()
+                self._failures = 0
+
+    def _run(self):
+        """Render and write the frames until the animator is closed."""
+        arbiter = i2c_arbiter.I2C_Arbiter()
+        with arbiter.priority(i2c_arbiter.PRIORITY_BACKGROUND):
+            while True:
+                changed = self._nextFrame()
+                if changed is None:
+                    return
+                self._writeFrame(changed)
+# -----------------------
+
+
+# --- Functions ---------
+def _clip(value):
+    """Return a value rounded to a byte."""
+    return min(255, max(0, int(round(value))))
+# -----------------------
@@ -0,0 +1,335 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE NMEA.
+
+Description: Functions to validate and parse the NMEA
+             0183 sentences of the GPS (GGA, RMC, GSA, GSV and
+             VTG, from any talker) into dicts of typed values:
+             coordinates in signed decimal degrees, times in
+             seconds (since midnight, or since the epoch when
+             the date is known) and numbers as floats or ints.
+             The fields of each sentence are described by a table
+             that is compiled once, on its first sentence, into the
+             fields of each converter. Empty fields are None.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import calendar
+import functools
+# -----------------------
+
+
+# --- Variables ---------
+START = b"$"
+CHECKSUM = b"*"
+# XOR folds of an integer in halves, down to a byte
+CHECKSUM_FOLDS = [(shift, (1 << shift) - 1)
+                  for shift in (512, 256, 128, 64, 32, 16, 8)]
+CHECKSUM_BITS = 1024  # Bits folded by CHECKSUM_FOLDS
+# Fields of each sentence after the address: (name, converter, width).
+# A width of None takes the rest of the fields, a name of None skips them
+SENTENCES = {
+    "GGA": [
+        ("utc", "time", 1),
+        ("latitude", "coordinate", 2),
+        ("longitude", "coordinate", 2),
+        ("quality", "int", 1),
+        ("satellites", "int", 1),
+        ("hdop", "float", 1),
+        ("altitude", "float", 1),
+        (None, None, 1),  # Altitude unit, meters
+        ("geoid", "float", 1),
+        (None, None, 1),  # Geoid separation unit, meters
+        ("dgps_age", "float", 1),
+        ("dgps_id", "text", 1)
+    ],
+    "RMC": [
+        ("utc", "time", 1),
+        ("status", "text", 1),
+        ("latitude", "coordinate", 2),
+        ("longitude", "coordinate", 2),
+        ("speed", "float", 1),  # Knots
+        ("course", "float", 1),
+        ("date", "date", 1),
+        ("variation", "variation", 2),
+        ("mode", "text", 1)
+    ],
+    "GSA": [
+        ("selection", "text", 1),
+        ("fix_type", "int", 1),
+        ("prns", "ints", 12),
+        ("pdop", "float", 1),
+        ("hdop", "float", 1),
+        ("vdop", "float", 1)
+    ],
+    "GSV": [
+        ("messages", "int", 1),
+        ("message", "int", 1),
+        ("in_view", "int", 1),
+        ("satellites_info", "satellites", None)
+    ],
+    "VTG": [
+        ("course", "float", 1),
+        (None, None, 1),  # T, true course
+        ("course_magnetic", "float", 1),
+        (None, None, 1),  # M, magnetic course
+        ("speed", "float", 1),  # Knots
+        (None, None, 1),  # N, knots
+        ("speed_kmh", "float", 1),
+        (None, None, 1),  # K, km/h
+        ("mode", "text", 1)
+    ]
+}
+_compiled = {}  # Tables compiled, by sentence type
+# -----------------------
+
+
+# --- Classes -----------
+class NMEA_Parser():
+    """Parse the sentences of a stream of bytes fed in pieces."""
+
+    def __init__(self, max_length=128):
+        """Init method."""
+        self._buffer = bytearray()
+        self._maxLength = max_length
+
+    def feed(self, data):
+        """Add bytes to the stream, return the sentences parsed."""
+        self._buffer.extend(data)
+        results = []
+        while True:
+            start = self._buffer.find(START)
+            if start < 0:
+                self._buffer.clear()
+                break
+            end = self._buffer.find(b"\n", start)
+            if end < 0:
+                del self._buffer[0:start]
+                if len(self._buffer) > self._maxLength:
+                    # Not a sentence, drop it
+                    del self._buffer[0:1]
+                    continue
+                break
+            result = parse(bytes(self._buffer[start:end]))
+            if result is not None:
+                results.append(result)
+            del self._buffer[0:(end + 1)]
+        return results
+# -----------------------
+
+
+# --- Functions ---------
+def _text(value):
+    """Return a text field, None if empty."""
+    return value or None
+
+
+def _int(value):
+    """Return an integer field, None if empty."""
+    return int(value) if value else None
+
+
+def _float(value):
+    """Return a decimal field, None if empty."""
+    return float(value) if value else None
+
+
+def _coordinate(value, direction):
+    """Return a (d)ddmm.mmmm coordinate in signed decimal degrees."""
+    if not value:
+        return None
+    dot = value.find(".")
+    if dot < 0:
+        dot = len(value)
+    degrees = int(value[0:(dot - 2)] or 0) + (float(value[(dot - 2):]) / 60)
+    if direction in ("S", "W"):
+        return -degrees
+    return degrees
+
+
+def _variation(value, direction):
+    """Return a magnetic variation in degrees, negative to the west."""
+    if not value:
+        return None
+    if direction == "W":
+        return -float(value)
+    return float(value)
+
+
+def _time(value):
+    """Return a hhmmss.ss time in seconds since midnight."""
+    if not value:
+        return None
+    return (int(value[0:2]) * 3600) + (int(value[2:4]) * 60) + \
+        float(value[4:])
+
+
+@functools.lru_cache(maxsize=8)
+def _date(value):
+    """Return a ddmmyy date in seconds since the epoch.
+
+    The date of the sentences changes once a day, so the last ones are
+    cached.
+    """
+    if not value:
+        return None
+    year = int(value[4:6])
+    year = year + (2000 if year < 80 else 1900)
+    return calendar.timegm((year, int(value[2:4]), int(value[0:2]),
+                            0, 0, 0))
+
+
+def _ints(*values):
+    """Return the list of the integer fields not empty."""
+    return [int(value) for value in values if value]
+
+
+def _satellites(*values):
+    """Return the (prn, elevation, azimuth, snr) of each satellite."""
+    return [tuple(_int(value) for value in values[i:(i + 4)])
+            for i in range(0, len(values) - 3, 4)]
+
+
+def _compile(table):
+    """Compile a table of fields by the number of fields converted.
+
+    Return a tuple with the (name, converter, index) of the converters
+    of one field and of two fields, the (name, converter, start, end)
+    of the rest, and the number of fields of the sentence, address
+    included.
+    """
+    singles = []
+    pairs = []
+    spans = []
+    index = 1  # After the address
+    for name, converter, width in table:
+        if name is not None:
+            converter = _CONVERTERS[converter]
+            if width == 1:
+                singles.append((name, converter, index))
+            elif width == 2:
+                pairs.append((name, converter, index))
+            else:
+                end = None if width is None else index + width
+                spans.append((name, converter, index, end))
+        if width is None:
+            break
+        index = index + width
+    return tuple(singles), tuple(pairs), tuple(spans), index
+
+
+def checksum(data):
+    """Return the XOR of the bytes of a sentence between $ and *.
+
+    The bytes are folded as one integer, with a few operations on
+    integers instead of one per byte.
+    """
+    value = int.from_bytes(data, "little")
+    while value.bit_length() > CHECKSUM_BITS:
+        value = (value >> CHECKSUM_BITS) ^ \
+            (value & ((1 << CHECKSUM_BITS) - 1))
+    for shift, mask in CHECKSUM_FOLDS:
+        value = (value >> shift) ^ (value & mask)
+    return value
+
+
+def split(sentence):
+    """Validate a sentence and return its fields, None if invalid.
+
+    The sentence is str or bytes, may be followed by NUL bytes or a
+    line break and must have a checksum. The first field is the
+    address, e.g. GPGGA.
+    """
+    if isinstance(sentence, str):
+        sentence = sentence.encode("ascii", "replace")
+    end = sentence.find(b"\x00")
+    if end >= 0:
+        sentence = sentence[0:end]
+    sentence = sentence.rstrip(b"\r\n")
+    star = len(sentence) - 3
+    if (star < 1) or (sentence[0:1] != START) or \
+            (sentence[star:(star + 1)] != CHECKSUM):
+        return None
+    try:
+        expected = int(sentence[(star + 1):], 16)
+    except ValueError:
+        return None
+    body = sentence[1:star]
+    if checksum(body) != expected:
+        return None
+    return body.decode("ascii", "replace").split(",")
+
+
+def parse(sentence):
+    """Parse a sentence into a dict of typed values, None if invalid."""
+    fields = split(sentence)
+    if fields is None:
+        return None
+    return convert(fields)
+
+
+def convert(fields):
+    """Convert the fields of a sentence to a dict, None if invalid.
+
+    The dict has the "type" (e.g. GGA), the "talker" (e.g. GP) and
+    the fields of the type. With the date and the time of the day, the
+    "time" since the epoch is added.
+    """
+    address = fields[0]
+    sentence = address[-3:]
+    table = _compiled.get(sentence)
+    if table is None:
+        if sentence not in SENTENCES:
+            return None
+        table = _compile(SENTENCES[sentence])
+        _compiled[sentence] = table
+    singles, pairs, spans, size = table
+    if len(fields) < size:
+        # Old sentences without the last fields
+        fields = fields + ([""] * (size - len(fields)))
+    result = {"type": sentence, "talker": address[0:-3]}
+    try:
+        for name, converter, index in singles:
+            result[name] = converter(fields[index])
+        for name, converter, index in pairs:
+            result[name] = converter(fields[index], fields[index + 1])
+        for name, converter, start, end in spans:
+            result[name] = converter(*fields[start:end])
+    except ValueError:
+        return None
+    if (result.get("date") is not None) and \
+            (result.get("utc") is not None):
+        result["time"] = result["date"] + result["utc"]
+    return result
+
+
+# Functions of the converters of the tables, after their definitions
+_CONVERTERS = {
+    "text": _text,
+    "int": _int,
+    "float": _float,
+    "coordinate": _coordinate,
+    "variation": _variation,
+    "time": _time,
+    "date": _date,
+    "ints": _ints,
+    "satellites": _satellites
+}
+# -----------------------
@@ -0,0 +1,132 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE Ring Buffer.
+
+Description: Class that keeps the last samples of a
+             source in fixed-size arrays of doubles: one for the
+             timestamps and one per field. Appending overwrites
+             the oldest sample once the buffer is full and never
+             allocates. The timestamps must not decrease, so the
+             samples of a time range are found by binary search.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import array
+import threading
+# -----------------------
+
+
+# --- Variables ---------
+TYPECODE = "d"
+# -----------------------
+
+
+# --- Classes -----------
+class RingBuffer():
+    """Fixed-size history of timestamped samples."""
+
+    def __init__(self, size, fields=1):
+        """Init method."""
+        if size < 1:
+            raise ValueError("Invalid size")
+        if fields < 1:
+            raise ValueError("Invalid fields")
+        self.size = size
+        self.fields = fields
+        self._lock = threading.Lock()
+        self._timestamps = array.array(TYPECODE, bytes(8 * size))
+        self._values = [array.array(TYPECODE, bytes(8 * size))
+                        for _ in range(fields)]
+        self._head = 0  # Index of the next sample written
+        self._count = 0
+
+    def __len__(self):
+        """Return the samples in the buffer."""
+        return self._count
+
+    def _index(self, i):
+        """Return the array index of the i-th oldest sample."""
+        return (self._head - self._count + i) % self.size
+
+    def append(self, timestamp, values):
+        """Add a sample with a value per field, dropping the oldest."""
+        if len(values) != self.fields:
+            raise ValueError("Invalid number of values")
+        with self._lock:
+            if self._count and \
+                    (timestamp < self._timestamps[self._index(
+                        self._count - 1)]):
+                raise ValueError("Timestamp older than the last sample")
+            self._timestamps[self._head] = timestamp
+            for field, value in zip(self._values, values):
+                field[self._head] = value
+            self._head = (self._head + 1) % self.size
+            if self._count < self.size:
+                self._count = self._count + 1
+
+    def clear(self):
+        """Drop every sample."""
+        with self._lock:
+            self._head = 0
+            self._count = 0
+
+    def latest(self):
+        """Return the (timestamp, values) of the last sample, or None."""
+        with self._lock:
+            if not self._count:
+                return None
+            i = self._index(self._count - 1)
+            return (self._timestamps[i],
+                    tuple(field[i] for field in self._values))
+
+    def _bisect(self, timestamp, right):
+        """Return the position of a timestamp among the samples."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self._timestamps[self._index(mid)]
+            if (ts < timestamp) or (right and (ts == timestamp)):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _slice(self, data, first, last):
+        """Return the samples from first to last of an array, in order."""
+        start = self._index(first)
+        end = start + (last - first)
+        if end <= self.size:
+            return data[start:end]
+        return data[start:] + data[0:(end - self.size)]
+
+    def getRange(self, start=None, end=None):
+        """Return the samples with start <= timestamp <= end.
+
+        Return a tuple with an array of timestamps and a list with an
+        array of values per field, from the oldest sample to the last.
+        """
+        with self._lock:
+            first = 0 if start is None else self._bisect(start, False)
+            last = self._count if end is None else self._bisect(end, True)
+            last = max(first, last)
+            return (self._slice(self._timestamps, first, last),
+                    [self._slice(field, first, last)
+                     for field in self._values])
+# -----------------------
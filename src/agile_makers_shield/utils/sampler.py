@@ -0,0 +1,323 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE Sampler.
+
+Description: Class that samples the sensors of the
+             shield periodically in a background thread and keeps
+             their history in ring buffers, so the clients read
+             the samples from memory instead of the I2C bus. Every
+             source has its own period and the released samples
+             are taken earliest deadline first. The seconds the
+             sampler holds the I2C bus are limited to a fraction
+             of the time (the budget) with a token bucket, and the
+             transactions are run with background priority. The
+             timestamps are monotonic. The sources are not sampled
+             until they are given a period, and the thread only
+             runs once the sampler is started and a source has a
+             period. Only one instance of this class can be created.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from agile_makers_shield.buses.dbus import constants as db_cons
+from agile_makers_shield.buses.i2c import i2c_arbiter
+from agile_makers_shield.utils import ring_buffer
+from agile_makers_shield.utils import singleton
+import heapq
+import itertools
+import logging
+import threading
+import time
+# -----------------------
+
+
+# --- Variables ---------
+SAMPLES = 3600  # Samples kept per source
+BUDGET = 0.25  # Fraction of the I2C bus time used by the sampler
+BUDGET_BURST = 0.1  # Seconds of bus time that can be used in a row
+SOURCE_STATS = ["samples", "errors", "late", "skipped", "bus_time"]
+# -----------------------
+
+
+# --- Classes -----------
+class Source():
+    """A periodic source of samples and its history."""
+
+    def __init__(self, name, func, fields, period, size):
+        """Init method."""
+        self.name = name
+        self.func = func
+        self.fields = list(fields)
+        self.period = period
+        self.buffer = ring_buffer.RingBuffer(size, len(self.fields))
+        self.generation = 0  # Invalidates the queued releases
+        self.release = 0.0
+        self.stats = dict.fromkeys(SOURCE_STATS, 0)
+        self.stats["bus_time"] = 0.0
+        self.failing = False  # If the last sample failed
+
+
+class Sampler(metaclass=singleton.Singleton):
+    """Sample the sources periodically in a thread."""
+
+    def __init__(self, budget=BUDGET, burst=BUDGET_BURST):
+        """Init method."""
+        self._cond = threading.Condition(threading.Lock())
+        self._sources = {}
+        self._pending = []  # (release, seq, source, generation)
+        self._ready = []  # (deadline, seq, source, generation)
+        self._seq = itertools.count()
+        self._tokens = burst
+        self._refilled = time.monotonic()
+        self._thread = None
+        self._stop = False
+        self._started = False
+        self._logger = logging.getLogger(db_cons.LOGGER_NAME)
+        self.setBudget(budget, burst)
+
+    def _getSource(self, name):
+        """Return a source by name."""
+        try:
+            return self._sources[name]
+        except KeyError:
+            raise ValueError("Invalid source")
+
+    def _schedule(self, source, release):
+        """Queue the next release of a source."""
+        source.release = release
+        heapq.heappush(
+            self._pending,
+            (release, next(self._seq), source, source.generation)
+        )
+        self._cond.notify()
+        if self._started and (self._thread is None):
+            self._startThread()
+
+    def _startThread(self):
+        """Start the thread that takes the samples."""
+        self._stop = False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def addSource(self, name, func, fields, period, size=SAMPLES):
+        """Sample func() every period seconds, 0 to pause it.
+
+        func returns a tuple with a value per field, or None if there
+        is no sample.
+        """
+        if period < 0:
+            raise ValueError("Invalid period")
+        with self._cond:
+            if name in self._sources:
+                raise ValueError("Source already added")
+            source = Source(name, func, fields, period, size)
+            self._sources[name] = source
+            if period:
+                self._schedule(source, time.monotonic())
+
+    def setPeriod(self, name, period):
+        """Change the period of a source, 0 to pause it."""
+        if period < 0:
+            raise ValueError("Invalid period")
+        with self._cond:
+            source = self._getSource(name)
+            source.generation = source.generation + 1
+            source.period = period
+            if period:
+                self._schedule(source, time.monotonic())
+
+    def getPeriods(self):
+        """Return the period of each source."""
+        with self._cond:
+            return {name: source.period
+                    for name, source in self._sources.items()}
+
+    def setBudget(self, budget, burst=None):
+        """Set the fraction of the bus time and the burst seconds."""
+        if not (0 < budget <= 1):
+            raise ValueError("Invalid budget")
+        if burst is None:
+            burst = self._burst
+        if burst <= 0:
+            raise ValueError("Invalid burst")
+        with self._cond:
+            self._budget = budget
+            self._burst = burst
+            self._tokens = min(self._tokens, burst)
+            self._cond.notify()
+
+    def getBudget(self):
+        """Return the fraction of the bus time used by the sampler."""
+        return self._budget
+
+    def getFields(self, name):
+        """Return the fields of a source."""
+        return list(self._getSource(name).fields)
+
+    def getBuffer(self, name):
+        """Return the ring buffer with the history of a source."""
+        return self._getSource(name).buffer
+
+    def getLatest(self, name):
+        """Return the (timestamp, values) of the last sample, or None."""
+        return self._getSource(name).buffer.latest()
+
+    def toWallTime(self, timestamp):
+        """Convert a monotonic timestamp to Unix time."""
+        return timestamp + (time.time() - time.monotonic())
+
+    def getHistory(self, name, start=None, end=None):
+        """Return the samples of a source between two Unix times.
+
+        Return a tuple with an array of Unix timestamps and a list with
+        an array of values per field, from the oldest sample to the last.
+        """
+        offset = time.time() - time.monotonic()
+        if start is not None:
+            start = start - offset
+        if end is not None:
+            end = end - offset
+        timestamps, fields = self._getSource(name).buffer.getRange(start, end)
+        for i in range(len(timestamps)):
+            timestamps[i] = timestamps[i] + offset
+        return timestamps, fields
+
+    def getStats(self):
+        """Return the period and counters of each source."""
+        with self._cond:
+            stats = {}
+            for name, source in self._sources.items():
+                stats[name] = dict(source.stats)
+                stats[name]["period"] = source.period
+                stats[name]["buffered"] = len(source.buffer)
+            return stats
+
+    def start(self):
+        """Start sampling, in a thread once a source has a period."""
+        with self._cond:
+            self._started = True
+            if (self._thread is None) and self._pending:
+                self._startThread()
+
+    def stop(self):
+        """Stop sampling and wait for the thread."""
+        with self._cond:
+            self._started = False
+            thread = self._thread
+            if thread is None:
+                return
+            self._stop = True
+            self._cond.notify()
+        thread.join()
+        self._thread = None
+
+    def _refill(self, now):
+        """Add the tokens earned, return the seconds until there are any."""
+        self._tokens = min(
+            self._burst,
+            self._tokens + ((now - self._refilled) * self._budget)
+        )
+        self._refilled = now
+        if self._tokens >= 0:
+            return 0
+        return -self._tokens / self._budget
+
+    def _next(self):
+        """Wait for the released source with the earliest deadline.
+
+        Return None when the sampler is stopped.
+        """
+        with self._cond:
+            while not self._stop:
+                now = time.monotonic()
+                while self._pending and (self._pending[0][0] <= now):
+                    release, seq, source, generation = \
+                        heapq.heappop(self._pending)
+                    if generation == source.generation:
+                        heapq.heappush(self._ready, (
+                            release + source.period, seq, source, generation
+                        ))
+                while self._ready and \
+                        (self._ready[0][3] != self._ready[0][2].generation):
+                    heapq.heappop(self._ready)
+                timeout = None
+                if self._ready:
+                    timeout = self._refill(now)
+                    if not timeout:
+                        return heapq.heappop(self._ready)
+                elif self._pending:
+                    timeout = self._pending[0][0] - now
+                self._cond.wait(timeout)
+            return None
+
+    def _sample(self, entry, arbiter):
+        """Take a sample of a source and queue its next release."""
+        deadline, seq, source, generation = entry
+        held = arbiter.getHeldTime()
+        ts = time.monotonic()
+        try:
+            values = source.func()
+            error = False
+        except (IOError, ValueError) as e:
+            values = None
+            error = True
+            # Logged once per run of failures, not on every period
+            if not source.failing:
+                self._logger.warning("Sampler: Source {} failed: "
+                                     "{}".format(source.name, e))
+        if source.failing and not error:
+            self._logger.info(
+                "Sampler: Source {} recovered".format(source.name)
+            )
+        source.failing = error
+        bus = arbiter.getHeldTime() - held
+        done = time.monotonic()
+        if values is not None:
+            source.buffer.append(ts, values)
+        with self._cond:
+            self._tokens = self._tokens - bus
+            stats = source.stats
+            stats["bus_time"] = stats["bus_time"] + bus
+            if error:
+                stats["errors"] = stats["errors"] + 1
+            elif values is not None:
+                stats["samples"] = stats["samples"] + 1
+            if done > deadline:
+                stats["late"] = stats["late"] + 1
+            if generation != source.generation:
+                return
+            # The releases whose deadline has passed are skipped
+            release = deadline
+            skipped = int((done - release) // source.period)
+            if skipped > 0:
+                stats["skipped"] = stats["skipped"] + skipped
+                release = release + (skipped * source.period)
+            self._schedule(source, release)
+
+    def _run(self):
+        """Take the samples until the sampler is stopped."""
+        arbiter = i2c_arbiter.I2C_Arbiter()
+        with arbiter.priority(i2c_arbiter.PRIORITY_BACKGROUND):
+            while True:
+                entry = self._next()
+                if entry is None:
+                    return
+                self._sample(entry, arbiter)
+# -----------------------
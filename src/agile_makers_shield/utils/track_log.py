@@ -0,0 +1,249 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+AGILE Track Log.
+
+Description: Class that records the fixes of the GPS in
+             an append-only file of fixed-size binary records.
+             The records are kept in memory and written in
+             batches, to write the SD card as few times as
+             possible, or by a timer when the oldest one gets old,
+             even if no fix is added. The file is read through a
+             memory map, so a time range is found by binary search
+             without reading the records before it. The timestamps
+             must not decrease.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from agile_makers_shield.utils import downsample
+import array
+import atexit
+import mmap
+import os
+import struct
+import threading
+# -----------------------
+
+
+# --- Variables ---------
+MAGIC = b"AMSTRACK"
+VERSION = 1
+HEADER = struct.Struct("<8sHH4x")  # Magic, version and record size
+# Timestamp, latitude, longitude, altitude, fix, satellites and hdop
+RECORD = struct.Struct("<dddfBBxxf")
+TIMESTAMP = struct.Struct("<d")  # First field of a record
+FIELDS = ["latitude", "longitude", "altitude", "fix", "satellites", "hdop"]
+BATCH = 60  # Records written at once
+FLUSH_INTERVAL = 60.0  # Seconds the records are kept in memory at most
+TYPECODE = "d"
+# -----------------------
+
+
+# --- Classes -----------
+class TrackLog():
+    """Append-only file of GPS fixes."""
+
+    def __init__(self, path, batch=BATCH, interval=FLUSH_INTERVAL):
+        """Init method."""
+        if batch < 1:
+            raise ValueError("Invalid batch")
+        if interval < 0:
+            raise ValueError("Invalid interval")
+        self.path = path
+        self._batch = batch
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            self._count = self._open()
+        except:
+            os.close(self._fd)
+            raise
+        self._map = None
+        self._pending = bytearray()  # Records not written yet
+        self._timer = None  # Writes the records kept for interval
+        self._last = None
+        self.errors = 0  # Writes of the timer that failed
+        if self._count:
+            self._last = self._timestamp(self._count - 1)
+        atexit.register(self.close)
+
+    def __len__(self):
+        """Return the records in the log."""
+        return self._count + (len(self._pending) // RECORD.size)
+
+    def _open(self):
+        """Check the header of the file, return the records in it."""
+        size = os.fstat(self._fd).st_size
+        if not size:
+            self._write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            return 0
+        header = os.pread(self._fd, HEADER.size, 0)
+        if (len(header) != HEADER.size) or \
+                (HEADER.unpack(header) != (MAGIC, VERSION, RECORD.size)):
+            raise IOError("Invalid track log: {}".format(self.path))
+        size = size - HEADER.size
+        if size % RECORD.size:
+            # Drop the record cut by a power loss
+            os.ftruncate(self._fd, HEADER.size + size - (size % RECORD.size))
+        return size // RECORD.size
+
+    def _write(self, data):
+        """Write all the data at the end of the file."""
+        view = memoryview(data)
+        while len(view):
+            view = view[os.write(self._fd, view):]
+
+    def _flush(self):
+        """Write the records kept in memory to the file."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            self._write(self._pending)
+            os.fsync(self._fd)
+            self._count = self._count + (len(self._pending) // RECORD.size)
+            self._pending.clear()
+
+    def _timeout(self):
+        """Write the records kept in memory for the interval."""
+        with self._lock:
+            if (self._fd is None) or \
+                    (self._timer is not threading.current_thread()):
+                # Closed or written since the timer started
+                return
+            self._timer = None
+            try:
+                self._flush()
+            except IOError:
+                # Kept in memory for the next write
+                self.errors = self.errors + 1
+
+    def _mapped(self):
+        """Return the memory map of the file, remapped if it grew."""
+        size = HEADER.size + (self._count * RECORD.size)
+        if (self._map is None) or (len(self._map) < size):
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _record(self, i):
+        """Return the i-th record, written or in memory."""
+        if i < self._count:
+            return RECORD.unpack_from(
+                self._mapped(), HEADER.size + (i * RECORD.size)
+            )
+        return RECORD.unpack_from(
+            self._pending, (i - self._count) * RECORD.size
+        )
+
+    def _timestamp(self, i):
+        """Return the timestamp of the i-th record."""
+        if i < self._count:
+            return TIMESTAMP.unpack_from(
+                self._mapped(), HEADER.size + (i * RECORD.size)
+            )[0]
+        return TIMESTAMP.unpack_from(
+            self._pending, (i - self._count) * RECORD.size
+        )[0]
+
+    def _bisect(self, timestamp, right):
+        """Return the position of a timestamp among the records."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self._timestamp(mid)
+            if (ts < timestamp) or (right and (ts == timestamp)):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def append(self, timestamp, latitude, longitude, altitude,
+               fix, satellites, hdop):
+        """Add a fix, writing the batch when it is full.
+
+        The first fix of a batch starts the timer that writes it after
+        the interval.
+        """
+        record = RECORD.pack(timestamp, latitude, longitude, altitude,
+                             fix, satellites, hdop)
+        with self._lock:
+            if self._fd is None:
+                raise IOError("Track log closed")
+            if (self._last is not None) and (timestamp < self._last):
+                raise ValueError("Timestamp older than the last record")
+            self._pending.extend(record)
+            self._last = timestamp
+            if (len(self._pending) >= (self._batch * RECORD.size)) or \
+                    (not self._interval):
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._interval, self._timeout)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write the records kept in memory to the file."""
+        with self._lock:
+            if self._fd is not None:
+                self._flush()
+
+    def getRange(self, start=None, end=None, points=0):
+        """Return the fixes with start <= timestamp <= end.
+
+        With points, only that many fixes evenly spaced are read.
+        Return a tuple with an array of timestamps and a list with an
+        array of values per field, from the oldest fix to the last.
+        """
+        with self._lock:
+            if self._fd is None:
+                raise IOError("Track log closed")
+            first = 0 if start is None else self._bisect(start, False)
+            last = len(self) if end is None else self._bisect(end, True)
+            last = max(first, last)
+            indexes = range(first, last)
+            if points:
+                indexes = [first + i
+                           for i in downsample.stride(last - first, points)]
+            timestamps = array.array(TYPECODE)
+            values = [array.array(TYPECODE) for _ in FIELDS]
+            for i in indexes:
+                record = self._record(i)
+                timestamps.append(record[0])
+                for field, value in zip(values, record[1:]):
+                    field.append(value)
+            return timestamps, values
+
+    def close(self):
+        """Write the records kept in memory and close the file."""
+        with self._lock:
+            if self._fd is None:
+                return
+            try:
+                self._flush()
+            finally:
+                if self._map is not None:
+                    self._map.close()
+                    self._map = None
+                os.close(self._fd)
+                self._fd = None
+        atexit.unregister(self.close)
+# -----------------------
@@ -43,6 +43,10 @@ from agile_makers_shield.features import gps
 from agile_makers_shield.features import adc
 from agile_makers_shield.features import atmospheric_sensor
 from agile_makers_shield.buses.serial import button
+from agile_makers_shield.buses.i2c import i2c_bus
+from agile_makers_shield.buses.i2c import i2c_sim
+from agile_makers_shield.buses.i2c import i2c_stats
+from agile_makers_shield.utils import sampler
 import logging
 # -----------------------
 
@@ -79,6 +83,59 @@ class DBusBase(dbus.service.Object):
     def Exit(self):
         """Exit DBus server."""
         mainloop.quit()
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Base"],
+        in_signature="",
+        out_signature="a{sa{sv}}"
+    )
+    def GetI2CStats(self):
+        """Return the I2C transaction statistics of each register."""
+        stats = i2c_stats.I2C_Stats().getStats()
+        result = {}
+        for name, values in stats.items():
+            result[name] = dbus.Dictionary(values, signature="sv")
+        return dbus.Dictionary(result, signature="sa{sv}")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Base"],
+        in_signature="",
+        out_signature=""
+    )
+    def ResetI2CStats(self):
+        """Clear the I2C transaction statistics."""
+        i2c_stats.I2C_Stats().reset()
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Base"],
+        in_signature="",
+        out_signature="a{sa{sv}}"
+    )
+    def GetSamplingStats(self):
+        """Return the period and counters of each sampled source."""
+        stats = sampler.Sampler().getStats()
+        result = {}
+        for name, values in stats.items():
+            result[name] = dbus.Dictionary(values, signature="sv")
+        return dbus.Dictionary(result, signature="sa{sv}")
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Base"],
+        in_signature="sd",
+        out_signature=""
+    )
+    def SetSamplingPeriod(self, source, period):
+        """Set the seconds between samples of a source, 0 to pause it."""
+        sampler.Sampler().setPeriod(source, period)
+
+    @dbus.service.method(
+        db_cons.BUS_NAME["Base"],
+        in_signature="d",
+        out_signature=""
+    )
+    def SetSamplingBudget(self, budget):
+        """Set the fraction of the I2C bus time used by the sampler."""
+        sampler.Sampler().setBudget(budget)
 # -----------------------
 class Signal(dbus.service.Object):
     def __init__(self, object_path):
@@ -127,9 +184,16 @@ def dbus_service():
     
     # Features
     leds_c = leds.LEDs()
-    gps_c = gps.GPS()
+    gps_c = gps.GPS(track_path)
     adc_c = adc.ADC()
     atmosp_c = atmospheric_sensor.Atmospheric_Sensor()
+
+    # Background sampling of the features, off unless a period is set
+    sampler.Sampler().setBudget(sampling_budget)
+    if sampling_period:
+        for source in sampler.Sampler().getPeriods().keys():
+            sampler.Sampler().setPeriod(source, sampling_period)
+    sampler.Sampler().start()
     
     logger.info("Running AGILE DBus service.")
     try:
@@ -146,6 +210,7 @@ def dbus_service():
 def end_program(status):
     """Exit the program."""
     # isr.close()
+    sampler.Sampler().stop()
     logger.info("AGILE DBus service stopped.")
     sys.exit(status)
 # -----------------------
@@ -173,6 +238,48 @@ if __name__ == "__main__":
         default=LOGLEVEL_DEFAULT,
         help="Log level: DEBUG, INFO, WARNING, ERROR, CRITICAL. "
              "Default: {}".format(LOGLEVEL_DEFAULT))
+    parser.add_argument(
+        "-S",
+        "--simulate",
+        action="store_true",
+        default=False,
+        help="Use this flag to run with simulated I2C devices."
+    )
+    parser.add_argument(
+        "--sim-latency",
+        nargs="?",
+        type=float,
+        default=i2c_sim.DEFAULT_LATENCY,
+        help="Seconds of every simulated I2C transaction. "
+             "Default: {}".format(i2c_sim.DEFAULT_LATENCY))
+    parser.add_argument(
+        "--sim-errors",
+        nargs="?",
+        type=float,
+        default=i2c_sim.DEFAULT_ERROR_RATE,
+        help="Probability of a failed simulated I2C transaction. "
+             "Default: {}".format(i2c_sim.DEFAULT_ERROR_RATE))
+    parser.add_argument(
+        "--sampling-budget",
+        nargs="?",
+        type=float,
+        default=sampler.BUDGET,
+        help="Fraction of the I2C bus time used by the background "
+             "sampling. Default: {}".format(sampler.BUDGET))
+    parser.add_argument(
+        "--sampling-period",
+        nargs="?",
+        type=float,
+        default=0.0,
+        help="Seconds between the background samples of every source. "
+             "Default: 0 (not sampled, see SetSamplingPeriod)")
+    parser.add_argument(
+        "--track-log",
+        nargs="?",
+        type=str,
+        default=None,
+        help="File where the fixes of the GPS are recorded. "
+             "Default: not recorded")
     args = parser.parse_args()
     if args.loglevel in LOGLEVELS:
         if (args.loglevel == "DEBUG") or \
@@ -205,8 +312,18 @@ if __name__ == "__main__":
         level=log_level
     )
     logger = logging.getLogger(db_cons.LOGGER_NAME)
+    # Simulated I2C devices
+    if args.simulate:
+        i2c_bus.setBackend(i2c_sim.I2C_Simulator(
+            latency=args.sim_latency,
+            error_rate=args.sim_errors
+        ))
+        logger.info("Using simulated I2C devices.")
     # Start DBus
     shield_is_plugged = args.shield
+    sampling_budget = args.sampling_budget
+    sampling_period = args.sampling_period
+    track_path = args.track_log
     dbus_service()
     end_program(0)
 # -----------------------
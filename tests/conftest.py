@@ -0,0 +1,53 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+Test Fixtures.
+
+Description: Fixtures shared by the tests. The sources are
+             imported from the src folder, and the simulated I2C
+             bus is set as the backend of the test and the global
+             backend and retry policy are restored afterwards.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import os
+import sys
+import pytest
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "src"
+))
+from agile_makers_shield.buses.i2c import i2c_bus  # noqa: E402
+from agile_makers_shield.buses.i2c import i2c_sim  # noqa: E402
+# -----------------------
+
+
+# --- Functions ---------
+@pytest.fixture
+def sim():
+    """Set a simulated I2C bus without latency or errors."""
+    backend = i2c_bus._backend
+    policy = i2c_bus._retryPolicy
+    simulator = i2c_sim.I2C_Simulator(latency=0, byte_time=0, error_rate=0)
+    i2c_bus.setBackend(simulator)
+    try:
+        yield simulator
+    finally:
+        i2c_bus.setBackend(backend)
+        i2c_bus.setRetryPolicy(policy)
+# -----------------------
@@ -0,0 +1,96 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+ADC Stream Tests.
+
+Description: Stream the channels of the simulated MCP3424
+             through the callbacks of the ADC feature and check
+             the channel of the StreamBlock and StreamEnded
+             signals.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import logging
+import time
+import pytest
+pytest.importorskip("dbus")
+pytest.importorskip("gi.repository")
+from agile_makers_shield.buses.i2c import mcp3424  # noqa: E402
+from agile_makers_shield.features import adc  # noqa: E402
+# -----------------------
+
+
+# --- Variables ---------
+TIMEOUT = 5.0  # Seconds to wait for the signals
+# -----------------------
+
+
+# --- Functions ---------
+def _wait(condition):
+    """Wait until the condition is true."""
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def stream(sim, monkeypatch):
+    """Return a function that streams a channel and the signals."""
+    monkeypatch.setattr(adc.GLib, "idle_add", lambda func, *a: func(*a))
+    obj = adc.ADC_Obj.__new__(adc.ADC_Obj)
+    obj._logger = logging.getLogger(adc.db_cons.LOGGER_NAME)
+    obj._full_path = "/ADC"
+    blocks = []
+    ends = []
+    obj.StreamBlock = blocks.append
+    obj.StreamEnded = ends.append
+    # A device on the simulated bus, not the singleton
+    device = type.__call__(mcp3424.MCP3424)
+
+    def run(channel, down=False):
+        device.startStream(obj._streamCallback, adc.ADC_CHANNELS[channel],
+                           block=2, end_callback=obj._streamEndCallback)
+        _wait(lambda: len(blocks) >= 2)
+        if down:
+            sim.setDeviceDown(mcp3424.MCP3424_ADDRESS)
+            _wait(lambda: ends)
+        device.stopStream()
+        return blocks, ends
+
+    yield run
+    device.close()
+
+
+@pytest.mark.parametrize("channel", [1, 2, 3, 4])
+def test_stream_channel(stream, channel):
+    """The signals have the channel streamed."""
+    blocks, ends = stream(channel)
+    assert blocks
+    assert all(block["channel"] == channel for block in blocks)
+    assert ends == [{"channel": channel}]
+
+
+def test_stream_error(stream):
+    """A stream stopped by an error ends with the error."""
+    blocks, ends = stream(1, down=True)
+    assert len(ends) == 1
+    assert ends[0]["channel"] == 1
+    assert ends[0]["error"]
+# -----------------------
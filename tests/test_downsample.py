@@ -0,0 +1,114 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+Downsample Tests.
+
+Description: Check the points kept by LTTB and by the stride,
+             and the statistics of the time buckets.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import math
+import pytest
+from agile_makers_shield.utils import downsample
+# -----------------------
+
+
+# --- Functions ---------
+def test_lttb_all():
+    """Every point is kept if there are not more than requested."""
+    assert downsample.lttb([0, 1, 2], [5, 6, 7], 3) == [0, 1, 2]
+    assert downsample.lttb([0, 1], [5, 6], 10) == [0, 1]
+    assert downsample.lttb([], [], 10) == []
+
+
+def test_lttb_invalid():
+    """LTTB needs the first, the last and a point in between."""
+    with pytest.raises(ValueError):
+        downsample.lttb(list(range(10)), list(range(10)), 2)
+
+
+def test_lttb_peaks():
+    """The peaks of a flat series are kept, in order."""
+    timestamps = list(range(100))
+    values = [0.0] * 100
+    values[25] = 10.0
+    values[70] = -10.0
+    indexes = downsample.lttb(timestamps, values, 4)
+    assert indexes == [0, 25, 70, 99]
+
+
+def test_lttb_sizes():
+    """The number of points is the requested one, increasing."""
+    timestamps = list(range(1000))
+    values = [math.sin(t / 10) for t in timestamps]
+    for points in [3, 10, 100, 999]:
+        indexes = downsample.lttb(timestamps, values, points)
+        assert len(indexes) == points
+        assert indexes[0] == 0
+        assert indexes[-1] == 999
+        assert indexes == sorted(set(indexes))
+
+
+def test_buckets():
+    """The buckets have the minimum, maximum and mean of each field."""
+    timestamps = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    fields = [[1.0, 3.0, 2.0, 8.0, 4.0, 6.0],
+              [0.0, 0.0, 0.0, 1.0, 1.0, 1.0]]
+    starts, stats = downsample.buckets(timestamps, fields, 2)
+    assert starts == [0.0, 2.5]
+    assert stats[0] == ([1.0, 4.0], [3.0, 8.0], [2.0, 6.0])
+    assert stats[1] == ([0.0, 1.0], [0.0, 1.0], [0.0, 1.0])
+
+
+def test_buckets_range():
+    """The range splits the time and the empty buckets are left out."""
+    timestamps = [0.0, 1.0, 9.0]
+    starts, stats = downsample.buckets(timestamps, [[1.0, 2.0, 3.0]], 5,
+                                       0.0, 10.0)
+    assert starts == [0.0, 8.0]
+    assert stats[0] == ([1.0, 3.0], [2.0, 3.0], [1.5, 3.0])
+    starts, stats = downsample.buckets([], [[]], 5)
+    assert starts == []
+    assert stats == [([], [], [])]
+    with pytest.raises(ValueError):
+        downsample.buckets(timestamps, [[1.0, 2.0, 3.0]], 0)
+
+
+def test_buckets_nan():
+    """The NaN values are left out of the statistics."""
+    nan = float("nan")
+    timestamps = [0.0, 1.0, 2.0, 3.0]
+    fields = [[1.0, nan, 3.0, 5.0], [nan, nan, 2.0, 4.0]]
+    starts, stats = downsample.buckets(timestamps, fields, 2)
+    assert starts == [0.0, 1.5]
+    assert stats[0] == ([1.0, 3.0], [1.0, 5.0], [1.0, 4.0])
+    mins, maxs, means = stats[1]
+    assert all(math.isnan(value[0]) for value in [mins, maxs, means])
+    assert (mins[1], maxs[1], means[1]) == (2.0, 4.0, 3.0)
+
+
+def test_stride():
+    """The stride keeps the first and last points evenly spaced."""
+    assert downsample.stride(11, 3) == [0, 5, 10]
+    assert downsample.stride(3, 5) == [0, 1, 2]
+    assert downsample.stride(100, 2) == [0, 99]
+    with pytest.raises(ValueError):
+        downsample.stride(10, 1)
+# -----------------------
@@ -0,0 +1,126 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+Geofence Tests.
+
+Description: Check the circles and polygons, the circles that
+             cross the antimeridian or cover a pole, and the fences
+             entered and exited through the grid index.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import pytest
+from agile_makers_shield.utils import geofence
+# -----------------------
+
+
+# --- Functions ---------
+def test_distance():
+    """A degree of latitude is about 111 km."""
+    assert geofence.distance(0, 0, 1, 0) == pytest.approx(111195, rel=1e-3)
+    assert geofence.distance(0, 179.5, 0, -179.5) == \
+        pytest.approx(111195, rel=1e-3)
+
+
+def test_circle():
+    """A circle contains the positions within its radius."""
+    circle = geofence.Circle(40.0, -3.7, 1000)
+    assert circle.contains(40.0, -3.7)
+    assert circle.contains(40.008, -3.7)
+    assert not circle.contains(40.01, -3.7)
+    with pytest.raises(ValueError):
+        geofence.Circle(91, 0, 1000)
+    with pytest.raises(ValueError):
+        geofence.Circle(0, 0, 0)
+
+
+def test_circle_antimeridian():
+    """The box of a circle over the antimeridian is wrapped."""
+    circle = geofence.Circle(-17.0, 179.99, 5000)
+    south, west, north, east = circle.bounds()
+    assert west > east
+    assert 179.9 < west < 179.99
+    assert -180.0 <= east < -179.9
+    assert circle.contains(-17.0, -179.98)
+    assert not circle.contains(-17.0, 179.9)
+
+
+def test_circle_pole():
+    """The box of a circle over a pole has every longitude."""
+    south, west, north, east = geofence.Circle(89.99, 10, 5000).bounds()
+    assert (west, north, east) == (-180.0, 90.0, 180.0)
+
+
+def test_polygon():
+    """A polygon contains the positions inside it."""
+    polygon = geofence.Polygon([0, 0, 2, 2], [0, 2, 2, 0])
+    assert polygon.contains(1, 1)
+    assert not polygon.contains(3, 1)
+    assert not polygon.contains(1, -0.5)
+    assert polygon.bounds() == (0, 0, 2, 2)
+    with pytest.raises(ValueError):
+        geofence.Polygon([0, 1], [0, 1])
+
+
+def test_update_antimeridian():
+    """A track over the antimeridian enters and exits the circle."""
+    fences = geofence.Geofences()
+    fences.add("date_line", geofence.Circle(-17.0, 179.99, 5000))
+    assert fences.update(-17.0, 179.8) == ([], [])
+    assert fences.update(-17.0, 179.97) == (["date_line"], [])
+    assert fences.update(-17.0, -179.98) == ([], [])
+    assert fences.update(-17.0, -179.8) == ([], ["date_line"])
+    assert fences.update(-17.0, -179.99) == (["date_line"], [])
+
+
+def test_update():
+    """The fences entered and exited are found from the last position."""
+    fences = geofence.Geofences()
+    fences.add("a", geofence.Circle(40.0, -3.7, 1000))
+    fences.add("b", geofence.Polygon([39.99, 39.99, 40.02, 40.02],
+                                     [-3.71, -3.69, -3.69, -3.71]))
+    assert fences.update(40.0, -3.7) == (["a", "b"], [])
+    assert fences.update(40.015, -3.7) == ([], ["a"])
+    assert fences.update(41.0, -3.7) == ([], ["b"])
+    assert {name: inside for name, (fence, inside)
+            in fences.getFences().items()} == {"a": False, "b": False}
+
+
+def test_add_remove():
+    """A fence added is checked against the last position."""
+    fences = geofence.Geofences()
+    fences.update(40.0, -3.7)
+    assert fences.add("a", geofence.Circle(40.0, -3.7, 1000)) == \
+        (["a"], [])
+    assert fences.add("a", geofence.Circle(50.0, -3.7, 1000)) == \
+        ([], ["a"])
+    fences.remove("a")
+    assert fences.getFences() == {}
+    with pytest.raises(ValueError):
+        fences.remove("a")
+
+
+def test_large_fence():
+    """The fences with too many cells are checked everywhere."""
+    fences = geofence.Geofences()
+    fences.add("large", geofence.Circle(0, 0, 1000000))
+    assert fences._large == {"large"}
+    assert fences.update(5.0, 5.0) == (["large"], [])
+    assert fences.update(20.0, 5.0) == ([], ["large"])
+# -----------------------
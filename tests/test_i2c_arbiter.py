@@ -0,0 +1,167 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+I2C Arbiter Tests.
+
+Description: Check the order in which the arbiter grants the
+             bus: by priority class and in round robin between
+             the devices of a class, and the limits of its queue.
+             Every test uses its own arbiter, not the singleton.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import threading
+import time
+import pytest
+from agile_makers_shield.buses.i2c import i2c_arbiter
+# -----------------------
+
+
+# --- Variables ---------
+TIMEOUT = 5.0  # Seconds to wait for the threads
+# -----------------------
+
+
+# --- Functions ---------
+def _arbiter(queue_size=i2c_arbiter.QUEUE_SIZE):
+    """Return an arbiter apart from the singleton."""
+    return type.__call__(i2c_arbiter.I2C_Arbiter, queue_size=queue_size)
+
+
+@pytest.fixture
+def arbiter():
+    """Return an arbiter for a test."""
+    return _arbiter()
+
+
+def _queue(arbiter, order, device, priority, name):
+    """Start a thread that waits for the bus and records its name."""
+    def run():
+        with arbiter.grant(device, priority):
+            order.append(name)
+
+    waiting = arbiter._waiting
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    # Wait until it is queued, so the threads queue in order
+    deadline = time.monotonic() + TIMEOUT
+    while arbiter._waiting == waiting:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    return thread
+
+
+def _grantAll(arbiter, threads):
+    """Release the bus held by the test and wait for the threads."""
+    arbiter.release()
+    for thread in threads:
+        thread.join(TIMEOUT)
+        assert not thread.is_alive()
+
+
+def test_priority(arbiter):
+    """The bus is granted to the highest priority class first."""
+    order = []
+    arbiter.acquire(0x14)
+    threads = [
+        _queue(arbiter, order, 0x76, i2c_arbiter.PRIORITY_BACKGROUND, "bg"),
+        _queue(arbiter, order, 0x68, i2c_arbiter.PRIORITY_USER, "user"),
+        _queue(arbiter, order, 0x14, i2c_arbiter.PRIORITY_INTERRUPT, "irq")
+    ]
+    _grantAll(arbiter, threads)
+    assert order == ["irq", "user", "bg"]
+    stats = arbiter.getStats()
+    assert stats[i2c_arbiter.PRIORITY_BACKGROUND]["grants"] == 1
+    assert stats[i2c_arbiter.PRIORITY_USER]["grants"] == 2
+
+
+def test_round_robin(arbiter):
+    """The devices of a class take turns."""
+    order = []
+    arbiter.acquire(0x14)
+    threads = [
+        _queue(arbiter, order, 0x68, i2c_arbiter.PRIORITY_USER, "adc1"),
+        _queue(arbiter, order, 0x68, i2c_arbiter.PRIORITY_USER, "adc2"),
+        _queue(arbiter, order, 0x68, i2c_arbiter.PRIORITY_USER, "adc3"),
+        _queue(arbiter, order, 0x76, i2c_arbiter.PRIORITY_USER, "bme1"),
+        _queue(arbiter, order, 0x76, i2c_arbiter.PRIORITY_USER, "bme2")
+    ]
+    _grantAll(arbiter, threads)
+    assert order == ["adc1", "bme1", "adc2", "bme2", "adc3"]
+
+
+def test_reentrant(arbiter):
+    """A thread holding the bus can take it again."""
+    with arbiter.grant(0x14):
+        with arbiter.grant(0x68):
+            assert arbiter._owner == threading.get_ident()
+        assert arbiter._owner == threading.get_ident()
+    assert arbiter._owner is None
+    assert arbiter.getHeldTime() > 0
+
+
+def test_release_non_owner(arbiter):
+    """Only the owner can release the bus."""
+    with pytest.raises(RuntimeError):
+        arbiter.release()
+
+
+def test_priority_context(arbiter):
+    """The priority of the thread applies inside the block."""
+    with arbiter.priority(i2c_arbiter.PRIORITY_BACKGROUND):
+        with arbiter.grant(0x76):
+            pass
+    with arbiter.grant(0x76):
+        pass
+    stats = arbiter.getStats()
+    assert stats[i2c_arbiter.PRIORITY_BACKGROUND]["grants"] == 1
+    assert stats[i2c_arbiter.PRIORITY_DEFAULT]["grants"] == 1
+    with pytest.raises(ValueError):
+        with arbiter.priority(7):
+            pass
+
+
+def test_queue_full():
+    """The queue is limited, except for the interrupt service."""
+    arbiter = _arbiter(queue_size=2)
+    order = []
+    errors = []
+    arbiter.acquire(0x14)
+    threads = [
+        _queue(arbiter, order, 0x68, i2c_arbiter.PRIORITY_USER, i)
+        for i in range(2)
+    ]
+
+    def full():
+        try:
+            arbiter.acquire(0x68, i2c_arbiter.PRIORITY_USER)
+        except i2c_arbiter.I2C_ArbiterFull as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=full)
+    thread.start()
+    thread.join(TIMEOUT)
+    assert len(errors) == 1
+    threads.append(
+        _queue(arbiter, order, 0x14, i2c_arbiter.PRIORITY_INTERRUPT, "irq")
+    )
+    _grantAll(arbiter, threads)
+    assert order == ["irq", 0, 1]
+# -----------------------
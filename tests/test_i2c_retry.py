@@ -0,0 +1,172 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+I2C Retry Tests.
+
+Description: Check the backoff of the retry policy and the
+             states of its circuit breaker, with a fake clock,
+             and a device down of the simulated bus.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import errno
+import pytest
+from agile_makers_shield.buses.i2c import i2c_bus
+from agile_makers_shield.buses.i2c import i2c_retry
+from agile_makers_shield.buses.i2c import mcp3424
+# -----------------------
+
+
+# --- Variables ---------
+DEVICE = 0x68
+# -----------------------
+
+
+# --- Classes -----------
+class Clock():
+    """Monotonic clock moved by hand."""
+
+    def __init__(self):
+        """Init method."""
+        self.now = 1000.0
+
+    def monotonic(self):
+        """Return the time of the clock."""
+        return self.now
+# -----------------------
+
+
+# --- Functions ---------
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the clock of the retry policy."""
+    fake = Clock()
+    monkeypatch.setattr(i2c_retry, "time", fake)
+    return fake
+
+
+def _fail(policy, code=errno.ENXIO):
+    """Fail a transaction of the device with an error."""
+    assert policy.backoff(DEVICE, IOError(code, ""), 1) is None
+
+
+def test_backoff():
+    """The first retry is at once, then the delays grow to the cap."""
+    policy = i2c_retry.RetryPolicy(tries=10, jitter=0)
+    error = IOError(errno.EREMOTEIO, "")
+    assert policy.backoff(DEVICE, error, 1) == 0
+    base, cap = i2c_retry.BACKOFF_FAST
+    assert policy.backoff(DEVICE, error, 2) == base
+    assert policy.backoff(DEVICE, error, 3) == base * 2
+    assert policy.backoff(DEVICE, error, 9) == cap
+    base, cap = i2c_retry.BACKOFF_SLOW
+    assert policy.backoff(DEVICE, IOError(errno.EIO, ""), 2) == base
+    assert policy.backoff(DEVICE, error, 10) is None
+
+
+def test_backoff_jitter():
+    """The jitter only shortens the delay."""
+    policy = i2c_retry.RetryPolicy(jitter=0.5)
+    base, cap = i2c_retry.BACKOFF_SLOW
+    for _ in range(100):
+        delay = policy.backoff(DEVICE, IOError(errno.EIO, ""), 2)
+        assert (base * 0.5) <= delay <= base
+
+
+def test_fatal_not_retried():
+    """A device that is not there is not retried."""
+    policy = i2c_retry.RetryPolicy()
+    for code in i2c_retry.ERRNO_FATAL:
+        assert policy.backoff(DEVICE, IOError(code, ""), 1) is None
+
+
+def test_breaker_opens(clock):
+    """The breaker opens after the threshold of failures in a row."""
+    policy = i2c_retry.RetryPolicy(threshold=3, timeout=5)
+    _fail(policy)
+    _fail(policy)
+    policy.check(DEVICE)
+    assert not policy.isDown(DEVICE)
+    _fail(policy)
+    assert policy.isDown(DEVICE)
+    with pytest.raises(i2c_retry.I2C_DeviceDown):
+        policy.check(DEVICE)
+    assert not policy.isDown(DEVICE + 1)
+
+
+def test_breaker_success_resets(clock):
+    """A success clears the failures counted."""
+    policy = i2c_retry.RetryPolicy(threshold=3, timeout=5)
+    _fail(policy)
+    _fail(policy)
+    policy.succeeded(DEVICE)
+    _fail(policy)
+    _fail(policy)
+    assert not policy.isDown(DEVICE)
+
+
+def test_breaker_half_open(clock):
+    """After the timeout one trial decides if the breaker closes."""
+    policy = i2c_retry.RetryPolicy(threshold=3, timeout=5)
+    for _ in range(3):
+        _fail(policy)
+    clock.now = clock.now + 5
+    assert not policy.isDown(DEVICE)
+    policy.check(DEVICE)
+    # A failed trial opens the breaker again
+    _fail(policy)
+    assert policy.isDown(DEVICE)
+    clock.now = clock.now + 5
+    policy.check(DEVICE)
+    # A successful trial closes it
+    policy.succeeded(DEVICE)
+    _fail(policy)
+    _fail(policy)
+    assert not policy.isDown(DEVICE)
+
+
+def test_reset(clock):
+    """A reset closes the breakers."""
+    policy = i2c_retry.RetryPolicy(threshold=1)
+    _fail(policy)
+    assert policy.isDown(DEVICE)
+    policy.reset(DEVICE)
+    assert not policy.isDown(DEVICE)
+    _fail(policy)
+    policy.reset()
+    policy.check(DEVICE)
+
+
+def test_bus_device_down(sim):
+    """The reads of a device down open its breaker."""
+    policy = i2c_retry.RetryPolicy(threshold=2)
+    bus = i2c_bus.I2C_Bus(mcp3424.MCP3424_ADDRESS, retry=policy)
+    sim.setDeviceDown(mcp3424.MCP3424_ADDRESS)
+    assert bus.read(0x00, 1) == i2c_bus.ERROR
+    assert not policy.isDown(mcp3424.MCP3424_ADDRESS)
+    assert bus.read(0x00, 1) == i2c_bus.ERROR
+    assert policy.isDown(mcp3424.MCP3424_ADDRESS)
+    # Failed at once, without a transaction
+    transactions = sim.stats["transactions"]
+    sim.setDeviceDown(mcp3424.MCP3424_ADDRESS, False)
+    assert bus.read(0x00, 1) == i2c_bus.ERROR
+    assert sim.stats["transactions"] == transactions
+    policy.reset()
+    assert len(bus.read(0x00, 1)) == 1
+# -----------------------
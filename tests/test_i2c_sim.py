@@ -0,0 +1,125 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+I2C Simulator Tests.
+
+Description: Check the simulated devices of the shield
+             through the I2C_Bus class: the ATMega registers,
+             UART loopback and GPS buffers, the failures of the
+             bus and the sentences of the simulated GPS.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+from agile_makers_shield.buses.i2c import atmega
+from agile_makers_shield.buses.i2c import i2c_bus
+from agile_makers_shield.buses.i2c import i2c_retry
+from agile_makers_shield.buses.i2c import i2c_sim
+from agile_makers_shield.buses.i2c import mcp3424
+from agile_makers_shield.utils import nmea
+# -----------------------
+
+
+# --- Functions ---------
+def _bus(address):
+    """Return a bus to a simulated device that does not retry."""
+    return i2c_bus.I2C_Bus(address, retry=i2c_retry.RetryPolicy(tries=1))
+
+
+def test_atmega_check(sim):
+    """The check register of the ATMega has the check byte."""
+    bus = _bus(atmega.ATMEGA_ADDRESS)
+    assert bus.read(atmega.ATMEGA_CHECK, 1) == [atmega.ATMEGA_CHECK_BYTE]
+
+
+def test_atmega_leds(sim):
+    """The LED registers written are read back."""
+    bus = _bus(atmega.ATMEGA_ADDRESS)
+    reg = (atmega.SOCKET_LEDS << atmega.SOCKET_SHIFT) | atmega.LED_S0_R
+    assert bus.write(reg, [10, 20, 30])
+    assert bus.read(reg, 3) == [10, 20, 30]
+    assert sim.atmega.getLeds()[atmega.LED_S0_R:(atmega.LED_S0_R + 3)] \
+        == bytes([10, 20, 30])
+
+
+def test_atmega_uart_loopback(sim):
+    """The bytes sent to a UART that is on are received back."""
+    bus = _bus(atmega.ATMEGA_ADDRESS)
+    base = atmega.SOCKET_0 << atmega.SOCKET_SHIFT
+    assert bus.write(base | atmega.SOCKET_STATUS, [atmega.MODE_ON])
+    assert bus.write(base | atmega.FIFO_TX, b"hello")
+    assert bus.read(base | atmega.FIFO_AVAILABLE, 2) == [0, 5]
+    assert bytes(bus.read(base | atmega.FIFO_RX, 5)) == b"hello"
+    assert bus.read(base | atmega.INT_UART, 1) == [1]
+    assert bus.read(base | atmega.INT_UART, 1) == [0]
+
+
+def test_atmega_gps_buffers(sim):
+    """An update of the GPS fills the GGA and RMC buffers."""
+    bus = _bus(atmega.ATMEGA_ADDRESS)
+    base = atmega.SOCKET_GPS << atmega.SOCKET_SHIFT
+    assert bus.write(base | atmega.GPS_UPDATE, atmega.DUMMY_DATA)
+    size = bus.read(base | atmega.GPS_READ_BUFFER_SIZE, 1)[0]
+    assert size == i2c_sim.GPS_BUFFER_SIZE
+    for reg, sentence in [(atmega.GPS_READ_GGA, "GGA"),
+                          (atmega.GPS_READ_RMC, "RMC")]:
+        data = bus.readUntil(base | reg, size, atmega.GPS_END)
+        result = nmea.parse(bytes(data))
+        assert result is not None
+        assert result["type"] == sentence
+
+
+def test_device_down(sim):
+    """A device that is down fails its transactions."""
+    bus = _bus(mcp3424.MCP3424_ADDRESS)
+    sim.setDeviceDown(mcp3424.MCP3424_ADDRESS)
+    assert bus.read(0x00, 1) == i2c_bus.ERROR
+    sim.setDeviceDown(mcp3424.MCP3424_ADDRESS, False)
+    assert len(bus.read(0x00, 1)) == 1
+
+
+def test_error_rate(sim):
+    """Every transaction fails with an error rate of 1."""
+    sim.error_rate = 1.0
+    bus = _bus(atmega.ATMEGA_ADDRESS)
+    assert bus.read(atmega.ATMEGA_CHECK, 1) == i2c_bus.ERROR
+    assert sim.stats["errors"] == sim.stats["transactions"] == 1
+
+
+def test_gps_sentences():
+    """The simulated sentences are valid and at the track position."""
+    gps = i2c_sim.GPS_Model()
+    gga, rmc = gps.sentences(1000.0)
+    for buffer in [gga, rmc]:
+        assert len(buffer) == i2c_sim.GPS_BUFFER_SIZE
+    latitude, longitude, course = gps.position(1000.0)
+    result = nmea.parse(gga[0:gga.index(b"\x00")])
+    assert abs(result["latitude"] - latitude) < 1e-5
+    assert abs(result["longitude"] - longitude) < 1e-5
+    result = nmea.parse(rmc[0:rmc.index(b"\x00")])
+    assert abs(result["course"] - course) < 0.01
+
+
+def test_gps_long_sentence():
+    """A sentence longer than the buffer is cut and ends with a NUL."""
+    gps = i2c_sim.GPS_Model()
+    buffer = gps._nmea("GPGSV," + ("1" * 200))
+    assert len(buffer) == i2c_sim.GPS_BUFFER_SIZE
+    assert buffer.endswith(b"\x00")
+    assert buffer.startswith(b"$GPGSV,")
+# -----------------------
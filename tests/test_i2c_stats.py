@@ -0,0 +1,114 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+I2C Statistics Tests.
+
+Description: Check the counters, latency percentiles and
+             names of the I2C statistics, and the transactions
+             recorded by the I2C_Bus class on the simulated bus.
+             Every test uses its own statistics, not the singleton.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import pytest
+from agile_makers_shield.buses.i2c import atmega
+from agile_makers_shield.buses.i2c import i2c_bus
+from agile_makers_shield.buses.i2c import i2c_retry
+from agile_makers_shield.buses.i2c import i2c_stats
+# -----------------------
+
+
+# --- Functions ---------
+@pytest.fixture
+def stats():
+    """Return statistics apart from the singleton."""
+    return type.__call__(i2c_stats.I2C_Stats)
+
+
+def test_record(stats):
+    """The transactions of an entry are added up."""
+    stats.record(0x14, 0x01, i2c_stats.OP_READ, 2, 0, 0.001)
+    stats.record(0x14, 0x01, i2c_stats.OP_READ, 0, 3, 0.003, ok=False)
+    entry = stats.getStats()["0x14:0x01:read"]
+    assert entry["calls"] == 2
+    assert entry["bytes"] == 2
+    assert entry["retries"] == 3
+    assert entry["errors"] == 1
+    assert entry["time_total"] == pytest.approx(0.004)
+    assert entry["time_mean"] == pytest.approx(0.002)
+    assert entry["time_max"] == 0.003
+
+
+def test_percentiles(stats):
+    """The percentiles are the bounds of the buckets, up to the maximum."""
+    for _ in range(99):
+        stats.record(0x68, i2c_stats.REG_RAW, i2c_stats.OP_READ, 3, 0,
+                     0.0001)
+    stats.record(0x68, i2c_stats.REG_RAW, i2c_stats.OP_READ, 3, 0, 0.1)
+    entry = stats.getStats()["0x68:raw:read"]
+    # 100 us are in the bucket below 128 us
+    assert entry["p50"] == 128 / 1000000
+    assert entry["p95"] == 128 / 1000000
+    assert entry["p99"] == 128 / 1000000
+    assert entry["time_max"] == 0.1
+    stats.record(0x68, i2c_stats.REG_RAW, i2c_stats.OP_READ, 3, 0, 0.1)
+    assert stats.getStats()["0x68:raw:read"]["p99"] == 0.1
+
+
+def test_names(stats):
+    """The entries are named by device, register and operation."""
+    stats.record(0x76, 0xF7, i2c_stats.OP_READ, 8, 0, 0.001)
+    stats.record(0x76, 0xF4, i2c_stats.OP_WRITE, 1, 0, 0.001)
+    stats.record(0x14, i2c_stats.REG_RAW, i2c_stats.OP_WRITE, 1, 0, 0.001)
+    assert list(stats.getStats().keys()) == [
+        "0x14:raw:write", "0x76:0xF7:read", "0x76:0xF4:write"
+    ]
+
+
+def test_disabled_and_reset(stats):
+    """Nothing is recorded while disabled, and reset clears it all."""
+    stats.enabled = False
+    stats.record(0x14, 0x01, i2c_stats.OP_READ, 1, 0, 0.001)
+    assert stats.getStats() == {}
+    stats.enabled = True
+    stats.record(0x14, 0x01, i2c_stats.OP_READ, 1, 0, 0.001)
+    stats.reset()
+    assert stats.getStats() == {}
+
+
+def test_bus(sim, stats):
+    """The bus records its reads, writes and failures."""
+    bus = i2c_bus.I2C_Bus(atmega.ATMEGA_ADDRESS, stats=stats,
+                          retry=i2c_retry.RetryPolicy(tries=2))
+    assert bus.read(atmega.ATMEGA_CHECK, 1)
+    assert bus.readBlocks([]) == []
+    sim.error_rate = 1.0
+    assert not bus.write(atmega.ATMEGA_CHECK, [1])
+    result = stats.getStats()
+    name = "0x{:02X}:0x{:02X}:".format(atmega.ATMEGA_ADDRESS,
+                                       atmega.ATMEGA_CHECK)
+    assert result[name + "read"]["calls"] == 1
+    assert result[name + "read"]["bytes"] == 1
+    assert result[name + "write"]["errors"] == 1
+    assert result[name + "write"]["retries"] == 1
+    assert result[name + "write"]["bytes"] == 0
+    raw = "0x{:02X}:raw:read".format(atmega.ATMEGA_ADDRESS)
+    assert result[raw]["calls"] == 1
+    assert result[raw]["bytes"] == 0
+# -----------------------
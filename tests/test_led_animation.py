@@ -0,0 +1,194 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+LED Animation Tests.
+
+Description: Check the values of the effects over time, the
+             registers changed by each frame, and the animator
+             running the effects on fake registers until they end,
+             are stopped or fail to be written.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import threading
+import time
+import pytest
+from agile_makers_shield.utils import led_animation
+# -----------------------
+
+
+# --- Variables ---------
+LED = (0, 1, 2)
+TIMEOUT = 5.0  # Seconds to wait for the animator
+# -----------------------
+
+
+# --- Classes -----------
+class Registers():
+    """Fake registers of the LEDs."""
+
+    def __init__(self):
+        """Init method."""
+        self.values = [0] * 6
+        self.frames = []
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def read(self, regs):
+        """Return the values of some registers."""
+        with self._lock:
+            return [self.values[reg] for reg in regs]
+
+    def write(self, values):
+        """Write a dict of register: value, unless failing."""
+        with self._lock:
+            if self.fail:
+                return False
+            self.frames.append(dict(values))
+            for reg, value in values.items():
+                self.values[reg] = value
+            return True
+# -----------------------
+
+
+# --- Functions ---------
+@pytest.fixture
+def registers():
+    """Return the fake registers."""
+    return Registers()
+
+
+@pytest.fixture
+def animator(registers):
+    """Return an animator of the fake registers, closed after the test."""
+    animator = led_animation.Animator(registers.read, registers.write,
+                                      led_animation.MAX_FRAME_RATE)
+    yield animator
+    animator.close()
+
+
+def _wait(condition):
+    """Wait until the condition is true."""
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_blink():
+    """A blink is on during the duty and off after the count."""
+    blink = led_animation.Blink((255, 0, 0), 1.0, duty=0.25, count=2)
+    assert blink.duration == 2.0
+    assert blink.value(0.1, None) == (255, 0, 0)
+    assert blink.value(0.5, None) == (0, 0, 0)
+    assert blink.value(1.2, None) == (255, 0, 0)
+    assert blink.value(2.1, None) == (0, 0, 0)
+    with pytest.raises(ValueError):
+        led_animation.Blink((255, 0, 0), 1.0, duty=1)
+
+
+def test_breathe():
+    """A breathe is off at the start of a period and on at its middle."""
+    breathe = led_animation.Breathe((200, 100, 0), 2.0)
+    assert breathe.duration is None
+    assert breathe.value(0, None) == (0, 0, 0)
+    assert breathe.value(1.0, None) == (200, 100, 0)
+    assert breathe.value(4.0, None) == (0, 0, 0)
+
+
+def test_fade():
+    """A fade goes from the start values to the color."""
+    fade = led_animation.Fade((100, 0, 50), 2.0)
+    assert fade.value(0, (0, 100, 50)) == (0, 100, 50)
+    assert fade.value(1.0, (0, 100, 50)) == (50, 50, 50)
+    assert fade.value(3.0, (0, 100, 50)) == (100, 0, 50)
+
+
+def test_sequence():
+    """A sequence runs its effects in turn from the last values."""
+    sequence = led_animation.Sequence([
+        led_animation.Fade((100, 100, 100), 1.0),
+        led_animation.Fade((0, 0, 0), 1.0)
+    ], count=2)
+    assert sequence.duration == 4.0
+    assert sequence.value(0.5, (0, 0, 0)) == (50, 50, 50)
+    assert sequence.value(1.5, (0, 0, 0)) == (50, 50, 50)
+    assert sequence.value(2.5, (0, 0, 0)) == (50, 50, 50)
+    assert sequence.value(5.0, (0, 0, 0)) == (0, 0, 0)
+    with pytest.raises(ValueError):
+        led_animation.Sequence([led_animation.Breathe((1, 1, 1), 1.0)])
+
+
+def test_render(registers):
+    """A frame has the registers changed since the last one."""
+    animator = led_animation.Animator(registers.read, registers.write)
+    fade = led_animation.Fade((100, 0, 0), 1.0)
+    animator._animations[LED] = (fade, (0, 0, 0), 0.0)
+    assert animator._render(0.0) == {0: 0, 1: 0, 2: 0}
+    assert animator._render(0.5) == {0: 50}
+    assert animator._render(0.5) == {}
+    assert animator._render(1.0) == {0: 100}
+    # Finished effects are removed
+    assert animator.getAnimations() == []
+
+
+def test_animate(registers, animator):
+    """An effect runs until it ends and leaves its last values."""
+    registers.values[0:3] = [0, 200, 0]
+    animator.animate(LED, led_animation.Fade((100, 0, 50), 0.05))
+    assert animator.getAnimations() == [LED]
+    _wait(lambda: not animator.getAnimations())
+    assert registers.values[0:3] == [100, 0, 50]
+    # Only the registers of the LED are written
+    assert all(set(frame) <= set(LED) for frame in registers.frames)
+
+
+def test_stop(registers, animator):
+    """A write after stopping an effect is not overwritten."""
+    animator.animate(LED, led_animation.Blink((255, 255, 255), 0.02))
+    _wait(lambda: len(registers.frames) > 2)
+    animator.stop(LED)
+    assert animator.write({0: 7, 1: 7, 2: 7})
+    frames = len(registers.frames)
+    time.sleep(0.05)
+    assert len(registers.frames) == frames
+    assert registers.values[0:3] == [7, 7, 7]
+
+
+def test_failures(registers, animator):
+    """The effects are stopped after the frames fail to be written."""
+    registers.fail = True
+    animator.animate(LED, led_animation.Blink((255, 0, 0), 0.02))
+    _wait(lambda: not animator.getAnimations())
+    assert registers.frames == []
+    assert animator._failures == 0
+    # The animator runs new effects after that
+    registers.fail = False
+    animator.animate(LED, led_animation.Fade((1, 2, 3), 0))
+    _wait(lambda: registers.values[0:3] == [1, 2, 3])
+
+
+def test_frame_rate(animator):
+    """The frame rate is capped."""
+    animator.setFrameRate(10)
+    assert animator.getFrameRate() == 10
+    for fps in [0, led_animation.MAX_FRAME_RATE + 1]:
+        with pytest.raises(ValueError):
+            animator.setFrameRate(fps)
+# -----------------------
@@ -0,0 +1,99 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+MCP3424 Tests.
+
+Description: Check the reads of the simulated MCP3424 and the
+             state of a stream used directly as a generator: the
+             reads fail while it runs and the device is left in
+             one-shot mode when it ends.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import pytest
+from agile_makers_shield.buses.i2c import mcp3424
+# -----------------------
+
+
+# --- Functions ---------
+@pytest.fixture
+def device(sim):
+    """Return an MCP3424 on the simulated bus, not the singleton."""
+    device = type.__call__(mcp3424.MCP3424)
+    sim.mcp3424.voltages[0] = 500.0
+    sim.mcp3424.voltages[1] = 1000.0
+    yield device
+    device.close()
+
+
+def _mode(sim):
+    """Return the conversion mode of the simulated MCP3424."""
+    return (sim.mcp3424._config >> mcp3424.MCP3424_SHIFT_MODE) & 0x01
+
+
+def test_read(sim, device):
+    """The channels are read in one-shot and continuous mode."""
+    assert device.read(0, resolution=mcp3424.MCP3424_RESOLUTION_12) == 500.0
+    assert device.read(1, mcp3424.MCP3424_MODE_CONTINUOUS,
+                       mcp3424.MCP3424_RESOLUTION_12) == 1000.0
+    assert device.readMulti([
+        (0, mcp3424.MCP3424_RESOLUTION_12, mcp3424.MCP3424_PGA_1),
+        (1, mcp3424.MCP3424_RESOLUTION_12, mcp3424.MCP3424_PGA_1)
+    ]) == [500.0, 1000.0]
+    with pytest.raises(ValueError):
+        device.read(4)
+
+
+def test_stream_generator(sim, device):
+    """The reads fail while the generator streams."""
+    samples = device.stream(1)
+    assert not device.isStreaming()
+    ts, value = next(samples)
+    assert value == 1000.0
+    assert device.isStreaming()
+    assert _mode(sim) == mcp3424.MCP3424_MODE_CONTINUOUS
+    with pytest.raises(IOError):
+        device.read(1, mcp3424.MCP3424_MODE_CONTINUOUS,
+                    mcp3424.MCP3424_RESOLUTION_12)
+    with pytest.raises(IOError):
+        device.readMulti([
+            (0, mcp3424.MCP3424_RESOLUTION_12, mcp3424.MCP3424_PGA_1)
+        ])
+    with pytest.raises(IOError):
+        next(device.stream(0))
+    samples.close()
+    assert not device.isStreaming()
+    assert _mode(sim) == mcp3424.MCP3424_MODE_ONE_SHOOT
+    # The configuration of the stream is not reused
+    assert device.read(0, mcp3424.MCP3424_MODE_CONTINUOUS,
+                       mcp3424.MCP3424_RESOLUTION_12) == 500.0
+
+
+def test_stream_error(sim, device):
+    """A stream that fails ends and the device can be read again."""
+    samples = device.stream(0)
+    next(samples)
+    sim.setDeviceDown(mcp3424.MCP3424_ADDRESS)
+    with pytest.raises(IOError):
+        next(samples)
+    assert not device.isStreaming()
+    sim.setDeviceDown(mcp3424.MCP3424_ADDRESS, False)
+    device._bus._retry.reset()
+    assert device.read(0, resolution=mcp3424.MCP3424_RESOLUTION_12) == 500.0
+# -----------------------
@@ -0,0 +1,145 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+NMEA Tests.
+
+Description: Check the checksum, validation and conversion of
+             the NMEA sentences on real GGA, RMC, GSA, GSV and VTG
+             sentences, and the parser of a stream of bytes.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import calendar
+import functools
+import random
+import pytest
+from agile_makers_shield.utils import nmea
+# -----------------------
+
+
+# --- Variables ---------
+GGA = "$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47"
+RMC = "$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A"
+GSA = "$GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39"
+GSV = "$GPGSV,2,1,08,01,40,083,46,02,17,308,41,12,07,344,39,14,22,228,45*75"
+VTG = "$GPVTG,054.7,T,034.4,M,005.5,N,010.2,K*48"
+# -----------------------
+
+
+# --- Functions ---------
+def _sentence(body):
+    """Return a sentence with the checksum of its body."""
+    return "${}*{:02X}".format(body, nmea.checksum(body.encode()))
+
+
+def test_checksum():
+    """The checksum is the XOR of the bytes, of any length."""
+    rng = random.Random(1)
+    for size in [0, 1, 7, 64, 128, 129, 300]:
+        data = bytes(rng.randrange(256) for _ in range(size))
+        assert nmea.checksum(data) == \
+            functools.reduce(lambda a, b: a ^ b, data, 0)
+
+
+def test_split():
+    """The sentences are validated and split in fields."""
+    assert nmea.split(GGA)[0:3] == ["GPGGA", "123519", "4807.038"]
+    assert nmea.split(GGA.encode() + b"\r\n\x00\x00") == nmea.split(GGA)
+    assert nmea.split(GGA.replace("*47", "*48")) is None
+    assert nmea.split(GGA.replace("*47", "*ZZ")) is None
+    assert nmea.split(GGA[0:-3]) is None
+    assert nmea.split(GGA[1:]) is None
+    assert nmea.split("") is None
+
+
+def test_gga():
+    """A GGA sentence has the position and quality of the fix."""
+    result = nmea.parse(GGA)
+    assert result["type"] == "GGA"
+    assert result["talker"] == "GP"
+    assert result["utc"] == (12 * 3600) + (35 * 60) + 19
+    assert result["latitude"] == pytest.approx(48 + (7.038 / 60))
+    assert result["longitude"] == pytest.approx(11 + (31.0 / 60))
+    assert result["quality"] == 1
+    assert result["satellites"] == 8
+    assert result["hdop"] == 0.9
+    assert result["altitude"] == 545.4
+    assert result["geoid"] == 46.9
+    assert result["dgps_age"] is None
+    assert result["dgps_id"] is None
+
+
+def test_rmc():
+    """An RMC sentence has the time since the epoch and the variation."""
+    result = nmea.parse(RMC)
+    assert result["status"] == "A"
+    assert result["speed"] == 22.4
+    assert result["course"] == 84.4
+    assert result["variation"] == -3.1
+    assert result["mode"] is None
+    assert result["time"] == \
+        calendar.timegm((1994, 3, 23, 12, 35, 19))
+
+
+def test_gsa_gsv_vtg():
+    """The satellites and the course are converted."""
+    result = nmea.parse(GSA)
+    assert result["fix_type"] == 3
+    assert result["prns"] == [4, 5, 9, 12, 24]
+    assert (result["pdop"], result["hdop"], result["vdop"]) == \
+        (2.5, 1.3, 2.1)
+    result = nmea.parse(GSV)
+    assert result["in_view"] == 8
+    assert result["satellites_info"] == [
+        (1, 40, 83, 46), (2, 17, 308, 41), (12, 7, 344, 39),
+        (14, 22, 228, 45)
+    ]
+    result = nmea.parse(VTG)
+    assert result["course"] == 54.7
+    assert result["speed_kmh"] == 10.2
+
+
+def test_hemispheres():
+    """The southern and western coordinates are negative."""
+    result = nmea.parse(_sentence(
+        "GNGGA,000000.00,3352.1280,S,15112.5620,W,2,12,0.6,10.0,M,,M,,"
+    ))
+    assert result["talker"] == "GN"
+    assert result["latitude"] == pytest.approx(-(33 + (52.128 / 60)))
+    assert result["longitude"] == pytest.approx(-(151 + (12.562 / 60)))
+    assert result["geoid"] is None
+
+
+def test_invalid():
+    """Unknown types and bad values are not converted."""
+    assert nmea.parse(_sentence("GPXXX,1,2,3")) is None
+    assert nmea.parse(_sentence("GPGGA,123519,48x7,N,,,1,08")) is None
+
+
+def test_parser():
+    """The sentences fed in pieces are parsed once complete."""
+    parser = nmea.NMEA_Parser()
+    data = (b"garbage" + GGA.encode() + b"\r\n" + RMC.encode() + b"\r\n" +
+            GSA.encode()[0:10])
+    results = []
+    for i in range(0, len(data), 7):
+        results.extend(parser.feed(data[i:(i + 7)]))
+    assert [result["type"] for result in results] == ["GGA", "RMC"]
+    assert parser.feed(GSA.encode()[10:] + b"\r\n")[0]["type"] == "GSA"
+# -----------------------
@@ -0,0 +1,112 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+Ring Buffer Tests.
+
+Description: Check the samples kept by the ring buffer before
+             and after it wraps around, and the time ranges read
+             from it.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import pytest
+from agile_makers_shield.utils import ring_buffer
+# -----------------------
+
+
+# --- Functions ---------
+def _filled(size, samples):
+    """Return a buffer with samples at t = 0, 1, ... of values t, -t."""
+    buffer = ring_buffer.RingBuffer(size, 2)
+    for t in range(samples):
+        buffer.append(float(t), (float(t), float(-t)))
+    return buffer
+
+
+def test_empty():
+    """An empty buffer has no samples."""
+    buffer = ring_buffer.RingBuffer(4)
+    assert len(buffer) == 0
+    assert buffer.latest() is None
+    timestamps, fields = buffer.getRange()
+    assert list(timestamps) == []
+    assert [list(field) for field in fields] == [[]]
+
+
+def test_invalid():
+    """The size, fields and samples are checked."""
+    with pytest.raises(ValueError):
+        ring_buffer.RingBuffer(0)
+    with pytest.raises(ValueError):
+        ring_buffer.RingBuffer(4, 0)
+    buffer = _filled(4, 2)
+    with pytest.raises(ValueError):
+        buffer.append(5.0, (1.0,))
+    with pytest.raises(ValueError):
+        buffer.append(0.5, (1.0, 1.0))
+
+
+def test_partial():
+    """Before it is full the buffer keeps every sample."""
+    buffer = _filled(8, 5)
+    assert len(buffer) == 5
+    assert buffer.latest() == (4.0, (4.0, -4.0))
+    timestamps, (first, second) = buffer.getRange()
+    assert list(timestamps) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert list(second) == [0.0, -1.0, -2.0, -3.0, -4.0]
+
+
+def test_wrap():
+    """Once full the oldest samples are dropped."""
+    buffer = _filled(4, 10)
+    assert len(buffer) == 4
+    assert buffer.latest() == (9.0, (9.0, -9.0))
+    timestamps, (first, second) = buffer.getRange()
+    assert list(timestamps) == [6.0, 7.0, 8.0, 9.0]
+    assert list(first) == [6.0, 7.0, 8.0, 9.0]
+
+
+def test_range():
+    """The ranges include both ends, across the wrap of the arrays."""
+    buffer = _filled(5, 12)
+    timestamps, fields = buffer.getRange(8.0, 10.0)
+    assert list(timestamps) == [8.0, 9.0, 10.0]
+    assert list(fields[1]) == [-8.0, -9.0, -10.0]
+    assert list(buffer.getRange(8.5, None)[0]) == [9.0, 10.0, 11.0]
+    assert list(buffer.getRange(None, 7.5)[0]) == [7.0]
+    assert list(buffer.getRange(20.0, None)[0]) == []
+    assert list(buffer.getRange(10.0, 8.0)[0]) == []
+
+
+def test_equal_timestamps():
+    """Samples with the same timestamp are all in the range."""
+    buffer = ring_buffer.RingBuffer(8)
+    for t in [1.0, 2.0, 2.0, 2.0, 3.0]:
+        buffer.append(t, (t,))
+    assert list(buffer.getRange(2.0, 2.0)[0]) == [2.0, 2.0, 2.0]
+
+
+def test_clear():
+    """A cleared buffer is empty and can be filled again."""
+    buffer = _filled(4, 6)
+    buffer.clear()
+    assert len(buffer) == 0
+    buffer.append(0.0, (1.0, 2.0))
+    assert buffer.latest() == (0.0, (1.0, 2.0))
+# -----------------------
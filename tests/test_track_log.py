@@ -0,0 +1,160 @@
+
+############################################################################
+# Copyright (c) 2016-2018 Libelium Comunicaciones Distribuidas S.L.        #
+#                                                                          #
+# This program and the accompanying materials are made                     #
+# available under the terms of the Eclipse Public License 2.0              #
+# which is available at https://www.eclipse.org/legal/epl-2.0/             #
+#                                                                          #
+# SPDX-License-Identifier: EPL-2.0                                         #
+#                                                                          #
+# Contributors:                                                            #
+#    David Palomares - Initial API and implementation                      #
+############################################################################
+
+
+"""
+Track Log Tests.
+
+Description: Check that the fixes of the track log are read
+             back, from memory and from the file after reopening
+             it, the batches and timer that write them, and the
+             files cut by a power loss or not being a track log.
+Version: 0.1
+Date: October 2026
+"""
+
+
+# --- Imports -----------
+import os
+import time
+import pytest
+from agile_makers_shield.utils import track_log
+# -----------------------
+
+
+# --- Variables ---------
+TIMEOUT = 5.0  # Seconds to wait for the timer
+# -----------------------
+
+
+# --- Functions ---------
+def _fix(i):
+    """Return the fix at t = 1000 + i."""
+    return (1000.0 + i, 40.0 + (i / 1000), -3.5 - (i / 1000), 650.0 + i,
+            1, 8, 0.75)
+
+
+def _size(records):
+    """Return the size of a log file with a number of records."""
+    return track_log.HEADER.size + (records * track_log.RECORD.size)
+
+
+def _check(log, indexes):
+    """Check that the fixes of the log are the ones of the indexes."""
+    timestamps, fields = log.getRange()
+    assert list(timestamps) == [_fix(i)[0] for i in indexes]
+    for j, field in enumerate(fields):
+        assert list(field) == pytest.approx([_fix(i)[j + 1]
+                                             for i in indexes])
+
+
+def test_round_trip(tmp_path):
+    """The fixes are read back before and after reopening the log."""
+    path = str(tmp_path / "track.bin")
+    log = track_log.TrackLog(path, batch=4, interval=60)
+    for i in range(10):
+        log.append(*_fix(i))
+    assert len(log) == 10
+    # Two batches written, the rest in memory
+    assert os.path.getsize(path) == _size(8)
+    _check(log, range(10))
+    log.close()
+    assert os.path.getsize(path) == _size(10)
+    log = track_log.TrackLog(path, batch=4, interval=60)
+    try:
+        assert len(log) == 10
+        _check(log, range(10))
+        log.append(*_fix(10))
+        _check(log, range(11))
+    finally:
+        log.close()
+
+
+def test_range(tmp_path):
+    """The ranges include both ends and the points are evenly spaced."""
+    log = track_log.TrackLog(str(tmp_path / "track.bin"), batch=3)
+    try:
+        for i in range(20):
+            log.append(*_fix(i))
+        timestamps, fields = log.getRange(1005.0, 1008.0)
+        assert list(timestamps) == [1005.0, 1006.0, 1007.0, 1008.0]
+        timestamps, fields = log.getRange(1004.5, None, 3)
+        assert list(timestamps) == [1005.0, 1012.0, 1019.0]
+        assert list(log.getRange(2000.0, None)[0]) == []
+    finally:
+        log.close()
+
+
+def test_older_timestamp(tmp_path):
+    """The timestamps cannot decrease."""
+    log = track_log.TrackLog(str(tmp_path / "track.bin"))
+    try:
+        log.append(*_fix(5))
+        with pytest.raises(ValueError):
+            log.append(*_fix(4))
+    finally:
+        log.close()
+
+
+def test_timer(tmp_path):
+    """The records are written after the interval without new fixes."""
+    path = str(tmp_path / "track.bin")
+    log = track_log.TrackLog(path, batch=100, interval=0.01)
+    try:
+        log.append(*_fix(0))
+        deadline = time.monotonic() + TIMEOUT
+        while os.path.getsize(path) < _size(1):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert log.errors == 0
+    finally:
+        log.close()
+
+
+def test_cut_record(tmp_path):
+    """A record cut by a power loss is dropped."""
+    path = str(tmp_path / "track.bin")
+    log = track_log.TrackLog(path, interval=0)
+    log.append(*_fix(0))
+    log.append(*_fix(1))
+    log.close()
+    with open(path, "r+b") as f:
+        f.truncate(_size(2) - 5)
+    log = track_log.TrackLog(path)
+    try:
+        assert len(log) == 1
+        _check(log, [0])
+    finally:
+        log.close()
+    assert os.path.getsize(path) == _size(1)
+
+
+def test_invalid_file(tmp_path):
+    """A file that is not a track log is not opened."""
+    path = tmp_path / "track.bin"
+    path.write_bytes(b"NOTATRACKLOG" * 4)
+    with pytest.raises(IOError):
+        track_log.TrackLog(str(path))
+
+
+def test_closed(tmp_path):
+    """A closed log cannot be used."""
+    log = track_log.TrackLog(str(tmp_path / "track.bin"))
+    log.close()
+    log.close()
+    with pytest.raises(IOError):
+        log.append(*_fix(0))
+    with pytest.raises(IOError):
+        log.getRange()
+# -----------------------